@@ -1,36 +1,23 @@
 import customtkinter as ctk
+import functools
 import math
+import os
 import time
-
-class MovingBody:
-    """Модель движения тела по наклонной плоскости"""
-    def __init__(self, mass, angle, friction=0.1):
-        self.mass = mass          # Масса тела (кг)
-        self.angle = math.radians(angle)  # Угол в радианах
-        self.friction = friction  # Коэффициент трения
-        
-        # Физические константы
-        self.gravity = 9.81       # Ускорение свободного падения (м/с²)
-        
-        # Состояние системы
-        self.position = 0.0       # Позиция тела (м)
-        self.velocity = 0.0       # Скорость (м/с)
-        self.acceleration = 0.0   # Ускорение (м/с²)
-        self.time = 0.0           # Время движения (с)
-        
-    def update(self, dt):
-        """Обновляет состояние за время dt"""
-        # Вычисляем ускорение
-        F_gravity = self.mass * self.gravity * math.sin(self.angle)
-        F_friction = self.friction * self.mass * self.gravity * math.cos(self.angle)
-        self.acceleration = (F_gravity - F_friction) / self.mass
-        
-        # Обновляем скорость и позицию
-        self.velocity += self.acceleration * dt
-        self.position += self.velocity * dt
-        self.time += dt
-        
-        return self.position
+import traceback
+from tkinter import filedialog
+from models import MovingBody
+from charts import ChartScene, MinMaxBuffer
+from bindings import Binder, Observable
+from estimator import AccelerationFit
+from montecarlo import NoiseModel, format_interval, submit_montecarlo
+from profiler import FrameProfiler, ProfilerHUD
+from recorder import RUNS_DIR, TrajectoryRecorder, new_run_path
+from replay import ReplayEngine
+from widgets import ReplayPanel
+from worker import MODE_TITLES, PhysicsWorker
+from scenes import InclineScene
+from scheduler import FrameScheduler
+from timestep import FixedTimestep, interpolate
 
 class AccelerationWindow(ctk.CTkToplevel):
     def __init__(self, master):
@@ -49,6 +36,39 @@ class AccelerationWindow(ctk.CTkToplevel):
         
         self.sim_running = False
         self.body = None
+        self.spread_future = None  # Фоновый расчет разброса (Монте-Карло)
+        
+        # Физика идет фиксированным шагом, отрисовка интерполируется
+        self.physics_rate = 500  # Шагов физики в секунду
+        self.clock = FixedTimestep(self.physics_rate)
+        self.prev_position = 0.0
+        self.alpha = 0.0
+        
+        # Запись траектории прогона и ее воспроизведение
+        self.recorder = None
+        self.replay = None
+        
+        # Физика в отдельном потоке/процессе (None - в потоке Tk)
+        self.worker = None
+        
+        # Кадры задает общий планировщик главного окна
+        self.scheduler = getattr(master, 'scheduler', None) or FrameScheduler(self)
+        
+        # Покадровые замеры времени
+        self.profiler = FrameProfiler()
+        
+        # Показания обновляются 10 раз в секунду и только при изменении
+        self.fields = {name: Observable() for name in
+                       ('time', 'position', 'velocity', 'fit', 'fit_se',
+                        'theory', 'spread',
+                        'arrival_time', 'arrival_velocity')}
+        self.binder = Binder(rate=10)
+        
+        # Ускорение измеряется по отметкам пути, как линейкой с ценой
+        # деления 1 мм (равномерная ошибка округления)
+        ruler = NoiseModel().ruler_resolution / 1000
+        self.fit = AccelerationFit(noise=ruler / math.sqrt(12))
+        self.last_mark = None
         self.colors = {
             'background': "#2b2b2b",
             'plane': "#8d99ae",
@@ -79,6 +99,23 @@ class AccelerationWindow(ctk.CTkToplevel):
         # Canvas для анимации
         self.canvas = ctk.CTkCanvas(self.simulation_frame, bg=self.colors['background'])
         self.canvas.pack(expand=True, fill="both", padx=20, pady=20)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.scene = InclineScene(self.canvas, self.colors)
+        self.hud = ProfilerHUD(self.canvas, self.profiler)
+        
+        # Графики x(t), v(t), a(t) за весь прогон
+        self.history = MinMaxBuffer(3)
+        self.chart_canvas = ctk.CTkCanvas(self.simulation_frame, height=180,
+                                          bg=self.colors['background'],
+                                          highlightthickness=0)
+        self.chart_canvas.pack(fill="x", padx=20, pady=(0,20))
+        self.chart = ChartScene(self.chart_canvas, self.colors, [
+            ("x, м", self.colors['body']),
+            ("v, м/с", self.colors['stopper']),
+            ("a, м/с²", self.colors['plane']),
+        ])
+        self.chart_canvas.bind("<Configure>",
+                               lambda e: self.chart.refresh(self.history, force=True))
         
         # Элементы управления
         ctk.CTkLabel(self.control_frame, text="Параметры эксперимента:", 
@@ -108,6 +145,24 @@ class AccelerationWindow(ctk.CTkToplevel):
         self.friction_label = ctk.CTkLabel(self.control_frame, text="0.1")
         self.friction_label.pack()
         
+        # Упругость удара об ограничитель
+        self.restitution_var = ctk.DoubleVar(value=0.0)
+        ctk.CTkLabel(self.control_frame, text="Упругость удара:").pack(pady=(10,0))
+        self.restitution_slider = ctk.CTkSlider(self.control_frame, variable=self.restitution_var,
+                                              from_=0, to=0.9, command=self.update_restitution_label)
+        self.restitution_slider.pack(pady=5, padx=10)
+        self.restitution_label = ctk.CTkLabel(self.control_frame, text="0.00")
+        self.restitution_label.pack()
+        
+        # Масштаб времени (логарифмическая шкала 0.1x .. 100x)
+        self.time_scale_var = ctk.DoubleVar(value=0)
+        ctk.CTkLabel(self.control_frame, text="Скорость времени:").pack(pady=(10,0))
+        self.time_scale_slider = ctk.CTkSlider(self.control_frame, variable=self.time_scale_var,
+                                             from_=-1, to=2, command=self.update_time_scale)
+        self.time_scale_slider.pack(pady=5, padx=10)
+        self.time_scale_label = ctk.CTkLabel(self.control_frame, text="1.0×")
+        self.time_scale_label.pack()
+        
         # Кнопки управления
         self.start_btn = ctk.CTkButton(self.control_frame, text="Старт", 
                                      command=self.toggle_simulation, fg_color="green")
@@ -117,9 +172,43 @@ class AccelerationWindow(ctk.CTkToplevel):
                                 command=self.reset_simulation)
         reset_btn.pack(pady=5, padx=10)
         
+        self.record_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self.control_frame, text="Записывать прогон",
+                       variable=self.record_var).pack(pady=5, padx=10)
+        
+        # Где считается физика (применяется при следующем старте)
+        self.physics_mode_var = ctk.StringVar(value="В окне")
+        ctk.CTkLabel(self.control_frame, text="Физика:").pack(pady=(5,0))
+        ctk.CTkOptionMenu(self.control_frame, values=list(MODE_TITLES),
+                         variable=self.physics_mode_var).pack(pady=5, padx=10)
+        
+        replay_btn = ctk.CTkButton(self.control_frame, text="Повтор записи", 
+                                 command=self.open_replay)
+        replay_btn.pack(pady=5, padx=10)
+        
+        self.profile_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self.control_frame, text="Профилировщик",
+                       variable=self.profile_var,
+                       command=self.toggle_profiler).pack(pady=5, padx=10)
+        
+        trace_btn = ctk.CTkButton(self.control_frame, text="Экспорт трассы", 
+                                command=self.export_trace)
+        trace_btn.pack(pady=5, padx=10)
+        
         # Результаты
         self.result_text = ctk.CTkTextbox(self.control_frame, height=150)
         self.result_text.pack(pady=10, padx=10, fill="both")
+        
+        f = self.fields
+        self.binder.text_lines(self.result_text, [
+            ("Время: {:.1f} с", (f['time'],)),
+            ("Пройдено: {:.2f} м", (f['position'],)),
+            ("Скорость: {:.2f} м/с", (f['velocity'],)),
+            ("Ускорение (эксп.): {:.2f} ± {:.2f} м/с²", (f['fit'], f['fit_se'])),
+            ("Ускорение (теор.): {:.2f} м/с²", (f['theory'],)),
+            ("Разброс (МК, 95%): {}", (f['spread'],)),
+            ("Удар: {:.3f} с, {:.2f} м/с", (f['arrival_time'], f['arrival_velocity'])),
+        ])
     
     def update_angle_label(self, value):
         self.angle_label.configure(text=f"{int(value)}°")
@@ -127,114 +216,282 @@ class AccelerationWindow(ctk.CTkToplevel):
     def update_friction_label(self, value):
         self.friction_label.configure(text=f"{float(value):.2f}")
     
+    def update_restitution_label(self, value):
+        self.restitution_label.configure(text=f"{float(value):.2f}")
+        if self.body and not self.worker:
+            self.body.restitution = float(value)
+    
+    def update_time_scale(self, value):
+        self.clock.set_time_scale(10 ** float(value))
+        self.time_scale_label.configure(text=f"{self.clock.time_scale:.1f}×")
+        if self.worker:
+            self.worker.set_time_scale(self.clock.time_scale)
+    
     def toggle_simulation(self):
+        if self.replay:
+            self.replay.close()
         self.sim_running = not self.sim_running
         self.start_btn.configure(text="Пауза" if self.sim_running else "Старт")
         if self.sim_running:
             self.init_simulation()
-            self.update_simulation()
+            self.resume_simulation()
+            self.scheduler.register(self, self.update_simulation,
+                                    self.render_simulation,
+                                    resume=self.resume_simulation)
+        else:
+            self.scheduler.unregister(self)
+            # Последние значения показываются сразу, без ожидания
+            self.binder.refresh(force=True)
+            self.chart.refresh(self.history, force=True)
+            if self.worker:
+                self.worker.pause()
+            if self.recorder:
+                self.recorder.flush()
     
     def init_simulation(self):
-        # Создаем объект тела
-        self.body = MovingBody(
+        # Создаем объект тела; удар об ограничитель считается в физике
+        make_body = functools.partial(
+            MovingBody,
             mass=self.mass_var.get(),
             angle=self.angle_var.get(),
-            friction=self.friction_var.get()
+            friction=self.friction_var.get(),
+            stopper=self.plane_length / 100,  # 100 пикселей = 1 метр
+            restitution=self.restitution_var.get()
         )
+        self.body = make_body()
+        
+        # В фоновом режиме тело считается рабочим, а self.body - его снимок
+        self.stop_worker()
+        mode = MODE_TITLES[self.physics_mode_var.get()]
+        if mode:
+            self.worker = PhysicsWorker(make_body, self.worker_fields, mode=mode,
+                                        physics_rate=self.physics_rate,
+                                        time_scale=self.clock.time_scale)
+            self.worker.start()
+        
+        # Разброс измерения ускорения по секундомеру (метод Монте-Карло)
+        # считается в фоне и показывается, когда будет готов
+        self.fields['spread'].set("считается…")
+        self.spread_future = submit_montecarlo('acceleration', {
+            'angle': self.angle_var.get(),
+            'friction': self.friction_var.get(),
+            'distance': self.plane_length / 100,
+        })
+        self.scheduler.when_done(self, self.spread_future, self.show_spread)
+        self.prev_position = 0.0
+        self.alpha = 0.0
+        self.history.clear()
+        self.add_history()
+        self.fit.reset()
+        self.last_mark = None
+        self.start_recording()
         self.draw_plane()
+
+    # Поля тела, которые рабочий публикует в снимке
+    worker_fields = ('time', 'position', 'velocity', 'acceleration',
+                     'arrival_time', 'arrival_velocity', 'stopped')
+    
+    def stop_worker(self):
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+    
+    def apply_snapshot(self):
+        """Переносит последний снимок рабочего в self.body"""
+        snapshot = self.worker.snapshot()
+        body = self.body
+        body.time = snapshot['time']
+        body.position = snapshot['position']
+        body.velocity = snapshot['velocity']
+        body.acceleration = snapshot['acceleration']
+        for name in ('arrival_time', 'arrival_velocity'):
+            value = snapshot[name]
+            setattr(body, name, None if math.isnan(value) else value)
+        body.stopped = bool(snapshot['stopped'])
+        
+        # Снимок уже соответствует моменту кадра, интерполировать нечего
+        self.prev_position = body.position
+        self.alpha = 0.0
+    
+    def start_recording(self):
+        """Начинает запись нового прогона, если она включена"""
+        self.stop_recording()
+        if not self.record_var.get():
+            return
+        self.recorder = TrajectoryRecorder(
+            new_run_path('accel'), experiment='accel',
+            params={
+                'mass': self.body.mass,
+                'angle': self.angle_var.get(),
+                'friction': self.body.friction,
+                'stopper': self.plane_length / 100,
+                'restitution': self.body.restitution,
+                'units': {'time': "с", 'position': "м", 'velocity': "м/с",
+                          'acceleration': "м/с²", 'force': "Н"},
+            })
+
+    def mark_position(self):
+        """Отметка пути раз в кадр для оценки ускорения (до удара)"""
+        body = self.body
+        if body.arrival_time is None and body.time != self.last_mark:
+            self.fit.add(body.time, body.position)
+            self.last_mark = body.time
+    
+    def add_history(self):
+        self.history.append(self.body.time, self.body.position,
+                            self.body.velocity, self.body.acceleration)
+    
+    def record_body(self):
+        self.recorder.append(self.body.time, self.body.position,
+                             self.body.velocity, self.body.acceleration,
+                             self.body.mass * self.body.acceleration)
+    
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
     
     def draw_plane(self):
         """Отрисовывает наклонную плоскость с центрированием"""
-        self.canvas.delete("all")
         w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
-        
-        # Центр canvas
-        center_x, center_y = w//2, h//2
-        
-        # Длина и угол плоскости
-        self.plane_length = min(w, h) * 0.6  # Уменьшаем длину для центрирования
-        angle_rad = math.radians(self.angle_var.get())
-        
-        # Рассчитываем конечные точки (наклон ВНИЗ)
-        end_x = center_x + self.plane_length * math.cos(angle_rad)
-        end_y = center_y + self.plane_length * math.sin(angle_rad)  # "+" для наклона вниз
-        
-        # Рисуем плоскость
-        self.canvas.create_line(center_x, center_y, end_x, end_y, 
-                              fill=self.colors['plane'], width=5)
-        
-        # Рисуем ограничитель
-        self.canvas.create_rectangle(end_x-10, end_y-10, end_x+10, end_y+10,
-                                   fill=self.colors['stopper'], outline="")
+        self.scene.ensure_size(w, h)
+        self.plane_length = self.scene.plane_length
+        if self.body and self.body.stopper != self.plane_length / 100:
+            # Размер окна изменился - ограничитель переезжает
+            self.body.stopper = self.plane_length / 100
+            self.body.position = min(self.body.position, self.body.stopper)
+        self.scene.draw_plane(self.angle_var.get())
         
         # Рисуем тело если есть
-        if self.body:
-            self.draw_body()
-
+        self.draw_body()
 
-                                  
     def draw_body(self):
         """Отрисовывает тело с корректным позиционированием"""
-        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
-        center_x, center_y = w//2, h//2
-        angle_rad = math.radians(self.angle_var.get())
-        
-        # Максимальная позиция (в метрах)
-        max_pos = self.plane_length / 100  # 100 пикселей = 1 метр
-        
-        # Ограничиваем позицию
-        if self.body.position > max_pos:
-            self.body.position = max_pos
-            self.body.velocity = 0
-        
-        # Координаты тела (относительно центра)
-        pos_x = center_x + (self.body.position * 100) * math.cos(angle_rad)
-        pos_y = center_y + (self.body.position * 100) * math.sin(angle_rad)
+        if not self.body:
+            self.scene.draw_body(None)
+            return
         
-        self.canvas.create_oval(pos_x-15, pos_y-15, pos_x+15, pos_y+15,
-                              fill=self.colors['body'], outline="")
+        # Положение между двумя последними шагами физики
+        position = interpolate(self.prev_position, self.body.position, self.alpha)
+        self.scene.draw_body(position)
+
+    def on_canvas_resize(self, event):
+        """Перестраивает сцену при изменении размера canvas"""
+        if self.replay:
+            self.replay.show(self.replay.engine.sample())
+        else:
+            self.draw_plane()
 
+    def resume_simulation(self):
+        """Время до старта (или пока окно было свернуто) не идет в физику"""
+        self.clock.start()
+        self.profiler.pause()
+    
     def update_simulation(self):
         if not self.sim_running or not self.body:
             return
         
-        dt = 0.02
-        self.body.update(dt)
-        self.draw_plane()  # Всегда перерисовываем
-        
-        # Обновляем результаты
-        self.result_text.delete("1.0", "end")
-        results = [
-            f"Время: {self.body.time:.1f} с",
-            f"Пройдено: {self.body.position:.2f} м",
-            f"Скорость: {self.body.velocity:.2f} м/с",
-            f"Ускорение (эксп.): {self.body.acceleration:.2f} м/с²",
-            f"Ускорение (теор.): {self.calculate_theoretical_accel():.2f} м/с²"
-        ]
-        self.result_text.insert("1.0", "\n".join(results))
-        
-        self.after(20, self.update_simulation)
+        try:
+            self.profiler.begin_frame()
+            
+            # Выполняем столько шагов физики, сколько накопилось времени
+            with self.profiler.section('physics'):
+                if self.worker:
+                    # Физика идет в рабочем, окно берет только последний снимок
+                    sequence = self.worker.sequence
+                    self.apply_snapshot()
+                    if self.worker.sequence != sequence:
+                        self.add_history()
+                        if self.recorder:
+                            self.record_body()
+                else:
+                    steps, self.alpha = self.clock.advance()
+                    for _ in range(steps):
+                        self.prev_position = self.body.position
+                        self.body.update(self.clock.dt)
+                        self.add_history()
+                        if self.recorder:
+                            self.record_body()
+                self.mark_position()
+        except Exception as e:
+            self.simulation_failed(e)
     
-    def update_simulation(self):
+    def render_simulation(self):
         if not self.sim_running or not self.body:
             return
         
-        dt = 0.02  # Шаг времени 20 мс
-        self.body.update(dt)
-        self.draw_plane()
-        
-        # Обновляем результаты
+        try:
+            with self.profiler.section('render'):
+                self.draw_plane()
+                self.chart.refresh(self.history)
+            
+            # Обновляем результаты
+            with self.profiler.section('widgets'):
+                self.publish_results()
+                self.binder.refresh()
+            
+            self.profiler.end_frame()
+            if self.profiler.enabled:
+                self.hud.update()
+        except Exception as e:
+            self.simulation_failed(e)
+    
+    def simulation_failed(self, error):
+        """Останавливает симуляцию после ошибки в кадре"""
+        print(f"Ошибка в симуляции: {error}")
+        traceback.print_exc()
+        self.scheduler.unregister(self)
+        self.sim_running = False
+        self.start_btn.configure(text="Старт")
+    
+    def publish_results(self):
+        """Передает текущие значения модели в поля показаний"""
+        f = self.fields
+        f['time'].set(self.body.time)
+        f['position'].set(self.body.position)
+        f['velocity'].set(self.body.velocity)
+        fit = self.fit.result(confidence=None)
+        for name, key in (('fit', 'acceleration'), ('fit_se', 'acceleration_se')):
+            value = float(fit[key])
+            f[name].set(None if math.isnan(value) else value)
+        f['theory'].set(self.calculate_theoretical_accel())
+        f['arrival_time'].set(self.body.arrival_time)
+        f['arrival_velocity'].set(self.body.arrival_velocity)
+    
+    def show_spread(self, future):
+        """Показывает разброс Монте-Карло, если он для текущего прогона"""
+        if future is not self.spread_future:
+            return
+        self.fields['spread'].set(format_interval(future.result(), "м/с²"))
+        if self.body is not None and not self.replay:
+            # На паузе кадров нет - показываем сразу
+            self.binder.refresh(force=True)
+    
+    def show_message(self, text):
+        """Выводит текст в поле результатов вместо показаний"""
         self.result_text.delete("1.0", "end")
-        results = [
-            f"Время: {self.body.time:.1f} с",
-            f"Пройдено: {self.body.position:.2f} м",
-            f"Скорость: {self.body.velocity:.2f} м/с",
-            f"Ускорение (эксп.): {self.body.acceleration:.2f} м/с²",
-            f"Ускорение (теор.): {self.calculate_theoretical_accel():.2f} м/с²"
-        ]
-        self.result_text.insert("1.0", "\n".join(results))
-        
-        self.after(20, self.update_simulation)
+        self.result_text.insert("1.0", text)
+        self.binder.invalidate()
+    
+    def toggle_profiler(self):
+        """Включает замеры времени кадра и надпись со статистикой"""
+        self.profiler.enabled = self.profile_var.get()
+        if self.profiler.enabled:
+            self.profiler.reset()
+            self.hud.update(force=True)
+        else:
+            self.hud.hide()
+    
+    def export_trace(self):
+        """Сохраняет трассу кадров в формате Chrome trace events"""
+        if not self.profiler.frames:
+            self.show_message("Включите профилировщик и запустите симуляцию!")
+            return
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("Trace JSON", "*.json")],
+                                            initialfile="trace_accel.json")
+        if path:
+            self.profiler.export(path)
     
     def calculate_theoretical_accel(self):
         angle = math.radians(self.angle_var.get())
@@ -242,14 +499,68 @@ class AccelerationWindow(ctk.CTkToplevel):
                               self.friction_var.get() * math.cos(angle))
     
     def reset_simulation(self):
+        self.scheduler.unregister(self)
         self.sim_running = False
         self.start_btn.configure(text="Старт")
         self.body = None
-        self.canvas.delete("all")
-        self.result_text.delete("1.0", "end")
+        self.spread_future = None
+        self.stop_worker()
+        self.stop_recording()
+        self.show_message("")
+        self.history.clear()
+        self.chart.refresh(self.history, force=True)
         self.draw_plane()
     
+    def open_replay(self):
+        """Открывает записанный прогон для просмотра без пересчета"""
+        initial = RUNS_DIR if os.path.isdir(RUNS_DIR) else "."
+        path = filedialog.askdirectory(parent=self, initialdir=initial,
+                                       title="Выберите запись прогона")
+        if not path:
+            return
+        try:
+            engine = ReplayEngine(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.show_message(f"Не удалось открыть запись: {e}")
+            return
+        if not str(engine.experiment).startswith('accel'):
+            self.show_message("Это запись другого эксперимента!")
+            return
+        
+        if self.replay:
+            self.replay.close()
+        self.reset_simulation()
+        self.replay = ReplayPanel(self.simulation_frame, engine,
+                                  self.show_replay_frame, self.on_replay_closed,
+                                  self.scheduler)
+        self.replay.pack(fill="x", padx=20, pady=(0,10))
+        self.replay.show(engine.sample())
+    
+    def show_replay_frame(self, sample):
+        """Рисует кадр записи"""
+        engine = self.replay.engine
+        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        self.scene.ensure_size(w, h)
+        self.scene.draw_plane(engine.params.get('angle', self.angle_var.get()))
+        self.scene.draw_body(sample['position'])
+        
+        results = [
+            f"Запись: {os.path.basename(engine.reader.path)}",
+            f"Время: {sample['time']:.2f} с",
+            f"Пройдено: {sample['position']:.2f} м",
+            f"Скорость: {sample['velocity']:.2f} м/с",
+            f"Ускорение: {sample['acceleration']:.2f} м/с²",
+        ]
+        self.show_message("\n".join(results))
+    
+    def on_replay_closed(self):
+        self.replay = None
+        self.reset_simulation()
+    
     def on_close(self):
         """Восстанавливаем главное окно при закрытии"""
+        self.scheduler.unregister(self)
+        self.stop_worker()
+        self.stop_recording()
         self.master.deiconify()  # Исправлено: восстанавливаем окно
         self.destroy()
\ No newline at end of file
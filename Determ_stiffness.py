@@ -1,58 +1,26 @@
 import customtkinter as ctk
+import functools
 import math
+import os
 import time
-
-class SimpleSpring:
-    """Простая реализация физики пружины без pymunk"""
-    def __init__(self, k, rest_length, mass, damping=0.2):
-        # Параметры
-        self.k = k / 1000.0  # Жесткость (Н/мм)
-        self.rest_length = rest_length  # Длина покоя (мм)
-        self.mass = mass  # Масса груза (кг)
-        self.damping = damping  # Коэффициент затухания
-        
-        # Состояние
-        self.anchor_pos = (0, 200)  # Верхняя точка крепления
-        self.weight_pos = (0, 200 + rest_length)  # Положение груза
-        self.velocity = 0  # Скорость по вертикали (мм/с)
-        self.force = 0  # Текущая сила (Н)
-        self.gravity = 9.81  # Ускорение свободного падения (м/с^2)
-    
-    def set_anchor_x(self, x):
-        """Устанавливает горизонтальную позицию точки крепления"""
-        self.anchor_pos = (x, self.anchor_pos[1])
-        self.weight_pos = (x, self.weight_pos[1])
-    
-    def step(self, dt):
-        """Обновление физики за шаг времени dt (в секундах)"""
-        # Вычисляем текущую длину пружины
-        extension = self.weight_pos[1] - self.anchor_pos[1]
-        
-        # Вычисляем силу упругости: F = -k * (x - L0)
-        # Отрицательная при растяжении (пружина тянет вверх)
-        spring_force = -self.k * (extension - self.rest_length)
-        
-        # Сила тяжести: F = m * g (положительная вниз)
-        gravity_force = self.mass * self.gravity
-        
-        # Сила трения (демпфирования): F = -c * v (противоположна скорости)
-        damping_force = -self.damping * self.velocity
-        
-        # Суммарная сила
-        total_force = spring_force + gravity_force + damping_force
-        self.force = total_force
-        
-        # Ускорение: F = m * a -> a = F / m
-        acceleration = total_force / self.mass
-        
-        # Обновление скорости: v = v0 + a * dt
-        self.velocity += acceleration * dt
-        
-        # Обновление позиции: y = y0 + v * dt
-        new_y = self.weight_pos[1] + self.velocity * dt
-        self.weight_pos = (self.weight_pos[0], new_y)
-        
-        return extension - self.rest_length  # Возвращаем величину растяжения
+import numpy as np
+from tkinter import filedialog
+from campaign import CampaignRun, format_campaign
+from convergence import ConvergenceDetector
+from frequency import OscillationTracker
+from charts import ChartScene, MinMaxBuffer
+from bindings import Binder, Debouncer, Observable
+from montecarlo import format_interval, submit_montecarlo
+from profiler import FrameProfiler, ProfilerHUD
+from recorder import RUNS_DIR, TrajectoryRecorder, new_run_path
+from replay import ReplayEngine
+from widgets import ReplayPanel
+from chain import SpringChain
+from models import SimpleSpring, SPRING_TYPES
+from scenes import SpringScene
+from scheduler import FrameScheduler
+from timestep import FixedTimestep, interpolate
+from worker import MODE_TITLES, PhysicsWorker
 
 class StiffnessWindow(ctk.CTkToplevel):
     def __init__(self, master):
@@ -81,11 +49,49 @@ class StiffnessWindow(ctk.CTkToplevel):
         self.sim_running = False
         self.spring = None  # Объект пружины
         
+        # Физика идет фиксированным шагом, отрисовка интерполируется
+        self.physics_rate = 500  # Шагов физики в секунду
+        self.clock = FixedTimestep(self.physics_rate)
+        self.prev_weight_y = 0.0
+        self.alpha = 0.0
+        
+        # Стабилизация проверяется каждые 20 мс времени симуляции
+        self.sample_every = max(1, round(0.02 / self.clock.dt))
+        self.steps_since_sample = 0
+        
+        # Запись траектории прогона и ее воспроизведение
+        self.recorder = None
+        self.replay = None
+        
+        # Физика в отдельном потоке/процессе (None - в потоке Tk)
+        self.worker = None
+        
+        # Кадры задает общий планировщик главного окна
+        self.scheduler = getattr(master, 'scheduler', None) or FrameScheduler(self)
+        self.make_spring = None
+        
+        # Покадровые замеры времени
+        self.profiler = FrameProfiler()
+        
+        # Показания обновляются 10 раз в секунду и только при изменении
+        self.extension_field = Observable(0.0)
+        self.force_field = Observable(0.0)
+        self.campaign_field = Observable()
+        self.binder = Binder(rate=10)
+        
+        # Серия нагрузок считается по частям в кадрах планировщика
+        self.campaign = None
+        
+        # Изменения параметров ползунками применяются с задержкой
+        self.apply_later = Debouncer(self, self.apply_parameters,
+                                     delay=50, max_wait=100)
+        
         self.spring_params = {
             'k': 500,           # Жесткость (Н/м)
             'rest_length': 100, # Длина в покое (мм)
             'mass': 0.1,        # Масса груза (кг)
-            'damping': 0.2      # Демпфирование
+            'damping': 0.2,     # Демпфирование
+            'spring_mass': 0.05 # Масса пружины для цепочки (кг)
         }
         
         # Цвета для темной темы
@@ -102,8 +108,11 @@ class StiffnessWindow(ctk.CTkToplevel):
         
         # Параметры измерений
         self.extension = 0      # Текущее растяжение
-        self.last_extensions = []  # История растяжений для определения стабилизации
+        # Стабилизация: размах растяжения за 20 отсчетов меньше 0.1 мм
+        self.stability = ConvergenceDetector(window=20, tolerance=0.1)
         self.measurements_ready = False
+        # Частота и затухание по самим колебаниям (не нужно ждать покоя)
+        self.oscillation = OscillationTracker()
         
         # Размеры canvas
         self.canvas_width = 800
@@ -123,6 +132,21 @@ class StiffnessWindow(ctk.CTkToplevel):
         self.canvas = ctk.CTkCanvas(self.simulation_frame, bg=self.colors['background'])
         self.canvas.pack(expand=True, fill="both", padx=20, pady=20)
         self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.scene = SpringScene(self.canvas, self.colors)
+        self.hud = ProfilerHUD(self.canvas, self.profiler)
+        
+        # Графики растяжения и силы за весь прогон
+        self.history = MinMaxBuffer(2)
+        self.chart_canvas = ctk.CTkCanvas(self.simulation_frame, height=140,
+                                          bg=self.colors['background'],
+                                          highlightthickness=0)
+        self.chart_canvas.pack(fill="x", padx=20)
+        self.chart = ChartScene(self.chart_canvas, self.colors, [
+            ("Растяжение, мм", self.colors['spring']),
+            ("F, Н", self.colors['weight']),
+        ])
+        self.chart_canvas.bind("<Configure>",
+                               lambda e: self.chart.refresh(self.history, force=True))
         
         # Информационная панель
         self.info_frame = ctk.CTkFrame(self.simulation_frame)
@@ -137,6 +161,10 @@ class StiffnessWindow(ctk.CTkToplevel):
                                        text="Сила: 0.0 Н", 
                                        font=ctk.CTkFont(size=14))
         self.force_label.pack(side="right", padx=10)
+        
+        self.binder.label(self.extension_label, "Растяжение: {:.1f} мм",
+                          self.extension_field)
+        self.binder.label(self.force_label, "Сила: {:.2f} Н", self.force_field)
 
         # Правая панель - управление
         self.create_control_widgets()
@@ -152,7 +180,7 @@ class StiffnessWindow(ctk.CTkToplevel):
         self.spring_var = ctk.StringVar(value="Стальная")
         ctk.CTkLabel(self.control_frame, text="Тип пружины:").pack(pady=(10,0))
         spring_combo = ctk.CTkComboBox(self.control_frame, 
-                                    values=["Стальная", "Медная", "Титановая"],
+                                    values=list(SPRING_TYPES),
                                     variable=self.spring_var,
                                     command=self.change_spring_type)
         spring_combo.pack(pady=5, padx=10)
@@ -166,6 +194,7 @@ class StiffnessWindow(ctk.CTkToplevel):
                                   to=1000,
                                   command=self.update_load_label)
         load_slider.pack(pady=5, padx=10)
+        load_slider.bind("<ButtonRelease-1>", self.on_slider_release, add="+")
         self.load_label = ctk.CTkLabel(self.control_frame, text="100 г")
         self.load_label.pack()
 
@@ -183,6 +212,45 @@ class StiffnessWindow(ctk.CTkToplevel):
                                 text="Сброс", 
                                 command=self.reset_simulation)
         reset_btn.pack(side="left", padx=5)
+        
+        self.record_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self.control_frame, 
+                       text="Записывать прогон", 
+                       variable=self.record_var).pack(pady=(0,10))
+        
+        replay_btn = ctk.CTkButton(self.control_frame, 
+                                 text="Повтор записи", 
+                                 command=self.open_replay)
+        replay_btn.pack(pady=(0,10))
+        
+        # Живой режим: ползунки меняют параметры без перезапуска
+        self.live_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(self.control_frame, 
+                     text="Менять параметры на ходу", 
+                     variable=self.live_var).pack(pady=(0,10))
+        
+        # Где считается физика; смена режима сбрасывает симуляцию
+        physics_frame = ctk.CTkFrame(self.control_frame, fg_color="transparent")
+        physics_frame.pack(pady=(0,10))
+        ctk.CTkLabel(physics_frame, text="Физика:").pack(side="left", padx=5)
+        self.physics_mode_var = ctk.StringVar(value="В окне")
+        ctk.CTkOptionMenu(physics_frame, 
+                         values=list(MODE_TITLES), 
+                         variable=self.physics_mode_var,
+                         width=110,
+                         command=lambda _: self.reset_simulation()).pack(side="left", padx=5)
+        
+        profile_frame = ctk.CTkFrame(self.control_frame, fg_color="transparent")
+        profile_frame.pack(pady=(0,10))
+        self.profile_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(profile_frame, 
+                       text="Профилировщик", 
+                       variable=self.profile_var,
+                       command=self.toggle_profiler).pack(side="left", padx=5)
+        ctk.CTkButton(profile_frame, 
+                     text="Экспорт трассы", 
+                     width=110,
+                     command=self.export_trace).pack(side="left", padx=5)
 
         # Слайдер жесткости
         self.k_var = ctk.DoubleVar(value=self.spring_params['k'])
@@ -193,6 +261,7 @@ class StiffnessWindow(ctk.CTkToplevel):
                                     to=5000,
                                     command=self.update_k_label)
         self.k_slider.pack(pady=5, padx=10)
+        self.k_slider.bind("<ButtonRelease-1>", self.on_slider_release, add="+")
         self.k_label = ctk.CTkLabel(self.control_frame, text=f"{self.k_var.get():.0f} Н/м")
         self.k_label.pack()
 
@@ -205,9 +274,22 @@ class StiffnessWindow(ctk.CTkToplevel):
                                        to=1,
                                        command=self.update_damp_label)
         self.damp_slider.pack(pady=5, padx=10)
+        self.damp_slider.bind("<ButtonRelease-1>", self.on_slider_release, add="+")
         self.damp_label = ctk.CTkLabel(self.control_frame, text=f"{self.damp_var.get():.1f}")
         self.damp_label.pack()
         
+        # Масштаб времени (логарифмическая шкала 0.1x .. 100x)
+        self.time_scale_var = ctk.DoubleVar(value=0)
+        ctk.CTkLabel(self.control_frame, text="Скорость времени:").pack(pady=(10,0))
+        self.time_scale_slider = ctk.CTkSlider(self.control_frame, 
+                                             variable=self.time_scale_var,
+                                             from_=-1, 
+                                             to=2,
+                                             command=self.update_time_scale)
+        self.time_scale_slider.pack(pady=5, padx=10)
+        self.time_scale_label = ctk.CTkLabel(self.control_frame, text="1.0×")
+        self.time_scale_label.pack()
+        
         # Поле для результатов
         result_frame = ctk.CTkFrame(self.control_frame)
         result_frame.pack(pady=(20,10), fill="x", padx=10)
@@ -223,6 +305,41 @@ class StiffnessWindow(ctk.CTkToplevel):
                                    text="Измерить жесткость", 
                                    command=self.measure_stiffness)
         measure_btn.pack(pady=10)
+        
+        oscillation_btn = ctk.CTkButton(result_frame, 
+                                       text="Измерить по колебаниям", 
+                                       command=self.measure_by_oscillation)
+        oscillation_btn.pack(pady=(0,10))
+        
+        self.campaign_btn = ctk.CTkButton(result_frame, 
+                                          text="Серия измерений", 
+                                          command=self.run_campaign)
+        self.campaign_btn.pack(pady=(0,10))
+        
+        self.campaign_label = ctk.CTkLabel(result_frame, text="")
+        self.campaign_label.pack(pady=(0,10))
+        self.binder.label(self.campaign_label, "Серия: {:.0%}",
+                          self.campaign_field)
+        
+        # Пружина с распределенной массой: цепочка грузиков
+        chain_frame = ctk.CTkFrame(result_frame, fg_color="transparent")
+        chain_frame.pack(pady=(0,10))
+        self.chain_var = ctk.BooleanVar(value=False)
+        ctk.CTkSwitch(chain_frame, 
+                     text="Пружина с массой, узлов:", 
+                     variable=self.chain_var,
+                     command=self.reset_simulation).pack(side="left", padx=5)
+        self.nodes_var = ctk.StringVar(value="100")
+        ctk.CTkComboBox(chain_frame, 
+                       width=80,
+                       values=["10", "100", "1000", "10000"],
+                       variable=self.nodes_var,
+                       command=lambda value: self.reset_simulation()).pack(side="left", padx=5)
+        
+        modes_btn = ctk.CTkButton(result_frame, 
+                                 text="Собственные частоты", 
+                                 command=self.show_normal_modes)
+        modes_btn.pack(pady=(0,10))
 
     def check_canvas_size(self):
         """Проверяет готовность canvas и инициализирует симуляцию"""
@@ -241,7 +358,10 @@ class StiffnessWindow(ctk.CTkToplevel):
             self.canvas_height = event.height
             if self.canvas_ready:
                 self.update_spring_position()
-                self.draw_simulation()
+                if self.replay:
+                    self.replay.show(self.replay.engine.sample())
+                else:
+                    self.draw_simulation()
 
     def update_spring_position(self):
         """Обновляет позицию пружины при изменении размеров окна"""
@@ -253,37 +373,161 @@ class StiffnessWindow(ctk.CTkToplevel):
         if not self.canvas_ready:
             return
         
+        # Новая пружина - новая запись
+        self.stop_worker()
+        self.stop_recording()
+        
         # Сбрасываем флаги и параметры
         self.measurements_ready = False
-        self.last_extensions = []
+        self.stability.reset()
+        self.oscillation.reset()
         
         # Создаем пружину с грузом
         mass = self.load_var.get() / 1000  # г -> кг
-        self.spring = SimpleSpring(
-            k=self.spring_params['k'],
-            rest_length=self.spring_params['rest_length'],
-            mass=mass,
-            damping=self.spring_params['damping']
-        )
+        if self.chain_var.get():
+            self.make_spring = functools.partial(
+                SpringChain,
+                k=self.spring_params['k'],
+                rest_length=self.spring_params['rest_length'],
+                mass=mass,
+                nodes=int(self.nodes_var.get()),
+                spring_mass=self.spring_params['spring_mass'],
+                damping=self.spring_params['damping']
+            )
+        else:
+            self.make_spring = functools.partial(
+                SimpleSpring,
+                k=self.spring_params['k'],
+                rest_length=self.spring_params['rest_length'],
+                mass=mass,
+                damping=self.spring_params['damping']
+            )
+        self.spring = self.make_spring()
         
         # Центрируем пружину по ширине canvas
         self.spring.set_anchor_x(self.canvas_width/2)
+        self.prev_weight_y = self.spring.weight_pos[1]
+        self.alpha = 0.0
+        self.steps_since_sample = 0
+        self.history.clear()
+        self.chart.refresh(self.history, force=True)
         
         # Обновляем вывод параметров
         self.extension = 0
-        self.extension_label.configure(text=f"Растяжение: {self.extension:.1f} мм")
-        force = self.load_var.get() / 1000 * 9.81
-        self.force_label.configure(text=f"Сила: {force:.2f} Н")
+        self.extension_field.set(self.extension)
+        self.force_field.set(self.load_var.get() / 1000 * 9.81)
+        self.binder.refresh(force=True)
         
         # Отрисовываем начальное состояние
         self.draw_simulation()
 
     def toggle_simulation(self):
         """Запускает/останавливает симуляцию"""
+        if self.replay:
+            self.replay.close()
         self.sim_running = not self.sim_running
         self.start_btn.configure(text="Пауза" if self.sim_running else "Старт")
         if self.sim_running:
-            self.update_simulation()
+            if self.recorder is None:
+                self.start_recording()
+            self.start_worker()
+            self.resume_simulation()
+            self.scheduler.register(self, self.update_simulation,
+                                    self.render_simulation,
+                                    resume=self.resume_simulation)
+        else:
+            self.scheduler.unregister(self)
+            # Последние значения показываются сразу, без ожидания
+            self.binder.refresh(force=True)
+            self.chart.refresh(self.history, force=True)
+            if self.worker:
+                self.worker.pause()
+            if self.recorder:
+                self.recorder.flush()
+
+    def start_worker(self):
+        """Запускает фоновую физику или продолжает ее после паузы"""
+        if self.worker:
+            self.worker.resume()
+            return
+        mode = MODE_TITLES[self.physics_mode_var.get()]
+        if not mode or not self.make_spring:
+            return
+        if isinstance(self.spring, SpringChain):
+            fields = ('time', 'positions', 'velocities', 'force')
+        else:
+            fields = ('time', 'weight_pos', 'velocity', 'force')
+        self.worker = PhysicsWorker(self.make_spring, fields, step='step',
+                                    mode=mode, physics_rate=self.physics_rate,
+                                    time_scale=self.clock.time_scale)
+        self.worker.start()
+
+    def stop_worker(self):
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+
+    def apply_snapshot(self):
+        """Переносит последний снимок рабочего в self.spring"""
+        snapshot = self.worker.snapshot()
+        spring = self.spring
+        spring.time = snapshot['time']
+        spring.force = snapshot['force']
+        if isinstance(spring, SpringChain):
+            np.copyto(spring.positions, snapshot['positions'])
+            np.copyto(spring.velocities, snapshot['velocities'])
+            np.copyto(spring.previous, spring.positions)
+            self.extension = spring.extension()
+        else:
+            # Рабочий не знает ширину canvas: x берется у точки крепления
+            y = float(snapshot['weight_pos'][1])
+            spring.weight_pos = (spring.anchor_pos[0], y)
+            spring.velocity = snapshot['velocity']
+            self.extension = y - spring.anchor_pos[1] - spring.rest_length
+        
+        # Снимок уже соответствует моменту кадра, интерполировать нечего
+        self.prev_weight_y = spring.weight_pos[1]
+        self.alpha = 0.0
+
+    def start_recording(self):
+        """Начинает запись нового прогона, если она включена"""
+        if not self.record_var.get() or not self.spring:
+            return
+        self.recorder = TrajectoryRecorder(
+            new_run_path('spring'), experiment='spring',
+            params={
+                'k': self.k_var.get(),
+                'load': self.load_var.get(),
+                'damping': self.spring.damping,
+                'rest_length': self.spring.rest_length,
+                'units': {'time': "с", 'position': "мм", 'velocity': "мм/с",
+                          'acceleration': "мм/с²", 'force': "Н"},
+            })
+
+    def track_oscillation(self):
+        """Передает текущее растяжение и скорость груза оценке частоты"""
+        spring = self.spring
+        x = spring.weight_pos[1] - spring.anchor_pos[1] - spring.rest_length
+        self.oscillation.add(spring.time, x, spring.velocity)
+
+    def add_history(self):
+        self.history.append(self.spring.time, self.extension, self.spring.force)
+
+    def record_spring(self):
+        self.recorder.append(self.spring.time, self.extension,
+                             self.spring.velocity,
+                             self.spring.force / self.spring.mass,
+                             self.spring.force)
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def resume_simulation(self):
+        """Время до старта (или пока окно было свернуто) не идет в физику"""
+        self.clock.start()
+        self.profiler.pause()
 
     def update_simulation(self):
         """Обновляет состояние физической симуляции"""
@@ -291,173 +535,136 @@ class StiffnessWindow(ctk.CTkToplevel):
             return
             
         try:
-            # Обновляем физику с малым шагом времени
-            dt = 0.02  # 20 мс
-            self.extension = self.spring.step(dt)
+            self.profiler.begin_frame()
             
-            # Обновляем отображение
-            self.extension_label.configure(text=f"Растяжение: {self.extension:.1f} мм")
-            force = self.load_var.get() / 1000 * 9.81
-            self.force_label.configure(text=f"Сила: {force:.2f} Н")
+            # Выполняем столько шагов физики, сколько накопилось времени
+            with self.profiler.section('physics'):
+                if self.worker:
+                    # Физика идет в рабочем, окно берет только последний
+                    # снимок; стабилизация проверяется раз в кадр
+                    sequence = self.worker.sequence
+                    self.apply_snapshot()
+                    if self.worker.sequence != sequence:
+                        self.track_oscillation()
+                        self.add_history()
+                        if self.recorder:
+                            self.record_spring()
+                        self.check_stabilization()
+                else:
+                    steps, self.alpha = self.clock.advance()
+                    for _ in range(steps):
+                        self.prev_weight_y = self.spring.weight_pos[1]
+                        self.extension = self.spring.step(self.clock.dt)
+                        self.track_oscillation()
+                        self.add_history()
+                        if self.recorder:
+                            self.record_spring()
+                        
+                        self.steps_since_sample += 1
+                        if self.steps_since_sample >= self.sample_every:
+                            self.steps_since_sample = 0
+                            self.check_stabilization()
+        except Exception as e:
+            self.simulation_failed(e)
+
+    def render_simulation(self):
+        """Обновляет показания и отрисовку после шага физики"""
+        if not self.sim_running or not self.spring:
+            return
             
-            # Проверяем стабилизацию системы
-            self.last_extensions.append(self.extension)
-            if len(self.last_extensions) > 20:  # Храним последние 20 значений
-                self.last_extensions.pop(0)
-                
-                # Если отклонение меньше 0.1 мм, считаем систему стабилизированной
-                if len(self.last_extensions) == 20:
-                    max_ext = max(self.last_extensions)
-                    min_ext = min(self.last_extensions)
-                    if max_ext - min_ext < 0.1 and not self.measurements_ready:
-                        self.measurements_ready = True
+        try:
+            # Обновляем отображение
+            with self.profiler.section('widgets'):
+                self.extension_field.set(self.extension)
+                self.force_field.set(self.load_var.get() / 1000 * 9.81)
+                self.binder.refresh()
             
             # Обновляем отрисовку
-            self.draw_simulation()
+            with self.profiler.section('render'):
+                self.draw_simulation()
+                self.chart.refresh(self.history)
             
-            # Планируем следующее обновление
-            self.after(20, self.update_simulation)
+            self.profiler.end_frame()
+            if self.profiler.enabled:
+                self.hud.update()
         except Exception as e:
-            print(f"Ошибка в симуляции: {e}")
-            import traceback
-            traceback.print_exc()
-            self.sim_running = False
-            self.start_btn.configure(text="Старт")
+            self.simulation_failed(e)
+
+    def simulation_failed(self, error):
+        """Останавливает симуляцию после ошибки в кадре"""
+        print(f"Ошибка в симуляции: {error}")
+        import traceback
+        traceback.print_exc()
+        self.scheduler.unregister(self)
+        self.sim_running = False
+        self.start_btn.configure(text="Старт")
+
+    def check_stabilization(self):
+        """Проверяет стабилизацию системы по истории растяжений"""
+        if self.stability.update(self.extension, self.spring.velocity):
+            self.measurements_ready = True
 
     def draw_simulation(self):
         """Отрисовывает текущее состояние симуляции"""
         if not self.spring:
             return
             
-        self.canvas.delete("all")
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
         
-        # Рисуем лабораторный стенд
-        self.draw_laboratory_stand(width, height)
-        
-        # Рисуем пружину
-        anchor_pos = self.spring.anchor_pos
-        weight_pos = self.spring.weight_pos
-        self.draw_zigzag_spring(anchor_pos, weight_pos)
+        # Стенд пересоздается только при изменении размера canvas
+        self.scene.ensure_size(width, height)
         
-        # Рисуем груз
-        self.draw_weight(weight_pos)
+        label = f"{self.load_var.get()}г"
+        if isinstance(self.spring, SpringChain):
+            # Витки проходят через узлы цепочки
+            coil = self.spring.coil_points(2 * self.scene.segments + 1, self.alpha)
+            self.scene.draw_chain(self.spring.anchor_pos, coil, label)
+            return
         
-        # Рисуем линейку
-        self.draw_ruler(weight_pos[0] + 50, anchor_pos[1], weight_pos[1])
+        # Пружина, груз и линейка только сдвигаются
+        # Положение груза между двумя последними шагами физики
+        x, y = self.spring.weight_pos
+        weight_pos = (x, interpolate(self.prev_weight_y, y, self.alpha))
+        self.scene.draw(self.spring.anchor_pos, weight_pos, label)
+
+    def toggle_profiler(self):
+        """Включает замеры времени кадра и надпись со статистикой"""
+        self.profiler.enabled = self.profile_var.get()
+        if self.profiler.enabled:
+            self.profiler.reset()
+            self.hud.update(force=True)
+        else:
+            self.hud.hide()
 
-    def draw_zigzag_spring(self, p1, p2):
-        """Рисует пружину в виде зигзага между двумя точками"""
-        # Параметры зигзага
-        zigzag_width = 15
-        segments = 12
-        
-        # Вычисляем направление
-        dx = p2[0] - p1[0]
-        dy = p2[1] - p1[1]
-        
-        # Создаем точки зигзага
-        points = []
-        points.append((p1[0], p1[1]))
-        
-        for i in range(1, segments):
-            t = i / segments
-            # Основная линия
-            x = p1[0] + dx * t
-            y = p1[1] + dy * t
-            
-            # Добавляем зигзаг влево/вправо
-            zigzag_factor = zigzag_width if i % 2 else -zigzag_width
-            points.append((x + zigzag_factor, y))
-        
-        points.append((p2[0], p2[1]))
-        
-        # Рисуем зигзаг
-        for i in range(len(points) - 1):
-            self.canvas.create_line(points[i][0], points[i][1], 
-                                 points[i+1][0], points[i+1][1], 
-                                 fill=self.colors['spring'], width=3)
-
-    def draw_weight(self, pos):
-        """Рисует груз по указанной позиции"""
-        x, y = pos
-        self.canvas.create_oval(x-20, y-20, x+20, y+20, 
-                             fill=self.colors['weight'], outline="")
-        # Надпись с массой
-        self.canvas.create_text(x, y, text=f"{self.load_var.get()}г", 
-                             fill=self.colors['text'], font=("Arial", 10, "bold"))
-
-    def draw_laboratory_stand(self, width, height):
-        """Рисует лабораторный стенд"""
-        stand_width = 40
-        stand_height = height - 100
-        stand_x = width/2 - stand_width/2
-        
-        # Основание стойки
-        self.canvas.create_rectangle(stand_x - 20, 100, 
-                                  stand_x + stand_width + 20, 130, 
-                                  fill=self.colors['stand'], outline="")
-        
-        # Вертикальная стойка
-        self.canvas.create_rectangle(stand_x, 100, 
-                                  stand_x + stand_width, stand_height, 
-                                  fill=self.colors['stand'], outline="")
-        
-        # Кронштейн для крепления
-        bracket_width = 80
-        self.canvas.create_rectangle(stand_x + stand_width, 180, 
-                                  stand_x + stand_width + bracket_width, 200, 
-                                  fill=self.colors['stand'], outline="")
-        
-        # Точка крепления
-        if self.spring:
-            x, y = self.spring.anchor_pos
-            self.canvas.create_oval(x-5, y-5, x+5, y+5, 
-                                fill=self.colors['anchor'], outline="")
-
-    def draw_ruler(self, x, y_start, y_end):
-        """Рисует линейку для измерения растяжения"""
-        # Проверяем корректность аргументов
-        if not all(isinstance(val, (int, float)) for val in (x, y_start, y_end)):
+    def export_trace(self):
+        """Сохраняет трассу кадров в формате Chrome trace events"""
+        if not self.profiler.frames:
+            self.result_text.delete("1.0", "end")
+            self.result_text.insert("1.0", "Включите профилировщик и запустите симуляцию!")
             return
-        
-        # Убеждаемся, что конечная точка не меньше начальной
-        if y_end < y_start:
-            y_start, y_end = y_end, y_start
-        
-        # Основная линия линейки
-        ruler_width = 5
-        self.canvas.create_rectangle(x, y_start, x + ruler_width, y_end, 
-                                 fill=self.colors['ruler'], outline="")
-        
-        # Деления
-        tick_length = 10
-        range_length = max(0, int(y_end - y_start))
-        
-        for i in range(0, range_length + 10, 10):
-            y = y_start + i
-            if y > y_end:
-                break
-                
-            tick_len = tick_length if i % 50 == 0 else tick_length / 2
-            self.canvas.create_line(x, y, x + tick_len, y, fill="black", width=1)
-            
-            # Подписи
-            if i % 50 == 0:
-                self.canvas.create_text(x + tick_len + 10, y, text=str(i), 
-                                    anchor="w", fill=self.colors['text'])
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("Trace JSON", "*.json")],
+                                            initialfile="trace_spring.json")
+        if path:
+            self.profiler.export(path)
+
+    def update_time_scale(self, value):
+        """Обновляет масштаб времени симуляции"""
+        self.clock.set_time_scale(10 ** float(value))
+        self.time_scale_label.configure(text=f"{self.clock.time_scale:.1f}×")
+        if self.worker:
+            self.worker.set_time_scale(self.clock.time_scale)
 
     def change_spring_type(self, spring_type):
         """Меняет параметры в зависимости от типа пружины"""
+        if spring_type in SPRING_TYPES:
+            self.k_var.set(SPRING_TYPES[spring_type])
         if spring_type == "Стальная":
-            self.k_var.set(500)
             self.colors['spring'] = "#ff5d5d"
         elif spring_type == "Медная":
-            self.k_var.set(300)
             self.colors['spring'] = "#f9c74f"
         elif spring_type == "Титановая":
-            self.k_var.set(1200)
             self.colors['spring'] = "#4cc9f0"
             
         self.update_k_label(self.k_var.get())
@@ -465,18 +672,22 @@ class StiffnessWindow(ctk.CTkToplevel):
 
     def reset_simulation(self):
         """Сбрасывает симуляцию"""
+        self.apply_later.cancel()
+        
         # Останавливаем симуляцию
+        self.scheduler.unregister(self)
         self.sim_running = False
         self.start_btn.configure(text="Старт")
         
         # Сбрасываем параметры
         self.extension = 0
-        self.last_extensions = []
+        self.stability.reset()
         self.measurements_ready = False
         
         # Обновляем отображение
-        self.extension_label.configure(text="Растяжение: 0.0 мм")
-        self.force_label.configure(text="Сила: 0.0 Н")
+        self.extension_field.set(0.0)
+        self.force_field.set(0.0)
+        self.binder.refresh(force=True)
         
         # Пересоздаем симуляцию
         self.setup_simulation()
@@ -508,28 +719,230 @@ class StiffnessWindow(ctk.CTkToplevel):
         # Погрешность
         error = abs(measured_k - self.k_var.get()) / self.k_var.get() * 100
         result += f"Заданная жесткость: {self.k_var.get():.1f} Н/м\n"
-        result += f"Погрешность: {error:.1f}%"
+        result += f"Погрешность: {error:.1f}%\n"
+        
+        # Разброс измерений из-за погрешностей приборов (метод Монте-Карло)
+        # считается в фоне; строка отчета дописывается, когда он готов
+        result += "Разброс (МК, 95%): "
+        pending = result + "считается…"
+        self.result_text.insert("1.0", pending)
+        future = submit_montecarlo('stiffness', {'k': self.k_var.get(),
+                                                 'load': self.load_var.get()})
+
+        def finish(done):
+            spread = format_interval(done.result(), "Н/м", digits=1)
+            self.finish_report(pending, result + spread)
+        self.scheduler.when_done(self, future, finish)
+
+    def finish_report(self, pending, report):
+        """Заменяет отчет готовым, если в поле все еще он, а не другой"""
+        if self.result_text.get("1.0", "end-1c") == pending:
+            self.result_text.delete("1.0", "end")
+            self.result_text.insert("1.0", report)
+
+    def measure_by_oscillation(self):
+        """Измеряет жесткость по периоду и затуханию колебаний: k = m*w0^2"""
+        self.result_text.delete("1.0", "end")
+        if not self.oscillation.ready:
+            if self.spring and self.spring.time > 0:
+                message = ("Нужно хотя бы три крайних положения груза "
+                           "(полтора периода). При сильном затухании "
+                           "колебаний нет - измерьте по растяжению.")
+            else:
+                message = "Запустите симуляцию!"
+            self.result_text.insert("1.0", message)
+            return
         
+        # У пружины с массой колеблется и треть ее массы (по Рэлею)
+        mass = self.load_var.get() / 1000
+        if isinstance(self.spring, SpringChain):
+            mass += self.spring.spring_mass / 3
+        estimate = {key: float(value) for key, value
+                    in self.oscillation.result(mass).items()}
+        
+        error = abs(estimate['k'] - self.k_var.get()) / self.k_var.get() * 100
+        result = (f"Период: {1 / estimate['frequency']:.3f} с "
+                  f"(частота {estimate['frequency']:.4f} Гц)\n"
+                  f"Затухание: {estimate['gamma']:.4f} 1/с\n"
+                  f"Собственная частота: {estimate['omega0']:.4f} рад/с\n"
+                  f"Измеренная жесткость: {estimate['k']:.1f} Н/м\n"
+                  f"Заданная жесткость: {self.k_var.get():.1f} Н/м\n"
+                  f"Погрешность: {error:.2f}%\n"
+                  f"Растяжение в равновесии: {estimate['equilibrium']:.2f} мм\n"
+                  f"Готово через {float(self.oscillation.ready_time):.1f} с "
+                  f"({estimate['periods']:g} периода)")
         self.result_text.insert("1.0", result)
 
+    def show_normal_modes(self):
+        """Выводит частоты собственных колебаний текущей модели"""
+        if not self.spring:
+            return
+        if isinstance(self.spring, SpringChain):
+            frequencies = self.spring.normal_modes(5)
+            title = f"Цепочка из {self.spring.nodes} узлов"
+        else:
+            _, omega2 = self.spring.oscillator()
+            frequencies = [math.sqrt(omega2) / (2 * math.pi)]
+            title = "Невесомая пружина"
+        
+        self.result_text.delete("1.0", "end")
+        result = f"{title}\nСобственные частоты:\n"
+        result += "\n".join(f"  {i}: {f:.3f} Гц" for i, f in enumerate(frequencies, 1))
+        self.result_text.insert("1.0", result)
+
+    def run_campaign(self):
+        """Снимает серию нагрузок и подбирает k по F = k*x
+
+        Серия шагает в кадрах планировщика, не больше campaign_budget
+        секунд за кадр, чтобы окно не замирало на время расчета.
+        """
+        if self.campaign is not None:
+            return
+        self.campaign = CampaignRun(k=self.k_var.get(),
+                                    rest_length=self.spring_params['rest_length'],
+                                    damping=self.damp_var.get())
+        self.campaign_btn.configure(state="disabled")
+        self.campaign_field.set(0.0)
+        self.binder.refresh(force=True)
+        self.scheduler.register(self.campaign_label, self.advance_campaign)
+
+    campaign_budget = 0.008
+    
+    def advance_campaign(self):
+        """Кадр серии: шаги, пока не истек бюджет кадра"""
+        deadline = time.perf_counter() + self.campaign_budget
+        try:
+            while (not self.campaign.advance(50)
+                   and time.perf_counter() < deadline):
+                pass
+        except Exception as e:
+            self.stop_campaign()
+            self.result_text.delete("1.0", "end")
+            self.result_text.insert("1.0", f"Серия прервана: {e}")
+            return
+        if not self.campaign.done:
+            self.campaign_field.set(self.campaign.progress)
+            self.binder.refresh()
+            return
+        result = self.campaign.result()
+        self.stop_campaign()
+        self.result_text.delete("1.0", "end")
+        self.result_text.insert("1.0", format_campaign(result))
+
+    def stop_campaign(self):
+        """Снимает серию с планировщика и возвращает кнопку"""
+        self.scheduler.unregister(self.campaign_label)
+        self.campaign = None
+        self.campaign_field.set(None)
+        self.campaign_btn.configure(state="normal")
+        self.binder.refresh(force=True)
+
     def update_load_label(self, value):
         """Обновляет отображение нагрузки"""
         self.load_label.configure(text=f"{int(value)} г")
-        self.reset_simulation()
+        self.parameters_changed()
 
     def update_k_label(self, value):
         """Обновляет отображение жесткости"""
         self.k_label.configure(text=f"{float(value):.0f} Н/м")
         self.spring_params['k'] = float(value)
-        self.reset_simulation()
+        self.parameters_changed()
 
     def update_damp_label(self, value):
         """Обновляет отображение демпфирования"""
         self.damp_label.configure(text=f"{float(value):.1f}")
         self.spring_params['damping'] = float(value)
+        self.parameters_changed()
+
+    def parameters_changed(self):
+        """Ползунок сдвинут: в живом режиме параметры применяются на ходу,
+        иначе симуляция перезапускается при отпускании ползунка"""
+        if self.live_editing():
+            self.apply_later()
+
+    def live_editing(self):
+        # Модель фонового рабочего из окна не меняется
+        return self.live_var.get() and self.spring and not self.worker
+
+    def on_slider_release(self, event=None):
+        if self.live_editing():
+            self.apply_later.flush()
+        else:
+            self.reset_simulation()
+
+    def apply_parameters(self):
+        """Передает значения ползунков работающей модели без сброса"""
+        if not self.spring:
+            return
+        self.spring.set_parameters(k=self.spring_params['k'],
+                                   mass=self.load_var.get() / 1000,
+                                   damping=self.spring_params['damping'])
+        # Положение равновесия сместилось - стабилизацию ждем заново
+        self.stability.reset()
+        self.oscillation.reset()
+        self.measurements_ready = False
+        self.force_field.set(self.load_var.get() / 1000 * 9.81)
+        self.binder.refresh()
+        # Запись ведется для постоянных параметров: дальше новый прогон
+        if self.recorder:
+            self.stop_recording()
+            if self.sim_running:
+                self.start_recording()
+        if not self.sim_running:
+            self.draw_simulation()
+
+    def open_replay(self):
+        """Открывает записанный прогон для просмотра без пересчета"""
+        initial = RUNS_DIR if os.path.isdir(RUNS_DIR) else "."
+        path = filedialog.askdirectory(parent=self, initialdir=initial,
+                                       title="Выберите запись прогона")
+        if not path:
+            return
+        try:
+            engine = ReplayEngine(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.result_text.delete("1.0", "end")
+            self.result_text.insert("1.0", f"Не удалось открыть запись: {e}")
+            return
+        if not str(engine.experiment).startswith('spring'):
+            self.result_text.delete("1.0", "end")
+            self.result_text.insert("1.0", "Это запись другого эксперимента!")
+            return
+        
+        if self.replay:
+            self.replay.close()
+        self.reset_simulation()
+        self.replay = ReplayPanel(self.simulation_frame, engine,
+                                  self.show_replay_frame, self.on_replay_closed,
+                                  self.scheduler)
+        self.replay.pack(fill="x", padx=20, pady=(0,10))
+        self.replay.show(engine.sample())
+
+    def show_replay_frame(self, sample):
+        """Рисует кадр записи"""
+        params = self.replay.engine.params
+        rest_length = params.get('rest_length', self.spring_params['rest_length'])
+        load = params.get('load', self.load_var.get())
+        
+        anchor_pos = (self.canvas_width/2, 200)
+        weight_pos = (anchor_pos[0], anchor_pos[1] + rest_length + sample['position'])
+        self.scene.ensure_size(self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.scene.draw(anchor_pos, weight_pos, f"{load:g}г")
+        
+        self.extension_field.set(sample['position'])
+        self.force_field.set(load / 1000 * 9.81)
+        # Кадры записи идут по шагам и перемотке, а не с частотой таймера
+        self.binder.refresh(force=True)
+
+    def on_replay_closed(self):
+        self.replay = None
         self.reset_simulation()
 
     def on_close(self):
         """Обработчик закрытия окна"""
+        self.scheduler.unregister(self)
+        self.scheduler.unregister(self.campaign_label)
+        self.stop_worker()
+        self.stop_recording()
         self.master.deiconify()
         self.destroy()
@@ -0,0 +1,417 @@
+"""Замеры производительности физики и отрисовки сцен без дисплея.
+
+Примеры:
+    python -m bench
+    python -m bench --save bench_baseline.json
+    python -m bench --compare bench_baseline.json --tolerance 0.2
+
+Отрисовка идет через FakeCanvas, который только считает операции, поэтому
+число операций canvas на кадр воспроизводится точно. Точность шагов
+сравнивается с решением в замкнутой форме (evaluate_at) при разных dt.
+Время запуска меню замеряется импортом main.py в отдельном процессе.
+При --compare программа завершается с кодом 1, если какая-либо метрика
+ухудшилась сильнее допуска.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+from charts import ChartScene, MinMaxBuffer
+from integrators import INTEGRATORS
+from models import MovingBody, SimpleSpring
+from scenes import InclineScene, SpringScene
+
+BENCH_FORMAT = 1
+
+DEFAULT_DTS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+
+# Цвета не влияют на замеры, но нужны сценам
+COLORS = {key: "black" for key in ('plane', 'stopper', 'body', 'spring',
+                                   'weight', 'text', 'ruler', 'stand',
+                                   'anchor')}
+
+# Допуск для метрик, которые не зависят от скорости машины
+EXACT_TOLERANCE = 1e-6
+# Ошибки округления меньше этого порога ухудшением не считаются
+ABSOLUTE_FLOOR = 1e-9
+
+
+class FakeCanvas:
+    """Заменитель tkinter.Canvas, который считает операции с элементами"""
+    def __init__(self, width=800, height=600):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.next_id = 1
+        self.counts = dict.fromkeys(('create', 'delete', 'coords',
+                                     'itemconfig'), 0)
+
+    def reset_counts(self):
+        for key in self.counts:
+            self.counts[key] = 0
+
+    @property
+    def operations(self):
+        return sum(self.counts.values())
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kind, *coords, **options):
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = (kind, coords, options)
+        self.counts['create'] += 1
+        return item
+
+    def create_line(self, *coords, **options):
+        return self._create('line', *coords, **options)
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', *coords, **options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', *coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', *coords, **options)
+
+    def delete(self, *items):
+        if "all" in items:
+            removed = list(self.items)
+        else:
+            removed = [item for item in items if item in self.items]
+        for item in removed:
+            del self.items[item]
+        self.counts['delete'] += len(removed)
+
+    def coords(self, item, *coords):
+        kind, _, options = self.items[item]
+        self.items[item] = (kind, coords, options)
+        self.counts['coords'] += 1
+
+    def itemconfig(self, item, **options):
+        self.items[item][2].update(options)
+        self.counts['itemconfig'] += 1
+
+
+def best_time(func, repeat=3):
+    """Наименьшее время одного выполнения func() (с)
+
+    Как в timeit: число вызовов в замере подбирается так, чтобы замер шел
+    не меньше 0.2 с, и из repeat замеров берется лучший.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def metric(value, unit, better, exact=False):
+    """Запись метрики; exact - значение не зависит от скорости машины"""
+    return {'value': float(value), 'unit': unit, 'better': better,
+            'exact': exact}
+
+
+def calibration_workload():
+    # Эталонная нагрузка на чистом Python: по ней учитывается скорость машины
+    total = 0.0
+    for i in range(10000):
+        total += (i * 0.5) % 7.0
+    return total
+
+
+def calibrate(repeat):
+    """Скорость машины: выполнений эталонной нагрузки в секунду"""
+    return 1 / best_time(calibration_workload, repeat)
+
+
+def integrator_for(name):
+    return None if name == 'builtin' else name
+
+
+def bench_steps(integrators, steps, repeat):
+    """Шагов в секунду для MovingBody.update и SimpleSpring.step"""
+    results = {}
+    for name in integrators:
+        def run_accel():
+            body = MovingBody(1.0, 30.0, integrator=integrator_for(name))
+            for _ in range(steps):
+                body.update(0.002)
+
+        def run_spring():
+            spring = SimpleSpring(500, 100, 0.5, integrator=integrator_for(name))
+            for _ in range(steps):
+                spring.step(0.002)
+
+        results[f'step.accel.{name}'] = metric(
+            steps / best_time(run_accel, repeat), 'шаг/с', 'higher')
+        results[f'step.spring.{name}'] = metric(
+            steps / best_time(run_spring, repeat), 'шаг/с', 'higher')
+    return results
+
+
+def spring_trajectory(frames, dt=0.002):
+    """Положения груза для кадров отрисовки"""
+    spring = SimpleSpring(500, 100, 0.5)
+    spring.set_anchor_x(400)
+    positions = []
+    for _ in range(frames):
+        spring.step(dt)
+        positions.append(spring.weight_pos)
+    return spring.anchor_pos, positions
+
+
+def count_frames(scene, draw, frames, repeat):
+    """Операций canvas на кадр и кадров в секунду для draw(i)"""
+    canvas = scene.canvas
+    scene.ensure_size(canvas.width, canvas.height)
+    canvas.reset_counts()
+    for i in range(frames):
+        draw(i)
+    ops = canvas.operations / frames
+
+    def run():
+        # Каждый повтор начинается с только что построенной сцены
+        scene.built = False
+        scene.ensure_size(canvas.width, canvas.height)
+        for i in range(frames):
+            draw(i)
+    rate = frames / best_time(run, repeat)
+    return ops, rate
+
+
+def bench_render(frames, repeat):
+    """Операции canvas и скорость отрисовки сцен"""
+    anchor, positions = spring_trajectory(frames)
+    angles = np.linspace(0, 45, frames)
+    results = {}
+
+    def add(name, scene, draw):
+        ops, rate = count_frames(scene, draw, frames, repeat)
+        results[f'render.{name}.ops'] = metric(ops, 'оп/кадр', 'lower',
+                                               exact=True)
+        results[f'render.{name}.rate'] = metric(rate, 'кадр/с', 'higher')
+
+    scene = SpringScene(FakeCanvas(), COLORS)
+    add('spring_frame', scene,
+        lambda i: scene.draw(anchor, positions[i], "500г"))
+    add('zigzag', scene,
+        lambda i: scene.draw_zigzag_spring(anchor, positions[i]))
+    add('ruler', scene,
+        lambda i: scene.draw_ruler(positions[i][0] + 50, anchor[1],
+                                   positions[i][1]))
+
+    incline = InclineScene(FakeCanvas(), COLORS)
+    # Перетаскивание ползунка угла и движение тела при постоянном угле
+    add('plane', incline, lambda i: incline.draw_plane(angles[i]))
+    add('incline_frame', incline,
+        lambda i: (incline.draw_plane(30.0),
+                   incline.draw_body(0.5 * 2.0 * (i / frames) ** 2)))
+
+    # Графики после долгого прогона: стоимость кадра ограничена шириной
+    history = MinMaxBuffer(3)
+    times = np.arange(0, 3600, 0.02)
+    for t, x, v in zip(times.tolist(), np.sin(times).tolist(),
+                       np.cos(times).tolist()):
+        history.append(t, x, v, t)
+    chart = ChartScene(FakeCanvas(800, 180), COLORS,
+                       [("x", "#ffffff"), ("v", "#ffffff"), ("a", "#ffffff")])
+    add('chart', chart, lambda i: chart.refresh(history, force=True))
+    return results
+
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+before = set(sys.modules)
+import main
+print(time.perf_counter() - start, len(set(sys.modules) - before))
+"""
+
+
+def bench_startup(repeat):
+    """Время импорта main.py и число подгружаемых им модулей
+
+    Замер идет в отдельном процессе, окно не создается. Модули работ из
+    реестра импортироваться не должны, так что обе величины не растут при
+    добавлении работ.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT],
+                                cwd=root, capture_output=True, text=True,
+                                check=True).stdout.split()
+        times.append(float(output[0]))
+        modules = int(output[1])
+    return {
+        'startup.import_main': metric(min(times), 'с', 'lower'),
+        'startup.modules': metric(modules, 'модулей', 'lower', exact=True),
+    }
+
+
+def accel_error(dt, duration, integrator):
+    body = MovingBody(1.0, 30.0, integrator=integrator)
+    exact = MovingBody(1.0, 30.0)
+    error = 0.0
+    while body.time < duration - dt / 2:
+        body.update(dt)
+        error = max(error, abs(body.position - exact.evaluate_at(body.time)[0]))
+    return error
+
+
+def spring_error(dt, duration, integrator):
+    spring = SimpleSpring(500, 100, 0.5, integrator=integrator)
+    exact = SimpleSpring(500, 100, 0.5)
+    error = 0.0
+    while spring.time < duration - dt / 2:
+        spring.step(dt)
+        extension = spring.weight_pos[1] - spring.anchor_pos[1] - spring.rest_length
+        error = max(error, abs(extension - exact.evaluate_at(spring.time)[0]))
+    return error
+
+
+def bench_accuracy(integrators, dts, duration):
+    """Наибольшее отклонение от точного решения за duration секунд"""
+    results = {}
+    for name in integrators:
+        for dt in dts:
+            results[f'accuracy.accel.{name}.dt={dt:g}'] = metric(
+                accel_error(dt, duration, integrator_for(name)), 'м', 'lower',
+                exact=True)
+            results[f'accuracy.spring.{name}.dt={dt:g}'] = metric(
+                spring_error(dt, duration, integrator_for(name)), 'мм', 'lower',
+                exact=True)
+    return results
+
+
+def run_benchmarks(integrators=('builtin',), steps=20000, frames=2000,
+                   dts=DEFAULT_DTS, duration=2.0, repeat=3):
+    """Выполняет все замеры и возвращает результат для сохранения в JSON"""
+    metrics = {'calibration': metric(calibrate(repeat), 'раз/с', 'higher')}
+    metrics.update(bench_steps(integrators, steps, repeat))
+    metrics.update(bench_render(frames, repeat))
+    metrics.update(bench_accuracy(integrators, dts, duration))
+    metrics.update(bench_startup(repeat))
+    return {
+        'format': BENCH_FORMAT,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'metrics': metrics,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """Список (метрика, было, стало, изменение) для ухудшившихся метрик
+
+    Замеры времени пересчитываются на скорость машины по эталонной
+    нагрузке и могут ухудшиться на долю tolerance; число операций и
+    точность от машины не зависят и сравниваются почти точно.
+    """
+    scale = 1.0
+    if 'calibration' in baseline['metrics'] and 'calibration' in current['metrics']:
+        scale = (current['metrics']['calibration']['value']
+                 / baseline['metrics']['calibration']['value'])
+
+    regressions = []
+    for name, old in baseline['metrics'].items():
+        new = current['metrics'].get(name)
+        if new is None or name == 'calibration':
+            continue
+        old_value, new_value = old['value'], new['value']
+        if old.get('exact'):
+            allowed = EXACT_TOLERANCE
+        else:
+            allowed = tolerance
+            # Ожидаемое значение на машине текущей скорости
+            if old['better'] == 'higher':
+                old_value *= scale
+            else:
+                old_value /= scale
+        if old['better'] == 'higher':
+            worse = new_value < old_value * (1 - allowed)
+        else:
+            worse = new_value > old_value * (1 + allowed) + ABSOLUTE_FLOOR
+        if worse:
+            change = (new_value - old_value) / old_value if old_value else np.inf
+            regressions.append((name, old_value, new_value, change))
+    return regressions
+
+
+def format_results(result, baseline=None):
+    """Таблица метрик (с изменением относительно baseline, если он задан)"""
+    lines = []
+    width = max(len(name) for name in result['metrics'])
+    for name, entry in result['metrics'].items():
+        line = f"{name:<{width}}  {entry['value']:>14.6g} {entry['unit']}"
+        old = baseline['metrics'].get(name) if baseline else None
+        if old and old['value']:
+            change = (entry['value'] - old['value']) / old['value']
+            line += f"  ({change:+.1%})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='bench', description="Замеры производительности physic_toys")
+    parser.add_argument('--integrator', nargs='+', default=['builtin'],
+                        choices=['builtin'] + list(INTEGRATORS),
+                        help="интеграторы для замеров шагов и точности")
+    parser.add_argument('--steps', type=int, default=20000,
+                        help="шагов физики в одном замере")
+    parser.add_argument('--frames', type=int, default=2000,
+                        help="кадров отрисовки в одном замере")
+    parser.add_argument('--dt', type=float, nargs='+', default=list(DEFAULT_DTS),
+                        help="шаги времени для проверки точности (с)")
+    parser.add_argument('--duration', type=float, default=2.0,
+                        help="длительность прогона для проверки точности (с)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="повторов замера времени (берется лучший)")
+    parser.add_argument('--save', metavar='FILE',
+                        help="сохранить результат как базовый")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="сравнить с базовым результатом")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="допустимое ухудшение замеров времени (доля)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = run_benchmarks(args.integrator, args.steps, args.frames,
+                            args.dt, args.duration, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(format_results(result, baseline))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=1)
+
+    if baseline:
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nУхудшились:", file=sys.stderr)
+            for name, old, new, change in regressions:
+                print(f"  {name}: {old:.6g} -> {new:.6g} ({change:+.1%})",
+                      file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import time
+
+
+class Observable:
+    """Значение модели, за изменением которого следят виджеты"""
+    def __init__(self, value=None):
+        self.value = value
+        self.version = 0
+
+    def set(self, value):
+        if value != self.value:
+            self.value = value
+            self.version += 1
+
+
+class _Binding:
+    """Текст, собранный из полей по формату; помнит, что уже показано"""
+    def __init__(self, fmt, fields):
+        self.fmt = fmt          # Строка формата или функция от значений
+        self.fields = fields
+        self.versions = None
+        self.text = None
+
+    def render(self):
+        """Новый текст или None, если показанный текст не изменился"""
+        versions = tuple(field.version for field in self.fields)
+        if versions == self.versions:
+            return None
+        self.versions = versions
+        values = [field.value for field in self.fields]
+        if any(value is None for value in values):
+            text = ""
+        elif callable(self.fmt):
+            text = self.fmt(*values)
+        else:
+            text = self.fmt.format(*values)
+        if text == self.text:
+            return None
+        self.text = text
+        return text
+
+    def invalidate(self):
+        self.versions = None
+        self.text = None
+
+
+class TextLines:
+    """Строки текстового поля, каждая привязана к своим полям
+
+    Меняются только строки, текст которых изменился; после invalidate()
+    поле переписывается целиком.
+    """
+    def __init__(self, textbox, lines):
+        self.textbox = textbox
+        self.lines = [_Binding(fmt, fields) for fmt, fields in lines]
+        self.written = False
+
+    def invalidate(self):
+        self.written = False
+        for line in self.lines:
+            line.invalidate()
+
+    def refresh(self):
+        changes = [(i, line.render()) for i, line in enumerate(self.lines)]
+        if not self.written:
+            self.textbox.delete("1.0", "end")
+            self.textbox.insert("1.0", "\n".join(line.text or ""
+                                                 for line in self.lines))
+            self.written = True
+            return
+        for i, text in changes:
+            if text is not None:
+                row = i + 1
+                self.textbox.delete(f"{row}.0", f"{row}.end")
+                self.textbox.insert(f"{row}.0", text)
+
+
+class Binder:
+    """Обновляет виджеты по полям модели не чаще rate раз в секунду
+
+    Модель может менять поля на каждом шаге анимации, а виджеты
+    перенастраиваются только когда меняется отформатированный текст.
+    """
+    def __init__(self, rate=10):
+        self.period = 1 / rate
+        self.last_refresh = None
+        self.labels = []
+        self.texts = []
+
+    def label(self, widget, fmt, *fields):
+        """Привязывает надпись к полям: текст = fmt.format(*значения)"""
+        self.labels.append((widget, _Binding(fmt, fields)))
+
+    def text_lines(self, textbox, lines):
+        """Привязывает строки текстового поля: список (формат, поля)"""
+        binding = TextLines(textbox, lines)
+        self.texts.append(binding)
+        return binding
+
+    def invalidate(self):
+        """Виджеты изменили со стороны: следующий refresh перерисует все"""
+        for _, binding in self.labels:
+            binding.invalidate()
+        for binding in self.texts:
+            binding.invalidate()
+
+    def refresh(self, force=False):
+        now = time.perf_counter()
+        if (not force and self.last_refresh is not None
+                and now - self.last_refresh < self.period):
+            return
+        self.last_refresh = now
+        for widget, binding in self.labels:
+            text = binding.render()
+            if text is not None:
+                widget.configure(text=text)
+        for binding in self.texts:
+            binding.refresh()
+
+
+class Debouncer:
+    """Откладывает вызов, пока события идут чаще delay мс
+
+    Вызывается последняя версия аргументов. При непрерывном потоке событий
+    (перетаскивание ползунка) вызов все равно происходит не реже, чем раз в
+    max_wait мс, если max_wait задан.
+    """
+    def __init__(self, widget, callback, delay=50, max_wait=None):
+        self.widget = widget
+        self.callback = callback
+        self.delay = delay
+        self.max_wait = max_wait
+        self.job = None
+        self.args = ()
+        self.first_call = None
+
+    @property
+    def pending(self):
+        return self.job is not None
+
+    def __call__(self, *args):
+        self.args = args
+        now = time.perf_counter()
+        if self.first_call is None:
+            self.first_call = now
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        if (self.max_wait is not None
+                and (now - self.first_call) * 1000 >= self.max_wait):
+            self.fire()
+        else:
+            self.job = self.widget.after(self.delay, self.fire)
+
+    def fire(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+        self.job = None
+        self.first_call = None
+        self.callback(*self.args)
+
+    def flush(self):
+        """Выполняет отложенный вызов сразу, если он есть"""
+        if self.job is not None:
+            self.fire()
+
+    def cancel(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+        self.job = None
+        self.first_call = None
@@ -0,0 +1,203 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ensemble import SpringEnsemble
+from frequency import OscillationTracker
+from stats import linear_fit
+
+# Серия грузов для лабораторной методики (г)
+DEFAULT_LOADS = tuple(range(100, 1001, 100))
+
+
+class CampaignRun:
+    """Серия нагрузок одной пружины, которую можно считать по частям
+
+    Все грузы висят на копиях пружины в одном ансамбле. advance(steps)
+    делает не больше steps шагов, так что окно может продвигать серию
+    понемногу в каждом кадре; progress - доля пройденного времени
+    max_time (серия заканчивается раньше, когда измерены все грузы).
+    method='settle' ждет равновесия по criterion, method='oscillation'
+    находит равновесное растяжение по трем крайним положениям груза.
+    """
+    def __init__(self, k, loads=DEFAULT_LOADS, rest_length=100, damping=0.2,
+                 dt=0.02, max_time=120.0, criterion='energy', tolerance=None,
+                 method='settle'):
+        self.k = k
+        self.loads = np.asarray(loads, dtype=float)
+        self.masses = self.loads / 1000
+        self.method = method
+        if method == 'oscillation':
+            self.ensemble = SpringEnsemble(k, rest_length, self.masses, damping)
+            self.tracker = OscillationTracker(self.ensemble.size)
+        else:
+            self.ensemble = SpringEnsemble(k, rest_length, self.masses, damping,
+                                           criterion=criterion,
+                                           tolerance=tolerance)
+            self.tracker = None
+        self.dt = dt
+        self.steps = int(round(max_time / dt))
+        self.step_count = 0
+
+    @property
+    def measured(self):
+        """Маска грузов, для которых растяжение уже найдено"""
+        if self.tracker is not None:
+            return self.tracker.ready
+        return self.ensemble.settled
+
+    @property
+    def done(self):
+        return self.step_count >= self.steps or bool(self.measured.all())
+
+    @property
+    def progress(self):
+        return 1.0 if self.done else self.step_count / self.steps
+
+    def advance(self, steps=None):
+        """Делает до steps шагов (все оставшиеся при None); True - серия
+        закончена"""
+        left = self.steps - self.step_count
+        for _ in range(left if steps is None else min(steps, left)):
+            if self.measured.all():
+                break
+            ensemble = self.ensemble
+            ensemble.step(self.dt)
+            self.step_count += 1
+            if self.tracker is not None:
+                self.tracker.add(ensemble.time,
+                                 ensemble.length - ensemble.rest_length,
+                                 ensemble.velocity)
+        return self.done
+
+    def outcome(self):
+        """(растяжения в мм, маска измеренных, время измерения)"""
+        if self.tracker is not None:
+            estimate = self.tracker.result(self.masses)
+            return (estimate['equilibrium'], self.tracker.ready.copy(),
+                    self.tracker.ready_time)
+        ensemble = self.ensemble
+        return (ensemble.extension.copy(), ensemble.settled.copy(),
+                ensemble.settle_time.copy())
+
+    def result(self, confidence=0.95):
+        """Итог серии с подбором k, как у run_campaign"""
+        return fit_campaign(self.k, self.loads, *self.outcome(),
+                            confidence=confidence, method=self.method)
+
+
+def settle_loads(k, loads, rest_length=100, damping=0.2, dt=0.02,
+                 max_time=120.0, criterion='energy', tolerance=None):
+    """Нагружает одну пружину всеми грузами сразу и ждет равновесия
+
+    Возвращает (растяжения в мм, маску стабилизировавшихся, время).
+    """
+    run = CampaignRun(k, loads, rest_length, damping, dt, max_time,
+                      criterion, tolerance)
+    run.advance()
+    return run.outcome()
+
+
+def oscillate_loads(k, loads, rest_length=100, damping=0.2, dt=0.02,
+                    max_time=120.0):
+    """Нагружает пружину всеми грузами и измеряет их колебания
+
+    Равновесное растяжение находится по трем крайним положениям груза,
+    то есть примерно через полтора периода, без ожидания покоя.
+    Возвращает (растяжения в мм, маску измеренных, время измерения).
+    """
+    run = CampaignRun(k, loads, rest_length, damping, dt, max_time,
+                      method='oscillation')
+    run.advance()
+    return run.outcome()
+
+
+def _settle_chunk(args):
+    method, args = args
+    if method == 'oscillation':
+        return oscillate_loads(*args[:6])
+    return settle_loads(*args)
+
+
+def run_campaign(k, loads=DEFAULT_LOADS, rest_length=100, damping=0.2,
+                 dt=0.02, max_time=120.0, criterion='energy', tolerance=None,
+                 workers=1, confidence=0.95, method='settle'):
+    """Серия измерений жесткости с подбором k по F = k*x
+
+    Все нагрузки считаются одновременно (векторно) либо, при workers > 1,
+    частями в пуле процессов. По умолчанию равновесие определяется по
+    энергии отклонения: критерий размаха срабатывает у тяжелых грузов
+    в точке разворота, задолго до равновесия. При method='oscillation'
+    равновесие не ждется: растяжение находится по первым колебаниям
+    (criterion и tolerance тогда не используются); при сильном
+    затухании колебаний нет, и такие грузы считаются не измеренными.
+    Если измеренных грузов меньше двух, k не подбирается (fit - None).
+    """
+    loads = np.asarray(loads, dtype=float)
+    if workers > 1 and len(loads) > 1:
+        chunks = [chunk for chunk in np.array_split(loads, workers) if len(chunk)]
+        tasks = [(method, (k, chunk, rest_length, damping, dt, max_time,
+                           criterion, tolerance)) for chunk in chunks]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_settle_chunk, tasks))
+        extensions = np.concatenate([part[0] for part in parts])
+        settled = np.concatenate([part[1] for part in parts])
+        settle_times = np.concatenate([part[2] for part in parts])
+    else:
+        extensions, settled, settle_times = _settle_chunk(
+            (method, (k, loads, rest_length, damping, dt, max_time,
+                      criterion, tolerance)))
+
+    return fit_campaign(k, loads, extensions, settled, settle_times,
+                        confidence, method)
+
+
+def fit_campaign(k, loads, extensions, settled, settle_times,
+                 confidence=0.95, method='settle'):
+    """Подбор k по F = k*x для измеренных растяжений серии"""
+    forces = loads / 1000 * 9.81          # Сила тяжести груза (Н)
+    x = extensions / 1000                 # Растяжение (м)
+    measured = np.isfinite(x)             # Без колебаний растяжения нет
+    fit = None
+    if measured.sum() >= 2:
+        fit = linear_fit(list(x[measured]), list(forces[measured]), confidence)
+
+    return {
+        'k': k,
+        'loads': loads,
+        'forces': forces,
+        'extensions': extensions,
+        'settled': settled,
+        'settle_times': settle_times,
+        'fit': fit,
+        'method': method,
+    }
+
+
+def format_campaign(result):
+    """Текстовый отчет о серии измерений"""
+    fit = result['fit']
+    lines = [f"Серия: {len(result['loads'])} грузов"]
+    if fit is None:
+        measured = int(np.isfinite(result['extensions']).sum())
+        lines.append(f"Измерено грузов: {measured}, для подбора k нужно "
+                     f"хотя бы два")
+        if result.get('method') == 'oscillation':
+            lines.append("Колебаний нет (сильное затухание): "
+                         "используйте --method settle")
+    else:
+        percent = int(round(fit['confidence'] * 100))
+        lines += [
+            f"k = {fit['slope']:.1f} ± {fit['slope_ci']:.1f} Н/м ({percent}%)",
+            f"Свободный член: {fit['intercept']:.4f} ± {fit['intercept_ci']:.4f} Н",
+            f"R² = {fit['r2']:.6f}",
+        ]
+    lines.append(f"Заданная жесткость: {result['k']:.1f} Н/м")
+    if not result['settled'].all():
+        lines.append(f"Не стабилизировались: {int((~result['settled']).sum())}")
+    lines.append("")
+    lines.append("m, г    x, мм    F, Н")
+    for load, extension, force in zip(result['loads'], result['extensions'],
+                                      result['forces']):
+        lines.append(f"{load:<7.0f} {extension:<8.2f} {force:.3f}")
+    return "\n".join(lines)
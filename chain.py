@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+
+try:
+    from scipy.linalg import cholesky_banded, cho_solve_banded, eigvalsh_tridiagonal
+except ImportError:  # Без scipy работает медленный запасной вариант
+    cholesky_banded = cho_solve_banded = eigvalsh_tridiagonal = None
+
+
+def _thomas_factor(diag, off):
+    """Разложение симметричной трехдиагональной матрицы для метода прогонки"""
+    n = len(diag)
+    c = np.zeros(n)
+    d = np.zeros(n)
+    d[0] = diag[0]
+    for i in range(1, n):
+        c[i] = off[i-1] / d[i-1]
+        d[i] = diag[i] - c[i] * off[i-1]
+    return c, d, off
+
+
+def _thomas_solve(factor, b):
+    c, d, off = factor
+    n = len(b)
+    y = np.array(b, dtype=float)
+    for i in range(1, n):
+        y[i] -= c[i] * y[i-1]
+    y[-1] /= d[-1]
+    for i in range(n - 2, -1, -1):
+        y[i] = (y[i] - off[i] * y[i+1]) / d[i]
+    return y
+
+
+class SpringChain:
+    """Вертикальная цепочка из N грузиков, соединенных пружинами
+
+    Приближает тяжелую пружину с распределенной массой: пружина жесткостью
+    k (Н/м) делится на N одинаковых отрезков жесткостью k*N, масса пружины
+    spring_mass делится поровну между узлами, груз mass висит на последнем.
+    Единицы и силы те же, что в SimpleSpring.step, так что при N = 1 и
+    невесомой пружине получается та же модель. Демпфирование
+    распределено пропорционально массе узлов.
+
+    Шаг - неявное правило трапеций: на каждом шаге решается трехдиагональная
+    система с матрицей M + h/2*C + h^2/4*K, разложенной один раз для
+    данного dt. Схема устойчива при любом шаге, поэтому жесткие короткие
+    отрезки не требуют мелкого dt, а шаг стоит O(N).
+    """
+    def __init__(self, k, rest_length, mass, nodes=100, spring_mass=0.05,
+                 damping=0.2):
+        if nodes > 1 and spring_mass <= 0:
+            raise ValueError("Для цепочки из нескольких узлов нужна масса пружины")
+        self.nodes = nodes
+        self.rest_length = rest_length  # Длина покоя всей пружины (мм)
+        self.spring_mass = spring_mass  # Масса пружины (кг)
+        self.gravity = 9.81
+        self.time = 0.0
+        self.force = 0.0  # Сила, действующая на груз (Н)
+        self.anchor_pos = (0, 200)
+
+        self.set_parameters(k=k, mass=mass, damping=damping)
+
+        # Узлы в ненапряженном положении, отсчет вниз от точки крепления
+        self.segment = rest_length / nodes
+        self.positions = self.segment * np.arange(1, nodes + 1, dtype=float)
+        self.velocities = np.zeros(nodes)
+        self.previous = self.positions.copy()
+
+    def set_parameters(self, k=None, mass=None, damping=None):
+        """Меняет параметры на ходу, сохраняя положения и скорости узлов"""
+        if k is not None:
+            self.k = k / 1000.0                     # Н/мм, как в SimpleSpring
+            self.k_segment = self.k * self.nodes
+        if mass is not None:
+            self.mass = mass
+        if damping is not None:
+            self.damping = damping
+
+        self.masses = np.full(self.nodes, self.spring_mass / self.nodes)
+        self.masses[-1] += self.mass
+        total = self.masses.sum()
+        self.dampers = self.damping * self.masses / total
+        self._factor = None  # Матрицу шага нужно разложить заново
+        self._factor_dt = None
+
+    def set_anchor_x(self, x):
+        self.anchor_pos = (x, self.anchor_pos[1])
+
+    @property
+    def weight_pos(self):
+        return (self.anchor_pos[0], self.anchor_pos[1] + self.positions[-1])
+
+    @property
+    def velocity(self):
+        """Скорость груза (мм/с)"""
+        return float(self.velocities[-1])
+
+    def extension(self):
+        """Растяжение всей пружины (мм)"""
+        return float(self.positions[-1]) - self.rest_length
+
+    def stiffness_bands(self):
+        """Диагональ и наддиагональ матрицы жесткости K"""
+        diag = np.full(self.nodes, 2 * self.k_segment)
+        diag[-1] = self.k_segment
+        off = np.full(self.nodes - 1, -self.k_segment)
+        return diag, off
+
+    def external_force(self):
+        """Постоянная часть сил: тяжесть и длина покоя отрезков"""
+        f = self.masses * self.gravity
+        f[-1] += self.k_segment * self.segment
+        return f
+
+    def stiffness_product(self, x):
+        """K @ x без построения матрицы"""
+        result = 2 * self.k_segment * x
+        result[-1] = self.k_segment * x[-1]
+        result[:-1] -= self.k_segment * x[1:]
+        result[1:] -= self.k_segment * x[:-1]
+        return result
+
+    def acceleration(self):
+        return ((self.external_force() - self.stiffness_product(self.positions)
+                 - self.dampers * self.velocities) / self.masses)
+
+    def factor(self, dt):
+        """Разложение матрицы шага (пересчитывается при смене dt)"""
+        if self._factor is not None and self._factor_dt == dt:
+            return self._factor
+        diag, off = self.stiffness_bands()
+        diag = self.masses + dt / 2 * self.dampers + dt * dt / 4 * diag
+        off = dt * dt / 4 * off
+        if cholesky_banded is not None:
+            bands = np.zeros((2, self.nodes))
+            bands[0, 1:] = off
+            bands[1] = diag
+            self._factor = cholesky_banded(bands)
+        else:
+            self._factor = _thomas_factor(diag, off)
+        self._factor_dt = dt
+        return self._factor
+
+    def solve(self, factor, rhs):
+        if cho_solve_banded is not None:
+            return cho_solve_banded((factor, False), rhs)
+        return _thomas_solve(factor, rhs)
+
+    def step(self, dt):
+        """Шаг правилом трапеций; возвращает растяжение до шага (мм)"""
+        extension = self.extension()
+        self.force = float(self.acceleration()[-1] * self.masses[-1])
+
+        # (M + h/2 C + h^2/4 K) v' = (M - h/2 C) v + h (f - K (x + h/4 v))
+        x, v = self.positions, self.velocities
+        rhs = ((self.masses - dt / 2 * self.dampers) * v
+               + dt * (self.external_force()
+                       - self.stiffness_product(x + dt / 4 * v)))
+        new_v = self.solve(self.factor(dt), rhs)
+
+        np.copyto(self.previous, x)
+        self.positions = x + dt / 2 * (v + new_v)
+        self.velocities = new_v
+        self.time += dt
+        return extension
+
+    def equilibrium(self):
+        """Положения узлов в равновесии: K x = f"""
+        diag, off = self.stiffness_bands()
+        if cholesky_banded is not None:
+            bands = np.zeros((2, self.nodes))
+            bands[0, 1:] = off
+            bands[1] = diag
+            return cho_solve_banded((cholesky_banded(bands), False),
+                                    self.external_force())
+        return _thomas_solve(_thomas_factor(diag, off), self.external_force())
+
+    def equilibrium_extension(self):
+        return float(self.equilibrium()[-1]) - self.rest_length
+
+    def energy(self):
+        """Энергия отклонения от равновесия (в единицах модели)"""
+        deviation = self.positions - self.equilibrium()
+        return (0.5 * np.dot(self.masses, self.velocities ** 2)
+                + 0.5 * np.dot(deviation, self.stiffness_product(deviation)))
+
+    def normal_modes(self, count=5):
+        """Частоты первых count собственных колебаний (Гц)
+
+        Задача K x = w^2 M x приводится к симметричной трехдиагональной
+        M^(-1/2) K M^(-1/2), собственные числа которой ищутся ленточным
+        алгоритмом (без scipy - плотной матрицей).
+        """
+        count = min(count, self.nodes)
+        diag, off = self.stiffness_bands()
+        d = diag / self.masses
+        e = off / np.sqrt(self.masses[:-1] * self.masses[1:])
+        if eigvalsh_tridiagonal is not None:
+            values = eigvalsh_tridiagonal(d, e, select='i',
+                                          select_range=(0, count - 1))
+        else:
+            matrix = np.diag(d) + np.diag(e, 1) + np.diag(e, -1)
+            values = np.linalg.eigvalsh(matrix)[:count]
+        return np.sqrt(np.maximum(values, 0)) / (2 * math.pi)
+
+    def coil_points(self, count, alpha=1.0):
+        """Координаты y (на canvas) count точек вдоль пружины
+
+        Узлы расположены равномерно по материалу пружины, поэтому витки
+        сгущаются там, где пружина растянута меньше. Положения
+        интерполируются между двумя последними шагами с долей alpha.
+        """
+        positions = self.previous + (self.positions - self.previous) * alpha
+        material = np.arange(self.nodes + 1) / self.nodes
+        nodes = np.concatenate(([0.0], positions))
+        samples = np.linspace(0, 1, count)
+        return self.anchor_pos[1] + np.interp(samples, material, nodes)
@@ -0,0 +1,179 @@
+import time
+
+import numpy as np
+
+from scenes import Scene
+
+
+class MinMaxBuffer:
+    """История нескольких величин с прореживанием min/max на лету
+
+    Отсчеты копятся в корзинах по span штук; для каждой корзины хранится
+    время первого отсчета, минимум и максимум каждого канала. Когда
+    корзины заканчиваются, соседние пары сливаются, а span удваивается.
+    Память постоянна (capacity корзин), добавление отсчета стоит O(1), а
+    огибающая сохраняет все пики, сколько бы ни длился прогон.
+    """
+    def __init__(self, channels, capacity=1024):
+        self.channels = channels
+        self.capacity = capacity + capacity % 2  # Сливаются парами
+        self.times = np.zeros(self.capacity)
+        self.low = np.zeros((self.capacity, channels))
+        self.high = np.zeros((self.capacity, channels))
+        self.clear()
+
+    def clear(self):
+        self.count = 0    # Заполненные корзины
+        self.span = 1     # Отсчетов в корзине
+        self.samples = 0
+        self.filled = 0   # Отсчетов в текущей корзине
+        self.current_time = None
+        self.current_low = None
+        self.current_high = None
+        self.last_time = None
+
+    def __len__(self):
+        return self.samples
+
+    def append(self, t, *values):
+        """Добавляет отсчет; значения - по одному на канал"""
+        if self.filled == 0:
+            self.current_time = t
+            self.current_low = list(values)
+            self.current_high = list(values)
+        else:
+            low, high = self.current_low, self.current_high
+            for i, value in enumerate(values):
+                if value < low[i]:
+                    low[i] = value
+                elif value > high[i]:
+                    high[i] = value
+        self.filled += 1
+        self.samples += 1
+        self.last_time = t
+        if self.filled >= self.span:
+            self.close_bucket()
+
+    def close_bucket(self):
+        self.times[self.count] = self.current_time
+        self.low[self.count] = self.current_low
+        self.high[self.count] = self.current_high
+        self.count += 1
+        self.filled = 0
+        if self.count == self.capacity:
+            self.compact()
+
+    def compact(self):
+        """Сливает соседние корзины попарно"""
+        half = self.count // 2
+        self.times[:half] = self.times[0:self.count:2]
+        self.low[:half] = np.minimum(self.low[0:self.count:2],
+                                     self.low[1:self.count:2])
+        self.high[:half] = np.maximum(self.high[0:self.count:2],
+                                      self.high[1:self.count:2])
+        self.count = half
+        self.span *= 2
+
+    def envelope(self, max_points):
+        """Время, минимумы и максимумы не более чем max_points корзин
+
+        Незаполненная текущая корзина тоже входит в результат.
+        """
+        times, low, high = (self.times[:self.count], self.low[:self.count],
+                            self.high[:self.count])
+        if self.filled:
+            times = np.append(times, self.current_time)
+            low = np.vstack((low, self.current_low))
+            high = np.vstack((high, self.current_high))
+        if len(times) > max_points:
+            factor = -(-len(times) // max_points)
+            starts = np.arange(0, len(times), factor)
+            times = times[starts]
+            low = np.minimum.reduceat(low, starts)
+            high = np.maximum.reduceat(high, starts)
+        return times, low, high
+
+
+class ChartScene(Scene):
+    """Графики величин во времени, по одной полосе на канал
+
+    series - список (подпись, цвет). Каждая полоса масштабируется по своему
+    диапазону; кривая - одна ломаная не длиннее ширины графика в пикселях,
+    так что стоимость кадра не зависит от длины прогона. Перерисовка идет
+    не чаще rate раз в секунду.
+    """
+    left = 60
+    right = 10
+    gap = 6
+
+    def __init__(self, canvas, colors, series, rate=10):
+        super().__init__(canvas, colors)
+        self.series = series
+        self.period = 1 / rate
+        self.last_draw = None
+
+    def build(self, width, height):
+        axis = self.colors.get('axis', "#555555")
+        text = self.colors.get('text', "#ffffff")
+        self.plot_width = max(width - self.left - self.right, 2)
+        band = height / len(self.series)
+        self.bands = []
+        for i, (title, color) in enumerate(self.series):
+            top = i * band + self.gap / 2
+            bottom = (i + 1) * band - self.gap / 2
+            self.canvas.create_rectangle(self.left, top,
+                                         self.left + self.plot_width, bottom,
+                                         outline=axis)
+            self.canvas.create_text(self.left + self.plot_width - 4, top + 2,
+                                    text=title, fill=color, anchor="ne",
+                                    font=("Arial", 9, "bold"))
+            high_label = self.canvas.create_text(self.left - 4, top,
+                                                 text="", fill=text,
+                                                 anchor="ne", font=("Arial", 8))
+            low_label = self.canvas.create_text(self.left - 4, bottom,
+                                                text="", fill=text,
+                                                anchor="se", font=("Arial", 8))
+            line = self.canvas.create_line(0, 0, 0, 0, fill=color, width=1,
+                                           state="hidden")
+            self.bands.append((top, bottom, line, low_label, high_label))
+        self.time_label = self.canvas.create_text(
+            self.left + 4, height - self.gap / 2 - 2, text="", fill=text,
+            anchor="sw", font=("Arial", 8))
+
+    def refresh(self, buffer, force=False):
+        """Перерисовывает графики, если прошло достаточно времени"""
+        now = time.perf_counter()
+        if (not force and self.last_draw is not None
+                and now - self.last_draw < self.period):
+            return
+        self.last_draw = now
+        self.ensure_size(self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.draw(buffer)
+
+    def draw(self, buffer):
+        if len(buffer) < 2:
+            for _, _, line, low_label, high_label in self.bands:
+                self.show(line, False)
+                self.configure(low_label, text="")
+                self.configure(high_label, text="")
+            self.configure(self.time_label, text="")
+            return
+
+        # Каждая корзина - вертикальный отрезок min..max: две точки
+        times, low, high = buffer.envelope(max(self.plot_width // 2, 1))
+        start, end = times[0], max(buffer.last_time, times[-1])
+        scale = self.plot_width / (end - start) if end > start else 0.0
+        xs = np.repeat(self.left + (times - start) * scale, 2)
+        for i, (top, bottom, line, low_label, high_label) in enumerate(self.bands):
+            lowest, highest = low[:, i].min(), high[:, i].max()
+            if highest - lowest < 1e-12:
+                lowest, highest = lowest - 1, highest + 1
+            ys = np.empty(len(xs))
+            ys[0::2] = high[:, i]
+            ys[1::2] = low[:, i]
+            ys = bottom - (ys - lowest) * (bottom - top) / (highest - lowest)
+            self.move(line, *np.column_stack((xs, ys)).ravel().tolist())
+            self.show(line, True)
+            self.configure(low_label, text=f"{lowest:.3g}")
+            self.configure(high_label, text=f"{highest:.3g}")
+        self.configure(self.time_label, text=f"{start:.1f}–{end:.1f} с")
@@ -0,0 +1,169 @@
+from collections import deque
+
+import numpy as np
+
+# Допуск по умолчанию для каждого критерия
+DEFAULT_TOLERANCE = {
+    'range': 0.1,       # Размах растяжения за окно (мм)
+    'velocity': 0.1,    # Максимальная скорость за окно (мм/с)
+    'energy': 1e-3,     # Максимальная энергия отклонения за окно (ед. модели)
+}
+
+
+class SlidingRange:
+    """Минимум и максимум по скользящему окну за O(1) (монотонные деки)"""
+    def __init__(self, window):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.max_queue = deque()  # (номер, значение), значения убывают
+        self.min_queue = deque()  # (номер, значение), значения возрастают
+
+    def push(self, value):
+        index = self.count
+        self.count += 1
+
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((index, value))
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        self.min_queue.append((index, value))
+
+        # Удаляем значения, вышедшие из окна
+        expired = index - self.window
+        if self.max_queue[0][0] <= expired:
+            self.max_queue.popleft()
+        if self.min_queue[0][0] <= expired:
+            self.min_queue.popleft()
+
+    @property
+    def full(self):
+        return self.count >= self.window
+
+    @property
+    def max(self):
+        return self.max_queue[0][1]
+
+    @property
+    def min(self):
+        return self.min_queue[0][1]
+
+
+class ConvergenceDetector:
+    """Потоковое определение стабилизации системы
+
+    Критерии:
+        'range'    - размах растяжения за окно меньше tolerance;
+        'velocity' - модуль скорости за все окно меньше tolerance;
+        'energy'   - энергия отклонения от равновесия за окно меньше tolerance.
+
+    Как и measurements_ready в окне, флаг converged после срабатывания
+    остается установленным до reset().
+    """
+    def __init__(self, window=20, tolerance=None, criterion='range'):
+        if criterion not in DEFAULT_TOLERANCE:
+            raise ValueError(f"Неизвестный критерий: {criterion}")
+        self.window = window
+        self.criterion = criterion
+        self.tolerance = (DEFAULT_TOLERANCE[criterion]
+                          if tolerance is None else tolerance)
+        self.range = SlidingRange(window)
+        self.reset()
+
+    def reset(self):
+        self.range.reset()
+        self.converged = False
+        self.measure = None
+
+    def update(self, extension, velocity=0.0, energy=0.0):
+        """Добавляет отсчет; возвращает True, если система стабилизировалась"""
+        if self.criterion == 'range':
+            self.range.push(extension)
+        elif self.criterion == 'velocity':
+            self.range.push(abs(velocity))
+        else:
+            self.range.push(energy)
+
+        if not self.range.full:
+            return self.converged
+
+        if self.criterion == 'range':
+            self.measure = self.range.max - self.range.min
+        else:
+            self.measure = self.range.max
+        if self.measure < self.tolerance:
+            self.converged = True
+        return self.converged
+
+
+class BatchConvergenceDetector:
+    """Определение стабилизации сразу для N систем (векторно)
+
+    Скользящие максимум и минимум считаются алгоритмом ван Херка -
+    Гиля-Вермана: поток режется на блоки длиной window; для прошлого блока
+    хранятся суффиксные экстремумы, для текущего - префиксные. Экстремум
+    окна - это max(суффикс прошлого блока, префикс текущего), так что
+    обновление стоит O(1) на систему (амортизированно).
+    """
+    def __init__(self, size, window=20, tolerance=None, criterion='range'):
+        if criterion not in DEFAULT_TOLERANCE:
+            raise ValueError(f"Неизвестный критерий: {criterion}")
+        self.size = size
+        self.window = window
+        self.criterion = criterion
+        self.tolerance = (DEFAULT_TOLERANCE[criterion]
+                          if tolerance is None else tolerance)
+        self.track_min = criterion == 'range'
+        self.reset()
+
+    def reset(self):
+        w, n = self.window, self.size
+        self.count = 0
+        self.block = np.empty((w, n))
+        # Суффиксные экстремумы прошлого блока (строка w - пустой суффикс)
+        self.suffix_max = np.full((w + 1, n), -np.inf)
+        self.suffix_min = np.full((w + 1, n), np.inf)
+        self.prefix_max = np.full(n, -np.inf)
+        self.prefix_min = np.full(n, np.inf)
+        self.converged = np.zeros(n, dtype=bool)
+        self.measure = np.full(n, np.nan)
+
+    def update(self, extension, velocity=None, energy=None):
+        """Добавляет отсчеты всех систем; возвращает маску стабилизации"""
+        if self.criterion == 'range':
+            values = extension
+        elif self.criterion == 'velocity':
+            values = np.abs(velocity)
+        else:
+            values = energy
+
+        j = self.count % self.window
+        self.count += 1
+        self.block[j] = values
+        np.maximum(self.prefix_max, values, out=self.prefix_max)
+        if self.track_min:
+            np.minimum(self.prefix_min, values, out=self.prefix_min)
+
+        if self.count >= self.window:
+            window_max = np.maximum(self.suffix_max[j + 1], self.prefix_max)
+            if self.track_min:
+                window_min = np.minimum(self.suffix_min[j + 1], self.prefix_min)
+                self.measure = window_max - window_min
+            else:
+                self.measure = window_max
+            self.converged |= self.measure < self.tolerance
+
+        if j == self.window - 1:
+            # Блок заполнен: его суффиксы понадобятся следующему блоку
+            self.suffix_max[:-1] = np.maximum.accumulate(
+                self.block[::-1], axis=0)[::-1]
+            self.prefix_max.fill(-np.inf)
+            if self.track_min:
+                self.suffix_min[:-1] = np.minimum.accumulate(
+                    self.block[::-1], axis=0)[::-1]
+                self.prefix_min.fill(np.inf)
+
+        return self.converged
@@ -0,0 +1,294 @@
+import numpy as np
+
+from convergence import BatchConvergenceDetector
+
+
+class MovingBodyEnsemble:
+    """Пакет тел на наклонной плоскости (структура массивов на NumPy)
+
+    Повторяет модель MovingBody, но хранит N тел в массивах одинаковой
+    длины и продвигает их все за один вызов step().
+    """
+    min_bounce_speed = 1e-3
+    max_events = 100
+
+    def __init__(self, mass, angle, friction=0.1, stopper=None,
+                 restitution=0.0):
+        # Параметры (скаляры или массивы одной длины)
+        mass, angle, friction = np.broadcast_arrays(
+            np.asarray(mass, dtype=float),
+            np.asarray(angle, dtype=float),
+            np.asarray(friction, dtype=float))
+        self.mass = mass.ravel().copy()           # Масса тел (кг)
+        self.angle = np.radians(angle.ravel())    # Углы в радианах
+        self.friction = friction.ravel().copy()   # Коэффициенты трения
+        self.size = self.mass.size
+
+        # Физические константы
+        self.gravity = 9.81
+
+        # Тригонометрия считается один раз на тело, а не на каждом шаге
+        self.sin_angle = np.sin(self.angle)
+        self.cos_angle = np.cos(self.angle)
+
+        # Ограничитель (м): None - без ограничителя
+        if stopper is None:
+            self.stopper = None
+        else:
+            self.stopper = np.broadcast_to(
+                np.asarray(stopper, dtype=float), (self.size,)).copy()
+        self.restitution = np.broadcast_to(
+            np.asarray(restitution, dtype=float), (self.size,)).copy()
+
+        self.reset()
+
+    @classmethod
+    def from_grid(cls, masses, angles, frictions, stopper=None, restitution=0.0):
+        """Создает ансамбль по декартову произведению параметров"""
+        m, a, f = np.meshgrid(np.asarray(masses, dtype=float),
+                              np.asarray(angles, dtype=float),
+                              np.asarray(frictions, dtype=float),
+                              indexing="ij")
+        return cls(m.ravel(), a.ravel(), f.ravel(), stopper=stopper,
+                   restitution=restitution)
+
+    def reset(self):
+        """Возвращает все тела в начальное состояние"""
+        n = self.size
+        self.position = np.zeros(n)       # Позиции тел (м)
+        self.velocity = np.zeros(n)       # Скорости (м/с)
+        self.time = np.zeros(n)           # Время движения (с)
+        self.stopped = np.zeros(n, dtype=bool)   # Тело у ограничителя
+        self.arrival_time = np.full(n, np.nan)   # Время достижения ограничителя
+        self.arrival_velocity = np.full(n, np.nan)  # Скорость при первом ударе
+        self.stop_time = np.full(n, np.nan)      # Момент остановки
+        self.bounces = np.zeros(n, dtype=int)    # Число отскоков
+
+        # Ускорение постоянно для каждого тела: a = g*(sin - mu*cos)
+        # (масса сокращается, как и в MovingBody.update)
+        self.acceleration = self.gravity * (
+            self.sin_angle - self.friction * self.cos_angle)
+
+    def step(self, dt):
+        """Обновляет состояние всех тел за время dt"""
+        if self.stopper is not None:
+            # С ограничителем движение считается точно, как в MovingBody
+            self.advance_exact(dt)
+            return self.position
+
+        # Полунеявный Эйлер, как в MovingBody.update
+        self.velocity += self.acceleration * dt
+        self.position += self.velocity * dt
+        self.time += dt
+        return self.position
+
+    def advance_exact(self, dt):
+        """Точное движение с ударами об ограничитель, как MovingBody.advance_exact
+
+        Тела, у которых за шаг случилось событие (удар, верхняя точка после
+        отскока), обрабатываются следующими раундами только в своем
+        подмножестве; остальные проходят шаг за один раунд.
+        """
+        index = np.flatnonzero(~self.stopped)
+        remaining = np.full(index.size, float(dt))
+        start = self.time[index]
+        up_acceleration = self.gravity * (self.sin_angle[index] +
+                                          self.friction[index] * self.cos_angle[index])
+        g = {'up': up_acceleration, 'down': self.acceleration[index],
+             'stopper': self.stopper[index], 'e': self.restitution[index]}
+
+        for _ in range(self.max_events):
+            if not index.size:
+                break
+            x, v = self.position[index], self.velocity[index]
+            up = v < 0
+            a = np.where(up, g['up'], g['down'])
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Верхняя точка после отскока
+                apex = np.where(up & (a > 0), -v / a, np.inf)
+                # Удар об ограничитель: устойчивый корень x + v*t + a*t^2/2 = s
+                gap = g['stopper'] - x
+                disc = v * v + 2 * a * gap
+                denominator = v + np.sqrt(disc)
+                hit = np.where(~up & (disc >= 0) & (denominator > 0),
+                               2 * gap / denominator, np.inf)
+            hit = np.maximum(hit, 0.0)
+            held = ~up & (v == 0) & (a <= 0)  # Трение покоя удерживает тело
+
+            span = np.minimum(np.minimum(apex, hit), remaining)
+            span[held] = remaining[held]
+            moving = ~held
+            x = x + np.where(moving, v * span + a * span * span / 2, 0.0)
+            v = np.where(moving, v + a * span, 0.0)
+            remaining -= span
+
+            at_apex = up & (apex <= span) & (remaining > 0)
+            v[at_apex] = 0.0
+            collided = moving & ~up & (hit <= span)
+            x[collided] = g['stopper'][collided]
+
+            if collided.any():
+                ids = index[collided]
+                first = np.isnan(self.arrival_time[ids])
+                when = start[collided] + (dt - remaining[collided])
+                self.arrival_time[ids[first]] = when[first]
+                self.arrival_velocity[ids[first]] = v[collided][first]
+                rebound = g['e'][collided] * v[collided]
+                stop = rebound < self.min_bounce_speed
+                self.stopped[ids[stop]] = True
+                self.stop_time[ids[stop]] = when[stop]
+                self.bounces[ids[~stop]] += 1
+                v[collided] = np.where(stop, 0.0, -rebound)
+
+            self.position[index] = x
+            self.velocity[index] = v
+
+            # Следующий раунд только для тел, у которых шаг не закончился
+            active = (remaining > 0) & ~self.stopped[index] & ~held
+            index, remaining, start = index[active], remaining[active], start[active]
+            g = {key: value[active] for key, value in g.items()}
+        else:
+            # Слишком много ударов за шаг: тела лежат у ограничителя
+            self.velocity[index] = 0.0
+            self.stopped[index] = True
+            self.stop_time[index] = start + dt
+
+        self.time += dt
+
+    def run(self, duration, dt=0.02):
+        """Продвигает ансамбль на duration секунд.
+
+        Останавливается раньше, если все тела дошли до ограничителя.
+        """
+        steps = int(round(duration / dt))
+        for _ in range(steps):
+            self.step(dt)
+            if self.stopper is not None and self.stopped.all():
+                break
+        return self.position
+
+    def table(self):
+        """Возвращает словарь столбцов для лабораторной таблицы"""
+        return {
+            'mass': self.mass,
+            'angle': np.degrees(self.angle),
+            'friction': self.friction,
+            'time': self.time,
+            'position': self.position,
+            'velocity': self.velocity,
+            'acceleration': self.acceleration,
+            'arrival_time': self.arrival_time,
+            'arrival_velocity': self.arrival_velocity,
+            'bounces': self.bounces,
+            'stop_time': self.stop_time,
+        }
+
+
+class SpringEnsemble:
+    """Пакет пружин с грузами (структура массивов на NumPy)
+
+    Повторяет модель SimpleSpring для N пружин с разными k, mass, damping
+    и rest_length. В том же шаге определяется стабилизация каждой пружины
+    (BatchConvergenceDetector); по умолчанию - по тому же критерию, что и
+    в StiffnessWindow: размах растяжения за последние window шагов меньше
+    tolerance (мм).
+    """
+    def __init__(self, k, rest_length, mass, damping=0.2,
+                 window=20, tolerance=None, criterion='range'):
+        k, rest_length, mass, damping = np.broadcast_arrays(
+            np.asarray(k, dtype=float),
+            np.asarray(rest_length, dtype=float),
+            np.asarray(mass, dtype=float),
+            np.asarray(damping, dtype=float))
+        self.k = k.ravel() / 1000.0                   # Жесткость (Н/мм)
+        self.rest_length = rest_length.ravel().copy()  # Длина покоя (мм)
+        self.mass = mass.ravel().copy()                # Масса груза (кг)
+        self.damping = damping.ravel().copy()          # Коэффициент затухания
+        self.size = self.k.size
+
+        self.gravity = 9.81
+
+        # Параметры определения стабилизации
+        self.window = window
+        self.tolerance = tolerance
+        self.criterion = criterion
+
+        self.reset()
+
+    @classmethod
+    def from_grid(cls, loads, ks, rest_length=100, damping=0.2, **kwargs):
+        """Создает ансамбль по сетке нагрузка (г) x жесткость (Н/м)"""
+        load, k = np.meshgrid(np.asarray(loads, dtype=float),
+                              np.asarray(ks, dtype=float), indexing="ij")
+        return cls(k.ravel(), rest_length, load.ravel() / 1000,
+                   damping, **kwargs)
+
+    def reset(self):
+        """Возвращает все пружины в начальное состояние"""
+        n = self.size
+        self.length = self.rest_length.copy()   # Длина пружины (мм)
+        self.velocity = np.zeros(n)             # Скорость груза (мм/с)
+        self.force = np.zeros(n)                # Текущая сила (Н)
+        self.extension = np.zeros(n)            # Растяжение на прошлом шаге (мм)
+        self.time = 0.0
+
+        # Сила тяжести не меняется между шагами
+        self.gravity_force = self.mass * self.gravity
+
+        # Потоковое определение стабилизации каждой пружины
+        self.detector = BatchConvergenceDetector(
+            n, self.window, self.tolerance, self.criterion)
+        self.settled = self.detector.converged
+        self.settle_time = np.full(n, np.nan)
+
+    def step(self, dt):
+        """Обновление физики всех пружин за шаг dt (в секундах)"""
+        extension = self.length - self.rest_length
+
+        # Те же силы, что и в SimpleSpring.step
+        self.force = (-self.k * extension + self.gravity_force
+                      - self.damping * self.velocity)
+        self.velocity += self.force / self.mass * dt
+        self.length += self.velocity * dt
+        self.time += dt
+
+        self.extension = extension
+        self.check_equilibrium(extension)
+        return extension
+
+    def energy(self):
+        """Энергия отклонения от равновесия (в единицах модели)"""
+        deviation = self.length - self.rest_length - self.gravity_force / self.k
+        return 0.5 * self.mass * self.velocity ** 2 + 0.5 * self.k * deviation ** 2
+
+    def check_equilibrium(self, extension):
+        """Отмечает пружины, система которых стабилизировалась"""
+        energy = self.energy() if self.criterion == 'energy' else None
+        before = self.settled.copy()
+        self.settled = self.detector.update(extension, self.velocity, energy)
+        newly = self.settled & ~before
+        if newly.any():
+            self.settle_time[newly] = self.time
+        return self.settled
+
+    def run_until_settled(self, dt=0.02, max_time=60.0):
+        """Шагает, пока все пружины не стабилизируются (или max_time)"""
+        steps = int(round(max_time / dt))
+        for _ in range(steps):
+            self.step(dt)
+            if self.settled.all():
+                break
+        return self.settled
+
+    def table(self):
+        """Возвращает словарь столбцов с результатами по каждой пружине"""
+        return {
+            'k': self.k * 1000.0,
+            'mass': self.mass,
+            'damping': self.damping,
+            'rest_length': self.rest_length,
+            'extension': self.extension,
+            'settled': self.settled,
+            'settle_time': self.settle_time,
+        }
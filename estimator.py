@@ -0,0 +1,86 @@
+import numpy as np
+
+from stats import critical_value
+
+
+class AccelerationFit:
+    """Потоковая оценка ускорения по отсчетам (время, путь)
+
+    Подбирает s = v0*t + a*t^2/2 взвешенным методом наименьших квадратов.
+    Каждый отсчет обновляет несколько накопленных сумм, так что добавление
+    стоит O(1), а память не зависит от числа отсчетов. Оценка, ее
+    стандартная ошибка и доверительный интервал доступны в любой момент.
+
+    Все суммы - массивы формы shape (по умолчанию скаляры), поэтому одна
+    оценка ведет сразу целый ансамбль тел или партию смоделированных
+    измерений. Вес 0 исключает отсчет (например, для тел, уже дошедших до
+    ограничителя). noise - СКО шума (м), добавляемого к путям, чтобы
+    моделировать измерение линейкой.
+    """
+    def __init__(self, shape=(), noise=0.0, rng=None):
+        self.shape = shape
+        self.noise = noise
+        self.rng = rng or np.random.default_rng()
+        self.reset()
+
+    def reset(self):
+        zeros = lambda: np.zeros(self.shape)
+        self.count = np.zeros(self.shape, dtype=np.int64)
+        # Суммы по базису x1 = t, x2 = t^2/2
+        self.s11, self.s12, self.s22 = zeros(), zeros(), zeros()
+        self.s1y, self.s2y, self.syy = zeros(), zeros(), zeros()
+
+    def add(self, t, s, weight=1.0):
+        """Добавляет отсчет (или по отсчету на каждый элемент ансамбля)"""
+        if self.noise:
+            s = s + self.rng.normal(0, self.noise, np.shape(s))
+        x1 = t
+        x2 = 0.5 * t * t
+        self.count += np.asarray(weight) > 0
+        wx1, wx2 = weight * x1, weight * x2
+        self.s11 += wx1 * x1
+        self.s12 += wx1 * x2
+        self.s22 += wx2 * x2
+        self.s1y += wx1 * s
+        self.s2y += wx2 * s
+        self.syy += weight * s * s
+
+    def result(self, confidence=0.95):
+        """Словарь: acceleration, v0, их стандартные ошибки, полуширина
+        интервала acceleration_ci и число отсчетов n
+
+        Пока отсчетов меньше двух, оценки - NaN; при двух отсчетах
+        ошибки не определены (NaN). При confidence=None интервал не
+        считается (квантиль Стьюдента заметно дороже самой оценки).
+        """
+        det = self.s11 * self.s22 - self.s12 * self.s12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v0 = (self.s22 * self.s1y - self.s12 * self.s2y) / det
+            acceleration = (self.s11 * self.s2y - self.s12 * self.s1y) / det
+
+            # Остаточная сумма квадратов через накопленные суммы
+            residual = np.maximum(
+                self.syy - v0 * self.s1y - acceleration * self.s2y, 0.0)
+            df = self.count - 2
+            sigma2 = np.where(df > 0, residual / np.maximum(df, 1), np.nan)
+            v0_se = np.sqrt(sigma2 * self.s22 / det)
+            acceleration_se = np.sqrt(sigma2 * self.s11 / det)
+
+        valid = (self.count >= 2) & (det > 0)
+        v0 = np.where(valid, v0, np.nan)
+        acceleration = np.where(valid, acceleration, np.nan)
+        result = {
+            'n': self.count,
+            'acceleration': acceleration,
+            'v0': v0,
+            'acceleration_se': acceleration_se,
+            'v0_se': v0_se,
+            'confidence': confidence,
+        }
+        if confidence is not None:
+            # Квантиль Стьюдента считается один раз на каждое различное df
+            values, inverse = np.unique(df, return_inverse=True)
+            t = np.array([critical_value(confidence, value)
+                          for value in values])[inverse].reshape(np.shape(df))
+            result['acceleration_ci'] = t * acceleration_se
+        return result
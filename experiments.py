@@ -0,0 +1,75 @@
+"""Реестр лабораторных работ.
+
+Главное окно строит меню по этому списку и импортирует модуль работы
+только при нажатии на ее кнопку, поэтому время запуска не растет с числом
+работ. Чтобы добавить работу, достаточно дописать сюда ее название, модуль
+и класс окна (класс принимает главное окно единственным аргументом).
+"""
+import importlib
+import sys
+import threading
+
+
+class Experiment:
+    """Описание лабораторной работы без импорта ее модуля"""
+    def __init__(self, key, title, module, entry, warm_up=True):
+        self.key = key
+        self.title = title
+        self.module = module    # Имя модуля с окном работы
+        self.entry = entry      # Имя класса окна в модуле
+        self.warm_up = warm_up  # Импортировать заранее в фоне
+
+    @property
+    def loaded(self):
+        return self.module in sys.modules
+
+    def load(self):
+        """Импортирует модуль работы и возвращает класс окна"""
+        return getattr(importlib.import_module(self.module), self.entry)
+
+    def open(self, master):
+        return self.load()(master)
+
+
+EXPERIMENTS = [
+    Experiment('accel', "Определение ускорения тела при равноускоренном движении",
+               'Determ_accel', 'AccelerationWindow'),
+    Experiment('stiffness', "Определение коэффициента жёсткости пружины",
+               'Determ_stiffness', 'StiffnessWindow'),
+    Experiment('maps', "Карты параметров", 'map_window', 'ParamMapWindow'),
+]
+
+
+def register(key, title, module, entry, warm_up=True):
+    """Добавляет работу в реестр (например, из внешнего модуля)"""
+    experiment = Experiment(key, title, module, entry, warm_up)
+    EXPERIMENTS.append(experiment)
+    return experiment
+
+
+def get_experiment(key):
+    for experiment in EXPERIMENTS:
+        if experiment.key == key:
+            return experiment
+    raise KeyError(key)
+
+
+def warm_up(experiments=None):
+    """Импортирует модули работ в фоновом потоке
+
+    Ошибки импорта здесь не показываются: они повторятся и будут видны
+    при открытии работы.
+    """
+    pending = [experiment for experiment in (experiments or EXPERIMENTS)
+               if experiment.warm_up and not experiment.loaded]
+
+    def run():
+        for experiment in pending:
+            try:
+                importlib.import_module(experiment.module)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,122 @@
+import math
+
+import numpy as np
+
+
+class OscillationTracker:
+    """Потоковая оценка частоты и затухания колебаний груза
+
+    На вход подаются отсчеты (время, растяжение, скорость). Крайние точки
+    колебаний - это нули скорости: момент нуля находится линейной
+    интерполяцией между соседними отсчетами, значение растяжения в нем -
+    по пройденному пути. Соседние крайние точки отстоят на половину
+    периода затухающих колебаний pi/omega_d, поэтому omega_d берется из
+    наклона прямой t_j = t_0 + j*T/2 (МНК по накопленным суммам, без
+    хранения истории). Отношение соседних размахов дает логарифмический
+    декремент, то есть gamma, а с ним и собственную частоту
+    omega0^2 = omega_d^2 + gamma^2 без затухания. По трем последним
+    крайним точкам находится и положение равновесия.
+
+    Все величины - массивы формы shape, так что один трекер ведет целый
+    ансамбль пружин; пока нулей скорости нет, отсчет стоит пару сравнений.
+    """
+    def __init__(self, shape=()):
+        self.shape = shape
+        self.reset()
+
+    def reset(self):
+        zeros = lambda: np.zeros(self.shape)
+        self.prev_t = None
+        self.prev_x = None
+        self.prev_v = None
+        self.extrema = np.zeros(self.shape, dtype=np.int64)
+        # Суммы для МНК по точкам (j, t_j)
+        self.sj, self.sjj, self.st, self.sjt = zeros(), zeros(), zeros(), zeros()
+        # Три последние крайние точки (растяжение), от старой к новой
+        self.peaks = np.full((3,) + np.zeros(self.shape).shape, np.nan)
+        self.log_ratio = zeros()   # Сумма ln(отношения размахов)
+        self.ratios = np.zeros(self.shape, dtype=np.int64)
+        self.ready_time = np.full(self.shape, np.nan)
+
+    def add(self, t, x, v):
+        """Добавляет отсчет (или по отсчету на каждый элемент ансамбля)
+
+        Массивы копируются: ансамбли меняют свои массивы на месте.
+        """
+        if isinstance(x, np.ndarray):
+            x, v = x.copy(), v.copy()
+        if self.prev_t is not None:
+            crossing = (v > 0) != (self.prev_v > 0)
+            if np.any(crossing):
+                self._add_extrema(crossing, t, v)
+        self.prev_t, self.prev_x, self.prev_v = t, x, v
+
+    def _add_extrema(self, crossing, t, v):
+        prev_v = self.prev_v
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(prev_v != v, prev_v / (prev_v - v), 0.0)
+        # Скорость линейно падает до нуля: путь - половина v*dt
+        delay = (t - self.prev_t) * fraction
+        time = self.prev_t + delay
+        peak = self.prev_x + prev_v * delay / 2
+
+        j = self.extrema.astype(float)
+        self.sj = np.where(crossing, self.sj + j, self.sj)
+        self.sjj = np.where(crossing, self.sjj + j * j, self.sjj)
+        self.st = np.where(crossing, self.st + time, self.st)
+        self.sjt = np.where(crossing, self.sjt + j * time, self.sjt)
+        self.extrema = self.extrema + crossing
+
+        newest = np.broadcast_to(peak, self.peaks[2].shape)
+        self.peaks = np.where(crossing,
+                              np.stack((self.peaks[1], self.peaks[2], newest)),
+                              self.peaks)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p0, p1, p2 = self.peaks
+            ratio = -(p2 - p1) / (p1 - p0)
+        counted = crossing & (self.extrema >= 3) & (ratio > 0)
+        self.log_ratio = np.where(counted, self.log_ratio + np.log(np.where(
+            counted, ratio, 1.0)), self.log_ratio)
+        self.ratios = self.ratios + counted
+
+        # Момент, когда оценка стала готова (третья крайняя точка)
+        newly = counted & (self.ratios == 1)
+        self.ready_time = np.where(newly, time, self.ready_time)
+
+    @property
+    def ready(self):
+        """Оценка готова: есть хотя бы одно отношение размахов"""
+        return self.ratios > 0
+
+    def result(self, mass):
+        """Словарь оценок для груза mass (кг); не готовые элементы - NaN
+
+        frequency - частота затухающих колебаний (Гц), gamma - коэффициент
+        затухания (1/с), omega0 - собственная частота (рад/с), k - жесткость
+        (Н/м), equilibrium - растяжение в равновесии (мм), periods - число
+        измеренных периодов.
+        """
+        n = self.extrema.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            half_period = ((n * self.sjt - self.sj * self.st)
+                           / (n * self.sjj - self.sj * self.sj))
+            omega_d = math.pi / half_period
+            gamma = -self.log_ratio / self.ratios / half_period
+            omega0 = np.sqrt(omega_d * omega_d + gamma * gamma)
+
+            # Равновесие: p1 - c = -r (p0 - c) для последней пары размахов
+            p0, p1, p2 = self.peaks
+            r = -(p2 - p1) / (p1 - p0)
+            equilibrium = (p1 + r * p0) / (1 + r)
+
+        ready = self.ready
+        nan = lambda value: np.where(ready, value, np.nan)
+        return {
+            'frequency': nan(omega_d / (2 * math.pi)),
+            'gamma': nan(gamma),
+            'omega0': nan(omega0),
+            # Модель: F/m в мм/с^2 при k в Н/мм, то есть k = m*omega0^2 (Н/мм)
+            'k': nan(1000.0 * np.asarray(mass) * omega0 * omega0),
+            'equilibrium': nan(equilibrium),
+            'periods': np.maximum(n - 1, 0) / 2,
+        }
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class Integrator:
+    """Интегратор системы dy/dt = f(t, y)
+
+    step() продвигает вектор состояния y на время dt и возвращает новый
+    вектор. Интеграторы для механики (euler, verlet) предполагают, что
+    первая половина y - координаты, вторая - скорости, а f возвращает
+    [скорости, ускорения].
+    """
+    name = None
+
+    def step(self, f, t, y, dt):
+        raise NotImplementedError
+
+
+class SemiImplicitEuler(Integrator):
+    """Полунеявный Эйлер (как в исходных MovingBody и SimpleSpring)"""
+    name = 'euler'
+
+    def step(self, f, t, y, dt):
+        n = len(y) // 2
+        a = f(t, y)[n:]
+        v = y[n:] + a * dt
+        x = y[:n] + v * dt
+        return np.concatenate((x, v))
+
+
+class RK4(Integrator):
+    """Классический метод Рунге-Кутты 4-го порядка"""
+    name = 'rk4'
+
+    def step(self, f, t, y, dt):
+        k1 = f(t, y)
+        k2 = f(t + dt/2, y + k1 * (dt/2))
+        k3 = f(t + dt/2, y + k2 * (dt/2))
+        k4 = f(t + dt, y + k3 * dt)
+        return y + (k1 + 2*k2 + 2*k3 + k4) * (dt/6)
+
+
+class VelocityVerlet(Integrator):
+    """Скоростной Верле (с учетом сил, зависящих от скорости)"""
+    name = 'verlet'
+
+    def step(self, f, t, y, dt):
+        n = len(y) // 2
+        x, v = y[:n], y[n:]
+        a0 = f(t, y)[n:]
+        x1 = x + v * dt + a0 * (dt * dt / 2)
+
+        # Скорость для силы трения/демпфирования берется по прогнозу
+        a1 = f(t + dt, np.concatenate((x1, v + a0 * dt)))[n:]
+        v1 = v + (a0 + a1) * (dt / 2)
+        return np.concatenate((x1, v1))
+
+
+class DormandPrince(Integrator):
+    """Адаптивный метод Дормана-Принса 5(4) с контролем ошибки
+
+    Шаг dt разбивается на внутренние подшаги, длина которых подбирается
+    по оценке локальной ошибки (rtol, atol). Последний удачный подшаг
+    запоминается и используется в следующем вызове. Если за max_substeps
+    подшагов конец интервала не достигнут, step() вызывает RuntimeError,
+    а не возвращает решение для более раннего момента.
+    """
+    name = 'dopri5'
+
+    c = (0, 1/5, 3/10, 4/5, 8/9, 1, 1)
+    a = (
+        (),
+        (1/5,),
+        (3/40, 9/40),
+        (44/45, -56/15, 32/9),
+        (19372/6561, -25360/2187, 64448/6561, -212/729),
+        (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+        (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84),
+    )
+    b = (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0)
+    b_star = (5179/57600, 0, 7571/16695, 393/640, -92097/339200,
+              187/2100, 1/40)
+
+    def __init__(self, rtol=1e-6, atol=1e-9, max_substeps=10000):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_substeps = max_substeps
+        self.h = None
+        self.accepted = 0
+        self.rejected = 0
+
+    def attempt(self, f, t, y, h):
+        """Один подшаг: возвращает (решение 5-го порядка, норма ошибки)"""
+        k = []
+        for i in range(7):
+            yi = y
+            for aij, kj in zip(self.a[i], k):
+                if aij:
+                    yi = yi + kj * (h * aij)
+            k.append(f(t + self.c[i] * h, yi))
+
+        y5 = y + h * sum(bi * ki for bi, ki in zip(self.b, k) if bi)
+        y4 = y + h * sum(bi * ki for bi, ki in zip(self.b_star, k) if bi)
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y5))
+        error = np.sqrt(np.mean(((y5 - y4) / scale) ** 2))
+        return y5, error
+
+    def step(self, f, t, y, dt):
+        t_end = t + dt
+        h = dt if self.h is None else min(self.h, dt)
+        substeps = 0
+
+        while t < t_end and substeps < self.max_substeps:
+            # Не перешагиваем конец интервала
+            last = t + h >= t_end
+            step_h = t_end - t if last else h
+
+            y_new, error = self.attempt(f, t, y, step_h)
+            substeps += 1
+            if error <= 1.0:
+                t = t_end if last else t + step_h
+                y = y_new
+                self.accepted += 1
+            else:
+                self.rejected += 1
+
+            # Новый шаг по оценке ошибки (порядок 5)
+            factor = 0.9 * error ** -0.2 if error > 0 else 5.0
+            h = step_h * min(5.0, max(0.2, factor))
+            if error <= 1.0 and (not last or self.h is None):
+                self.h = h
+
+        if t < t_end:
+            raise RuntimeError(
+                f"dopri5: за {self.max_substeps} подшагов пройдено "
+                f"{dt - (t_end - t):.6g} с из {dt:.6g} с")
+        return y
+
+
+INTEGRATORS = {
+    SemiImplicitEuler.name: SemiImplicitEuler,
+    RK4.name: RK4,
+    VelocityVerlet.name: VelocityVerlet,
+    DormandPrince.name: DormandPrince,
+}
+
+
+def make_integrator(name, **options):
+    """Создает интегратор по имени: euler, rk4, verlet, dopri5"""
+    try:
+        return INTEGRATORS[name](**options)
+    except KeyError:
+        raise ValueError(f"Неизвестный интегратор: {name}")
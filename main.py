@@ -1,34 +1,60 @@
+import time
+START_TIME = time.perf_counter()  # Для замера времени запуска
+
+import argparse
 import customtkinter as ctk
 import tkinter
-from Determ_accel import AccelerationWindow
-from Determ_stiffness import StiffnessWindow
+from experiments import EXPERIMENTS, warm_up
+from scheduler import FrameScheduler
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 class MainWindow(ctk.CTk):
-    def __init__(self):
+    def __init__(self, report_startup=False, warm=True):
         super().__init__()
         self.title("Физические лабораторные работы")
         self.geometry("600x400")
-        
+        self.report_startup = report_startup
+        self.warm = warm
+        self.startup_time = None
+        # Один таймер кадров на все открытые окна работ
+        self.scheduler = FrameScheduler(self)
+
         self.create_widgets()
-    
+        # Модули работ подгружаются в фоне только после первой отрисовки
+        self.after_idle(self.on_first_paint)
+
     def create_widgets(self):
         self.main_frame = ctk.CTkFrame(self)
         self.main_frame.pack(expand=True, fill="both", padx=20, pady=20)
-        
-        ctk.CTkLabel(self.main_frame, text="Выберите лабораторную работу:", 
+
+        ctk.CTkLabel(self.main_frame, text="Выберите лабораторную работу:",
                     font=ctk.CTkFont(size=18, weight="bold")).pack(pady=20)
-        
-        btn1 = ctk.CTkButton(self.main_frame, text="Определение ускорения тела при равноускоренном движении", 
-                           command=lambda: AccelerationWindow(self))
-        btn1.pack(pady=15, ipadx=20, ipady=10)
-        
-        btn2 = ctk.CTkButton(self.main_frame, text="Определение коэффициента жёсткости пружины", 
-                           command=lambda: StiffnessWindow(self))
-        btn2.pack(pady=15, ipadx=20, ipady=10)
+
+        # Кнопки строятся по реестру, модуль работы импортируется при нажатии
+        for experiment in EXPERIMENTS:
+            btn = ctk.CTkButton(self.main_frame, text=experiment.title,
+                              command=lambda e=experiment: e.open(self))
+            btn.pack(pady=15, ipadx=20, ipady=10)
+
+    def on_first_paint(self):
+        self.update_idletasks()
+        self.startup_time = time.perf_counter() - START_TIME
+        if self.report_startup:
+            print(f"Время запуска: {self.startup_time * 1000:.0f} мс")
+            self.destroy()
+            return
+        if self.warm:
+            self.after(200, warm_up)
 
 if __name__ == "__main__":
-    app = MainWindow()
-    app.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Физические лабораторные работы")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="вывести время до первой отрисовки и выйти")
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help="не подгружать модули работ в фоне")
+    args = parser.parse_args()
+
+    app = MainWindow(report_startup=args.startup_time, warm=not args.no_warm_up)
+    app.mainloop()
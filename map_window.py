@@ -0,0 +1,309 @@
+import os
+import tkinter
+from concurrent.futures import ProcessPoolExecutor
+
+import customtkinter as ctk
+import numpy as np
+
+from parammap import (COLORMAP, MAPS, MAX_LEVEL, TileCache, colorize,
+                      compose, compute_tile, to_ppm)
+from scheduler import FrameScheduler
+
+
+class ParamMapWindow(ctk.CTkToplevel):
+    """Тепловые карты величин по двум параметрам моделей
+
+    Изображение собирается из плиток: сначала крупные (видны почти
+    сразу), затем мелкие дорисовывают детали. Плитки считаются в пуле
+    процессов и кэшируются на диске; перетаскивание мышью сдвигает вид,
+    колесо масштабирует его, готовые плитки при этом не пересчитываются.
+
+    Собственного таймера у окна нет: пока есть что перерисовать или
+    ждать плитки, оно зарегистрировано в общем планировщике кадров.
+    """
+    zoom_step = 0.8
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Карты параметров")
+        self.geometry("900x600")
+        self.minsize(700, 450)
+        self.master = master
+
+        self.grid_columnconfigure(0, weight=3)
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.cache = TileCache()
+        self.pool = None
+        self.pending = {}        # Ключ плитки -> future
+        self.dirty = False       # Вид или плитки изменились с прошлого кадра
+        self.scheduler = getattr(master, 'scheduler', None) or FrameScheduler(self)
+        self.values = None       # Значения в пикселях последнего кадра
+        self.image = None        # PhotoImage нужно держать, иначе Tk его удалит
+        self.drag_from = None
+
+        self.param_map = MAPS['settling']
+        self.fixed = {}
+        self.view = self.param_map.extent
+
+        self.create_widgets()
+        self.select_map(self.param_map.title)
+
+        self.master.withdraw()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.grab_set()
+
+    def create_widgets(self):
+        # Левая панель - карта
+        self.map_frame = ctk.CTkFrame(self, corner_radius=10)
+        self.map_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.title_label = ctk.CTkLabel(self.map_frame, text="",
+                                        font=ctk.CTkFont(size=16, weight="bold"))
+        self.title_label.pack(pady=(15,5))
+
+        self.canvas = ctk.CTkCanvas(self.map_frame, bg="#1e1e1e",
+                                    highlightthickness=0)
+        self.canvas.pack(expand=True, fill="both", padx=20, pady=5)
+        self.image_item = self.canvas.create_image(0, 0, anchor="nw")
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<ButtonRelease-1>", lambda e: self.end_drag())
+        self.canvas.bind("<MouseWheel>",
+                         lambda e: self.zoom(e.x, e.y, e.delta > 0))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(e.x, e.y, True))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(e.x, e.y, False))
+        self.canvas.bind("<Motion>", self.show_value)
+
+        self.axes_label = ctk.CTkLabel(self.map_frame, text="")
+        self.axes_label.pack()
+        self.value_label = ctk.CTkLabel(self.map_frame, text="")
+        self.value_label.pack(pady=(0,10))
+
+        # Правая панель - управление
+        self.control_frame = ctk.CTkFrame(self, corner_radius=10)
+        self.control_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
+
+        ctk.CTkLabel(self.control_frame, text="Карта:",
+                     font=ctk.CTkFont(size=14)).pack(pady=(15,5))
+        self.map_var = ctk.StringVar(value=self.param_map.title)
+        ctk.CTkOptionMenu(self.control_frame,
+                          values=[m.title for m in MAPS.values()],
+                          variable=self.map_var,
+                          command=self.select_map).pack(pady=5, padx=10)
+
+        # Фиксированный параметр карты (груз или длина плоскости)
+        self.fixed_label = ctk.CTkLabel(self.control_frame, text="")
+        self.fixed_label.pack(pady=(10,0))
+        self.fixed_var = ctk.StringVar()
+        entry = ctk.CTkEntry(self.control_frame, textvariable=self.fixed_var)
+        entry.pack(pady=5, padx=10)
+        entry.bind("<Return>", lambda e: self.apply_fixed())
+        ctk.CTkButton(self.control_frame, text="Применить",
+                      command=self.apply_fixed).pack(pady=5)
+
+        # Цветовая шкала
+        self.colorbar = ctk.CTkCanvas(self.control_frame, width=len(COLORMAP),
+                                      height=16, highlightthickness=0)
+        self.colorbar.pack(pady=(20,0))
+        rgb = np.repeat(COLORMAP[None], 16, axis=0)
+        self.colorbar_image = tkinter.PhotoImage(master=self, data=to_ppm(rgb))
+        self.colorbar.create_image(0, 0, anchor="nw",
+                                   image=self.colorbar_image)
+        self.scale_label = ctk.CTkLabel(self.control_frame, text="")
+        self.scale_label.pack()
+
+        ctk.CTkButton(self.control_frame, text="Сброс вида",
+                      command=self.reset_view).pack(pady=20)
+
+        self.status_label = ctk.CTkLabel(self.control_frame, text="",
+                                         justify="left")
+        self.status_label.pack(pady=5)
+
+    def select_map(self, title):
+        """Переключает карту: вид и фиксированные параметры по умолчанию"""
+        self.param_map = next(m for m in MAPS.values() if m.title == title)
+        self.fixed = {name: default
+                      for name, (_, default) in self.param_map.fixed.items()}
+        name, (label, default) = next(iter(self.param_map.fixed.items()))
+        self.fixed_label.configure(text=label)
+        self.fixed_var.set(f"{default:g}")
+        self.title_label.configure(text=self.param_map.title)
+        self.scale_label.configure(
+            text=f"{self.param_map.vmin:g} – {self.param_map.vmax:g} "
+                 f"{self.param_map.unit} (серый - нет значения)")
+        self.cancel_pending()
+        self.reset_view()
+
+    def apply_fixed(self):
+        try:
+            value = float(self.fixed_var.get())
+        except ValueError:
+            self.status_label.configure(text="Введите число!")
+            return
+        name = next(iter(self.param_map.fixed))
+        if value != self.fixed[name]:
+            self.fixed[name] = value
+            self.cancel_pending()
+            self.schedule_redraw()
+
+    def reset_view(self):
+        self.view = self.param_map.extent
+        self.schedule_redraw()
+
+    # Вид: перетаскивание и масштаб
+
+    def pixel_to_world(self, x, y):
+        width, height = self.canvas_size()
+        vx0, vx1, vy0, vy1 = self.view
+        return (vx0 + x / width * (vx1 - vx0),
+                vy1 - y / height * (vy1 - vy0))
+
+    def canvas_size(self):
+        return max(self.canvas.winfo_width(), 2), max(self.canvas.winfo_height(), 2)
+
+    def set_view(self, x0, x1, y0, y1):
+        """Устанавливает вид, не выходя за область карты"""
+        ex0, ex1, ey0, ey1 = self.param_map.extent
+        finest = 2 ** MAX_LEVEL
+        width = min(max(x1 - x0, (ex1 - ex0) / finest), ex1 - ex0)
+        height = min(max(y1 - y0, (ey1 - ey0) / finest), ey1 - ey0)
+        x0 = min(max(x0, ex0), ex1 - width)
+        y0 = min(max(y0, ey0), ey1 - height)
+        self.view = (x0, x0 + width, y0, y0 + height)
+        self.schedule_redraw()
+
+    def start_drag(self, event):
+        self.drag_from = (event.x, event.y)
+
+    def drag(self, event):
+        if self.drag_from is None:
+            return
+        width, height = self.canvas_size()
+        vx0, vx1, vy0, vy1 = self.view
+        dx = (event.x - self.drag_from[0]) / width * (vx1 - vx0)
+        dy = (event.y - self.drag_from[1]) / height * (vy1 - vy0)
+        self.drag_from = (event.x, event.y)
+        self.set_view(vx0 - dx, vx1 - dx, vy0 + dy, vy1 + dy)
+
+    def end_drag(self):
+        self.drag_from = None
+
+    def zoom(self, x, y, zoom_in):
+        """Масштабирует вид вокруг точки под курсором"""
+        factor = self.zoom_step if zoom_in else 1 / self.zoom_step
+        cx, cy = self.pixel_to_world(x, y)
+        vx0, vx1, vy0, vy1 = self.view
+        self.set_view(cx - (cx - vx0) * factor, cx + (vx1 - cx) * factor,
+                      cy - (cy - vy0) * factor, cy + (vy1 - cy) * factor)
+
+    # Плитки и отрисовка
+
+    def schedule_redraw(self):
+        """Собирает события (перетаскивание, новые плитки) в одну
+        перерисовку в ближайшем кадре планировщика"""
+        self.dirty = True
+        if not self.scheduler.is_registered(self):
+            self.scheduler.register(self, self.poll, self.render)
+
+    def render(self):
+        if self.dirty:
+            self.dirty = False
+            self.redraw()
+        if not self.dirty and not self.pending:
+            # Ждать больше нечего - кадры окну не нужны
+            self.scheduler.unregister(self)
+
+    def redraw(self):
+        width, height = self.canvas_size()
+        level = self.param_map.level_for_view(self.view, width)
+        self.values = compose(self.param_map, self.cache, self.fixed,
+                              self.view, width, height, level)
+        rgb = colorize(self.values, self.param_map.vmin, self.param_map.vmax)
+        self.image = tkinter.PhotoImage(master=self, data=to_ppm(rgb))
+        self.canvas.itemconfig(self.image_item, image=self.image)
+
+        x_label, y_label = self.param_map.x_axis[0], self.param_map.y_axis[0]
+        vx0, vx1, vy0, vy1 = self.view
+        self.axes_label.configure(
+            text=f"{x_label}: {vx0:.4g} – {vx1:.4g}    "
+                 f"{y_label}: {vy0:.4g} – {vy1:.4g}")
+        self.request_tiles(level)
+
+    def request_tiles(self, level):
+        """Ставит в очередь недостающие плитки, от крупных к мелким"""
+        needed = []
+        for tile_level in range(level + 1):
+            for i, j in self.param_map.tiles_for_view(self.view, tile_level):
+                key = self.param_map.tile_key(tile_level, i, j, self.fixed)
+                needed.append((key, tile_level, i, j))
+
+        # Плитки, ушедшие из вида, больше не нужны
+        keys = {key for key, *_ in needed}
+        for key in [key for key in self.pending if key not in keys]:
+            if self.pending[key].cancel():
+                del self.pending[key]
+
+        missing = 0
+        for key, tile_level, i, j in needed:
+            if key in self.pending:
+                missing += 1
+            elif self.cache.get(key) is None:
+                missing += 1
+                self.pending[key] = self.get_pool().submit(
+                    compute_tile, self.param_map.key, tile_level, i, j,
+                    dict(self.fixed))
+        self.status_label.configure(
+            text=f"Уровень детализации: {level}\n"
+                 f"Плиток готово: {len(needed) - missing} из {len(needed)}")
+
+    def get_pool(self):
+        if self.pool is None:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+        return self.pool
+
+    def poll(self):
+        """Забирает посчитанные плитки; новые перерисуются в этом же кадре"""
+        arrived = False
+        for key, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            if future.cancelled():
+                continue
+            try:
+                self.cache.put(key, future.result())
+                arrived = True
+            except Exception as e:
+                self.status_label.configure(text=f"Ошибка плитки: {e}")
+        if arrived:
+            self.dirty = True
+
+    def cancel_pending(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def show_value(self, event):
+        """Значение под курсором"""
+        if self.values is None:
+            return
+        row, column = event.y, event.x
+        if not (0 <= row < self.values.shape[0]
+                and 0 <= column < self.values.shape[1]):
+            return
+        x, y = self.pixel_to_world(event.x, event.y)
+        value = self.values[row, column]
+        text = f"{self.param_map.x_axis[0]} = {x:.4g}, {self.param_map.y_axis[0]} = {y:.4g}: "
+        text += "нет значения" if np.isnan(value) else f"{value:.3g} {self.param_map.unit}"
+        self.value_label.configure(text=text)
+
+    def on_close(self):
+        self.scheduler.unregister(self)
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.master.deiconify()
+        self.destroy()
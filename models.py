@@ -0,0 +1,494 @@
+import copy
+import math
+
+import numpy as np
+
+from integrators import make_integrator
+
+# Жесткость пружин из списка "Тип пружины" (Н/м)
+SPRING_TYPES = {
+    "Стальная": 500,
+    "Медная": 300,
+    "Титановая": 1200,
+}
+
+def as_integrator(integrator):
+    """Принимает интегратор, его имя или None"""
+    if isinstance(integrator, str):
+        return make_integrator(integrator)
+    return integrator
+
+class MovingBody:
+    """Модель движения тела по наклонной плоскости
+    
+    Если задан ограничитель stopper (м), момент удара о него находится
+    точно внутри шага. Между событиями тело движется по точному решению,
+    а если задан integrator - шагами этого интегратора (RK4, Верле и
+    dopri5 при постоянном ускорении совпадают с точным решением). При
+    ударе вызывается on_stopper(body), затем тело отскакивает со
+    скоростью restitution * v или останавливается (restitution = 0 или
+    слишком медленный отскок).
+    """
+    # Отскок медленнее этого (м/с) считается остановкой
+    min_bounce_speed = 1e-3
+    # Наибольшее число событий (ударов, остановок) за один шаг
+    max_events = 100
+    # Состояние, которое меняет точное продвижение по событиям
+    event_fields = ('position', 'velocity', 'acceleration', 'stopped',
+                    'stop_time', 'arrival_time', 'arrival_velocity', 'bounces')
+    
+    def __init__(self, mass, angle, friction=0.1, integrator=None,
+                 stopper=None, restitution=0.0, on_stopper=None):
+        self.mass = mass          # Масса тела (кг)
+        self.angle = math.radians(angle)  # Угол в радианах
+        self.friction = friction  # Коэффициент трения
+        
+        # Физические константы
+        self.gravity = 9.81       # Ускорение свободного падения (м/с²)
+        
+        # Состояние системы
+        self.position = 0.0       # Позиция тела (м)
+        self.velocity = 0.0       # Скорость (м/с)
+        self.acceleration = 0.0   # Ускорение (м/с²)
+        self.time = 0.0           # Время движения (с)
+        
+        # Интегратор: None - встроенный полунеявный Эйлер
+        self.integrator = as_integrator(integrator)
+        
+        # Ограничитель и удары о него
+        self.stopper = stopper            # Положение ограничителя (м)
+        self.restitution = restitution    # Коэффициент восстановления
+        self.on_stopper = on_stopper      # Вызывается в момент удара
+        self.stopped = False              # Тело остановилось у ограничителя
+        self.stop_time = None             # Момент остановки (с)
+        self.arrival_time = None          # Момент первого удара (с)
+        self.arrival_velocity = None      # Скорость при первом ударе (м/с)
+        self.bounces = 0                  # Число отскоков
+        
+    def get_state(self):
+        """Вектор состояния [позиция, скорость]"""
+        return np.array([self.position, self.velocity])
+    
+    def set_state(self, state):
+        self.position = float(state[0])
+        self.velocity = float(state[1])
+    
+    def slope_acceleration(self):
+        """Ускорение вдоль плоскости: a = g*(sin - mu*cos)"""
+        return self.gravity * (math.sin(self.angle) -
+                               self.friction * math.cos(self.angle))
+    
+    def derivative(self, t, state):
+        """Производная состояния: [скорость, ускорение]"""
+        return np.array([state[1], self.slope_acceleration()])
+    
+    def evaluate_at(self, t):
+        """Точное состояние в момент t: (позиция, скорость, ускорение)
+        
+        Вперед по времени решение идет по событиям, как в advance_exact:
+        тело, которое держит трение покоя, стоит на месте, у ограничителя
+        оно отскакивает или останавливается. Назад по времени продолжается
+        только текущий участок равноускоренного движения (до него тело
+        покоилось); через удары назад решение не восстанавливается.
+        """
+        if t >= self.time:
+            body = self.solved_at(t)
+            return body.position, body.velocity, body.acceleration
+        
+        if self.stopped or self.bounces or self.velocity < 0:
+            raise ValueError("Состояние до удара об ограничитель "
+                             "не восстанавливается")
+        a = self.slope_acceleration()
+        if self.velocity == 0 and a <= 0:
+            # Трение покоя держало тело и раньше
+            return self.position, 0.0, 0.0
+        dt = t - self.time
+        if a > 0 and self.velocity + a * dt < 0:
+            # Раньше момента старта тело покоилось
+            dt = -self.velocity / a
+            return self.position + self.velocity * dt / 2, 0.0, 0.0
+        position = self.position + self.velocity * dt + a * dt * dt / 2
+        return position, self.velocity + a * dt, a
+    
+    def solved_at(self, t):
+        """Копия тела, продвинутая до момента t >= time по точному решению"""
+        body = copy.copy(self)
+        body.integrator = None
+        body.on_stopper = None
+        body.advance_exact(t - self.time)
+        return body
+    
+    def seek(self, t):
+        """Переводит тело в момент t без пошагового интегрирования"""
+        if t >= self.time:
+            body = self.solved_at(t)
+            for name in self.event_fields:
+                setattr(self, name, getattr(body, name))
+        else:
+            self.position, self.velocity, self.acceleration = self.evaluate_at(t)
+        self.time = t
+        return self.position
+    
+    def time_to_reach(self, distance):
+        """Точный момент времени, когда тело дойдет до distance (м)
+        
+        Возвращает None, если тело туда никогда не доберется.
+        """
+        a = self.slope_acceleration()
+        gap = distance - self.position
+        if gap <= 0:
+            return self.time
+        
+        # a*dt^2/2 + v*dt - gap = 0, берем наименьший положительный корень
+        if a == 0:
+            return self.time + gap / self.velocity if self.velocity > 0 else None
+        disc = self.velocity ** 2 + 2 * a * gap
+        if disc < 0:
+            return None
+        # Устойчивая формула корня без вычитания близких чисел
+        dt = 2 * gap / (self.velocity + math.sqrt(disc))
+        if dt <= 0:
+            return None
+        return self.time + dt
+        
+    def update(self, dt):
+        """Обновляет состояние за время dt"""
+        if self.stopper is not None:
+            # Между событиями ускорение постоянно, поэтому моменты ударов
+            # считаются точно и не зависят от dt
+            if self.stopped:
+                self.time += dt
+            else:
+                self.advance_exact(dt)
+            return self.position
+        
+        self.free_step(dt)
+        return self.position
+    
+    def free_step(self, dt):
+        """Шаг без учета ограничителя"""
+        if self.integrator is not None:
+            state = self.get_state()
+            self.acceleration = self.derivative(self.time, state)[1]
+            self.set_state(self.integrator.step(self.derivative, self.time, state, dt))
+            self.time += dt
+            return
+        
+        # Вычисляем ускорение
+        F_gravity = self.mass * self.gravity * math.sin(self.angle)
+        F_friction = self.friction * self.mass * self.gravity * math.cos(self.angle)
+        self.acceleration = (F_gravity - F_friction) / self.mass
+        
+        # Обновляем скорость и позицию
+        self.velocity += self.acceleration * dt
+        self.position += self.velocity * dt
+        self.time += dt
+    
+    def integrate(self, dt, acceleration):
+        """Состояние после dt равноускоренного движения по интегратору"""
+        derivative = lambda t, state: np.array([state[1], acceleration])
+        return self.integrator.step(derivative, self.time, self.get_state(), dt)
+    
+    def move(self, dt, acceleration):
+        """Равноускоренное движение в течение dt (точно или интегратором)"""
+        if self.integrator is not None:
+            self.set_state(self.integrate(dt, acceleration))
+        else:
+            self.position += self.velocity * dt + acceleration * dt * dt / 2
+            self.velocity += acceleration * dt
+        self.time += dt
+        self.acceleration = acceleration
+    
+    def advance_exact(self, dt):
+        """Продвигает тело на dt по точному решению с событиями
+        
+        Ускорение постоянно между событиями, поэтому шаг делится на
+        участки: до удара об ограничитель, до верхней точки после отскока
+        (там трение меняет направление) и до конца шага. Каждый участок
+        проходится move(), то есть интегратором, если он задан.
+        """
+        end = self.time + dt
+        for _ in range(self.max_events):
+            remaining = end - self.time
+            if remaining <= 0 or self.stopped:
+                break
+            
+            if self.velocity < 0:
+                # Движение вверх: тяжесть и трение тормозят тело
+                a = self.gravity * (math.sin(self.angle) +
+                                    self.friction * math.cos(self.angle))
+                apex = -self.velocity / a if a > 0 else math.inf
+                if apex > remaining:
+                    self.move(remaining, a)
+                    break
+                self.move(apex, a)
+                self.velocity = 0.0
+                continue
+            
+            a = self.slope_acceleration()
+            if self.velocity == 0 and a <= 0:
+                # Трение покоя удерживает тело
+                self.acceleration = 0.0
+                break
+            delay = self.stopper_delay(remaining, a)
+            if delay is None:
+                self.move(remaining, a)
+                break
+            self.move(delay, a)
+            self.position = self.stopper
+            self.collide()
+        else:
+            # Слишком много ударов за шаг: тело фактически лежит у ограничителя
+            self.stop()
+        
+        # Время идет и у тела, которое держит трение покоя или ограничитель
+        self.time = end
+    
+    def stopper_delay(self, remaining, a):
+        """Через сколько секунд (не позже remaining) тело дойдет до
+        ограничителя; None - за это время не дойдет"""
+        if self.stopper is None:
+            return None
+        if self.integrator is None:
+            hit = self.time_to_reach(self.stopper)
+            if hit is None or hit > self.time + remaining:
+                return None
+            return hit - self.time
+        
+        # Путь интегратора отличается от точного: удар ищется бисекцией
+        reached = lambda h: self.integrate(h, a)[0] >= self.stopper
+        if not reached(remaining):
+            return None
+        low, high = 0.0, remaining
+        for _ in range(60):
+            middle = (low + high) / 2
+            if reached(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+    
+    def collide(self):
+        """Удар об ограничитель в текущий момент"""
+        if self.arrival_time is None:
+            self.arrival_time = self.time
+            self.arrival_velocity = self.velocity
+        if self.on_stopper is not None:
+            self.on_stopper(self)
+            if self.stopped:
+                return
+        rebound = self.restitution * self.velocity
+        if rebound < self.min_bounce_speed:
+            self.stop()
+        else:
+            self.velocity = -rebound
+            self.bounces += 1
+    
+    def stop(self):
+        """Останавливает тело у ограничителя в текущий момент"""
+        self.velocity = 0.0
+        self.stopped = True
+        self.stop_time = self.time
+
+class SimpleSpring:
+    """Простая реализация физики пружины без pymunk"""
+    def __init__(self, k, rest_length, mass, damping=0.2, integrator=None):
+        # Параметры
+        self.k = k / 1000.0  # Жесткость (Н/мм)
+        self.rest_length = rest_length  # Длина покоя (мм)
+        self.mass = mass  # Масса груза (кг)
+        self.damping = damping  # Коэффициент затухания
+        
+        # Состояние
+        self.anchor_pos = (0, 200)  # Верхняя точка крепления
+        self.weight_pos = (0, 200 + rest_length)  # Положение груза
+        self.velocity = 0  # Скорость по вертикали (мм/с)
+        self.force = 0  # Текущая сила (Н)
+        self.gravity = 9.81  # Ускорение свободного падения (м/с^2)
+        self.time = 0.0  # Время симуляции (с)
+        
+        # Интегратор: None - встроенный полунеявный Эйлер
+        self.integrator = as_integrator(integrator)
+    
+    def set_parameters(self, k=None, mass=None, damping=None):
+        """Меняет параметры на ходу, сохраняя положение и скорость груза"""
+        if k is not None:
+            self.k = k / 1000.0
+        if mass is not None:
+            self.mass = mass
+        if damping is not None:
+            self.damping = damping
+    
+    def set_anchor_x(self, x):
+        """Устанавливает горизонтальную позицию точки крепления"""
+        self.anchor_pos = (x, self.anchor_pos[1])
+        self.weight_pos = (x, self.weight_pos[1])
+    
+    def get_state(self):
+        """Вектор состояния [положение груза (мм), скорость (мм/с)]"""
+        return np.array([self.weight_pos[1], self.velocity])
+    
+    def set_state(self, state):
+        self.weight_pos = (self.weight_pos[0], float(state[0]))
+        self.velocity = float(state[1])
+    
+    def derivative(self, t, state):
+        """Производная состояния: [скорость, ускорение]"""
+        extension = state[0] - self.anchor_pos[1]
+        total_force = (-self.k * (extension - self.rest_length)
+                       + self.mass * self.gravity
+                       - self.damping * state[1])
+        return np.array([state[1], total_force / self.mass])
+    
+    def equilibrium_extension(self):
+        """Растяжение в положении равновесия: x = m*g/k (мм)"""
+        return self.mass * self.gravity / self.k
+    
+    def energy(self):
+        """Энергия отклонения от равновесия (в единицах модели)"""
+        deviation = (self.weight_pos[1] - self.anchor_pos[1] - self.rest_length
+                     - self.equilibrium_extension())
+        return 0.5 * self.mass * self.velocity ** 2 + 0.5 * self.k * deviation ** 2
+    
+    def oscillator(self):
+        """Параметры затухающего осциллятора: (gamma, omega0^2)"""
+        gamma = self.damping / (2 * self.mass)
+        return gamma, self.k / self.mass
+    
+    def evaluate_at(self, t):
+        """Точное состояние в момент t: (растяжение, скорость, ускорение)
+        
+        Груз на пружине - линейный затухающий осциллятор, решение
+        берется в замкнутой форме (недо-, критически или передемпфированный
+        случай) от текущего состояния за O(1).
+        """
+        gamma, omega2 = self.oscillator()
+        x_eq = self.equilibrium_extension()
+        u0 = self.weight_pos[1] - self.anchor_pos[1] - self.rest_length - x_eq
+        v0 = self.velocity
+        dt = t - self.time
+        
+        disc = gamma * gamma - omega2
+        if abs(disc) <= 1e-12 * omega2:
+            # Критическое затухание
+            b = v0 + gamma * u0
+            decay = math.exp(-gamma * dt)
+            u = decay * (u0 + b * dt)
+            v = decay * (v0 - gamma * b * dt)
+        elif disc < 0:
+            # Затухающие колебания
+            omega_d = math.sqrt(-disc)
+            decay = math.exp(-gamma * dt)
+            c, s = math.cos(omega_d * dt), math.sin(omega_d * dt)
+            u = decay * (u0 * c + (v0 + gamma * u0) / omega_d * s)
+            v = decay * (v0 * c - (omega2 * u0 + gamma * v0) / omega_d * s)
+        else:
+            # Апериодическое движение
+            root = math.sqrt(disc)
+            r1, r2 = -gamma + root, -gamma - root
+            c1 = (v0 - r2 * u0) / (r1 - r2)
+            c2 = u0 - c1
+            e1, e2 = math.exp(r1 * dt), math.exp(r2 * dt)
+            u = c1 * e1 + c2 * e2
+            v = r1 * c1 * e1 + r2 * c2 * e2
+        
+        acceleration = -omega2 * u - 2 * gamma * v
+        return x_eq + u, v, acceleration
+    
+    def seek(self, t):
+        """Переводит груз в момент t без пошагового интегрирования"""
+        extension, velocity, acceleration = self.evaluate_at(t)
+        y = self.anchor_pos[1] + self.rest_length + extension
+        self.weight_pos = (self.weight_pos[0], y)
+        self.velocity = velocity
+        self.force = acceleration * self.mass
+        self.time = t
+        return extension
+    
+    def settling_time(self, tolerance=0.05):
+        """Точный момент, после которого |x - x_eq| < tolerance (мм) навсегда
+        
+        Считается по огибающей решения. Возвращает math.inf для колебаний
+        без затухания.
+        """
+        gamma, omega2 = self.oscillator()
+        u0 = (self.weight_pos[1] - self.anchor_pos[1] - self.rest_length
+              - self.equilibrium_extension())
+        v0 = self.velocity
+        disc = gamma * gamma - omega2
+        
+        if abs(disc) <= 1e-12 * omega2:
+            a, b = abs(u0), abs(v0 + gamma * u0)
+            envelope = lambda dt: (a + b * dt) * math.exp(-gamma * dt)
+            # Огибающая убывает после своего максимума
+            start = max(0.0, 1 / gamma - a / b) if b > 0 else 0.0
+        elif disc < 0:
+            if gamma == 0:
+                return self.time if u0 == 0 and v0 == 0 else math.inf
+            omega_d = math.sqrt(-disc)
+            amplitude = math.hypot(u0, (v0 + gamma * u0) / omega_d)
+            if amplitude <= tolerance:
+                return self.time
+            return self.time + math.log(amplitude / tolerance) / gamma
+        else:
+            root = math.sqrt(disc)
+            r1, r2 = -gamma + root, -gamma - root
+            c1 = (v0 - r2 * u0) / (r1 - r2)
+            c2 = u0 - c1
+            envelope = lambda dt: (abs(c1) * math.exp(r1 * dt)
+                                   + abs(c2) * math.exp(r2 * dt))
+            start = 0.0
+        
+        if envelope(start) <= tolerance:
+            return self.time + start
+        # Ищем границу удвоением, затем точку пересечения бисекцией
+        low, high = start, start + 1.0
+        while envelope(high) > tolerance:
+            low, high = high, high * 2
+        for _ in range(100):
+            middle = (low + high) / 2
+            if envelope(middle) > tolerance:
+                low = middle
+            else:
+                high = middle
+        return self.time + high
+    
+    def step(self, dt):
+        """Обновление физики за шаг времени dt (в секундах)"""
+        if self.integrator is not None:
+            state = self.get_state()
+            extension = state[0] - self.anchor_pos[1]
+            self.force = self.derivative(self.time, state)[1] * self.mass
+            self.set_state(self.integrator.step(self.derivative, self.time, state, dt))
+            self.time += dt
+            return extension - self.rest_length
+        
+        # Вычисляем текущую длину пружины
+        extension = self.weight_pos[1] - self.anchor_pos[1]
+        
+        # Вычисляем силу упругости: F = -k * (x - L0)
+        # Отрицательная при растяжении (пружина тянет вверх)
+        spring_force = -self.k * (extension - self.rest_length)
+        
+        # Сила тяжести: F = m * g (положительная вниз)
+        gravity_force = self.mass * self.gravity
+        
+        # Сила трения (демпфирования): F = -c * v (противоположна скорости)
+        damping_force = -self.damping * self.velocity
+        
+        # Суммарная сила
+        total_force = spring_force + gravity_force + damping_force
+        self.force = total_force
+        
+        # Ускорение: F = m * a -> a = F / m
+        acceleration = total_force / self.mass
+        
+        # Обновление скорости: v = v0 + a * dt
+        self.velocity += acceleration * dt
+        
+        # Обновление позиции: y = y0 + v * dt
+        new_y = self.weight_pos[1] + self.velocity * dt
+        self.weight_pos = (self.weight_pos[0], new_y)
+        self.time += dt
+        
+        return extension - self.rest_length  # Возвращаем величину растяжения
@@ -0,0 +1,276 @@
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from estimator import AccelerationFit
+
+GRAVITY = 9.81
+
+
+class NoiseModel:
+    """Погрешности приборов при выполнении лабораторной работы"""
+    def __init__(self, ruler_resolution=1.0, reaction_time=0.1,
+                 mass_tolerance=0.01, angle_error=1.0,
+                 stopwatch_resolution=0.01):
+        self.ruler_resolution = ruler_resolution  # Цена деления линейки (мм)
+        self.reaction_time = reaction_time        # СКО реакции на секундомер (с)
+        self.mass_tolerance = mass_tolerance      # Допуск массы груза (доля)
+        self.angle_error = angle_error            # СКО установки угла (°)
+        self.stopwatch_resolution = stopwatch_resolution  # Дискретность (с)
+
+
+def stiffness_trials(rng, n, k, load, noise):
+    """Измеренная жесткость (Н/м) в n опытах с пружиной k и грузом load (г)"""
+    mass = load / 1000
+    true_mass = mass * (1 + rng.uniform(-noise.mass_tolerance,
+                                        noise.mass_tolerance, n))
+    extension = true_mass * GRAVITY / k * 1000  # мм
+
+    # Оба конца отсчитываются по линейке со случайным положением нуля
+    res = noise.ruler_resolution
+    if res > 0:
+        offset = rng.uniform(0, res, n)
+        extension = (np.round((extension + offset) / res)
+                     - np.round(offset / res)) * res
+
+    with np.errstate(divide='ignore'):
+        measured = mass * GRAVITY / (extension / 1000)
+    measured[extension <= 0] = np.nan
+    return measured
+
+
+def acceleration_trials(rng, n, angle, friction, distance, noise):
+    """Измеренное ускорение (м/с²) по времени прохождения distance (м)"""
+    true_angle = np.radians(angle + rng.normal(0, noise.angle_error, n))
+    acceleration = GRAVITY * (np.sin(true_angle)
+                              - friction * np.cos(true_angle))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        travel = np.sqrt(2 * distance / acceleration)
+
+    # Секундомер запускают и останавливают вручную
+    measured_time = (travel + rng.normal(0, noise.reaction_time, n)
+                     - rng.normal(0, noise.reaction_time, n))
+    res = noise.stopwatch_resolution
+    if res > 0:
+        measured_time = np.round(measured_time / res) * res
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        measured = 2 * distance / measured_time ** 2
+    measured[~(measured_time > 0)] = np.nan
+    return measured
+
+
+def acceleration_fit_trials(rng, n, angle, friction, distance, noise,
+                            samples=10):
+    """Ускорение (м/с²) по samples отметкам пути, подобранное МНК
+
+    Отметки ставятся через равные промежутки времени до ограничителя;
+    время округляется секундомером, путь читается по линейке.
+    """
+    true_angle = np.radians(angle + rng.normal(0, noise.angle_error, n))
+    acceleration = GRAVITY * (np.sin(true_angle)
+                              - friction * np.cos(true_angle))
+    moving = acceleration > 0
+    with np.errstate(invalid='ignore'):
+        travel = np.where(moving, np.sqrt(2 * distance / acceleration), 0.0)
+
+    fit = AccelerationFit(shape=n)
+    res = noise.ruler_resolution / 1000  # мм -> м
+    for j in range(1, samples + 1):
+        t = travel * j / samples
+        s = acceleration * t * t / 2
+        if res > 0:
+            s = np.round(s / res + rng.uniform(-0.5, 0.5, n)) * res
+        if noise.stopwatch_resolution > 0:
+            t = np.round(t / noise.stopwatch_resolution) * noise.stopwatch_resolution
+        fit.add(t, s, weight=moving.astype(float))
+    return fit.result(confidence=None)['acceleration']
+
+
+class Accumulator:
+    """Потоковая статистика по частям: среднее, СКО и гистограмма
+
+    Память не зависит от числа опытов: хранится только гистограмма с
+    фиксированными границами и счетчиками выходов за них.
+    """
+    def __init__(self, low, high, bins=2000):
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+        self.invalid = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, values):
+        valid = values[np.isfinite(values)]
+        self.invalid += values.size - valid.size
+        if not valid.size:
+            return
+        # Объединение моментов по Чану
+        n = valid.size
+        mean = valid.mean()
+        m2 = ((valid - mean) ** 2).sum()
+        self._merge_moments(n, mean, m2)
+
+        self.counts += np.histogram(valid, self.edges)[0]
+        self.below += int((valid < self.edges[0]).sum())
+        self.above += int((valid > self.edges[-1]).sum())
+
+    def _merge_moments(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def merge(self, other):
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+        self.counts += other.counts
+        self.below += other.below
+        self.above += other.above
+        self.invalid += other.invalid
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def percentile(self, q):
+        """Квантиль по гистограмме (q от 0 до 1)"""
+        if not self.count:
+            return np.nan
+        cumulative = np.concatenate(([self.below],
+                                     self.below + np.cumsum(self.counts)))
+        target = q * self.count
+        if target <= self.below:
+            return self.edges[0] if self.below == 0 else -np.inf
+        if target > cumulative[-1]:
+            return np.inf
+        return float(np.interp(target, cumulative, self.edges))
+
+    def summary(self, confidence=0.95):
+        tail = (1 - confidence) / 2
+        return {
+            'trials': self.count + self.invalid,
+            'invalid': self.invalid,
+            'mean': self.mean,
+            'std': self.std,
+            'sem': self.std / np.sqrt(self.count) if self.count else np.nan,
+            'ci_low': self.percentile(tail),
+            'ci_high': self.percentile(1 - tail),
+            'confidence': confidence,
+            'edges': self.edges,
+            'counts': self.counts,
+        }
+
+
+def _trials(kind, rng, n, params, noise):
+    if kind == 'stiffness':
+        return stiffness_trials(rng, n, params['k'], params['load'], noise)
+    if kind == 'acceleration_fit':
+        return acceleration_fit_trials(rng, n, params['angle'],
+                                       params['friction'], params['distance'],
+                                       noise)
+    return acceleration_trials(rng, n, params['angle'], params['friction'],
+                               params['distance'], noise)
+
+
+def _run_chunks(kind, params, noise, trials, chunk, seed, low, high, bins):
+    """Выполняет trials опытов частями по chunk и копит статистику"""
+    rng = np.random.default_rng(seed)
+    accumulator = Accumulator(low, high, bins)
+    done = 0
+    while done < trials:
+        n = min(chunk, trials - done)
+        accumulator.add(_trials(kind, rng, n, params, noise))
+        done += n
+    return accumulator
+
+
+def _run_chunks_task(args):
+    return _run_chunks(*args)
+
+
+def run_montecarlo(kind, params, noise=None, trials=100000, chunk=65536,
+                   seed=None, workers=1, bins=2000, confidence=0.95):
+    """Моделирует trials измерений с погрешностями приборов
+
+    kind: 'stiffness' (params: k, load), 'acceleration' (params: angle,
+    friction, distance; ускорение по времени прохождения) или
+    'acceleration_fit' (те же params; ускорение по отметкам пути). Опыты генерируются частями по
+    chunk штук, так что память не растет с числом опытов; при workers > 1
+    части распределяются по процессам с независимыми потоками случайных
+    чисел.
+    """
+    noise = noise or NoiseModel()
+    seeds = np.random.SeedSequence(seed)
+
+    # Пробная партия задает границы гистограммы
+    pilot = _trials(kind, np.random.default_rng(seeds.spawn(1)[0]),
+                    min(4096, trials), params, noise)
+    pilot = pilot[np.isfinite(pilot)]
+    if pilot.size:
+        low, high = np.quantile(pilot, [0.0005, 0.9995])
+        margin = (high - low) * 0.25 or abs(low) * 0.01 or 1.0
+        low, high = low - margin, high + margin
+    else:
+        low, high = 0.0, 1.0
+
+    if workers > 1:
+        shares = [trials // workers + (i < trials % workers)
+                  for i in range(workers)]
+        tasks = [(kind, params, noise, share, chunk, child, low, high, bins)
+                 for share, child in zip(shares, seeds.spawn(workers)) if share]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunks_task, tasks))
+        accumulator = parts[0]
+        for part in parts[1:]:
+            accumulator.merge(part)
+    else:
+        accumulator = _run_chunks(kind, params, noise, trials, chunk,
+                                  seeds.spawn(1)[0], low, high, bins)
+    return accumulator.summary(confidence)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_montecarlo(kind, items, trials):
+    return run_montecarlo(kind, dict(items), trials=trials)
+
+
+_background = None
+
+
+def submit_montecarlo(kind, params, trials=20000):
+    """Запускает run_montecarlo в фоновом потоке и возвращает Future
+
+    Для окон: расчет не держит поток Tk. Результаты запоминаются по
+    параметрам (шум приборов - по умолчанию), так что повторный запуск с
+    теми же ползунками готов сразу.
+    """
+    global _background
+    if _background is None:
+        _background = ThreadPoolExecutor(max_workers=1,
+                                         thread_name_prefix="montecarlo")
+    return _background.submit(_cached_montecarlo, kind,
+                              tuple(sorted(params.items())), trials)
+
+
+def format_interval(summary, unit, digits=2):
+    """Интервал разброса для окна; без корректных опытов - пояснение"""
+    if summary['trials'] == summary['invalid']:
+        return "нет корректных опытов"
+    return (f"{summary['ci_low']:.{digits}f} – "
+            f"{summary['ci_high']:.{digits}f} {unit}")
+
+
+def format_summary(summary, unit):
+    """Краткий отчет о распределении измеренной величины"""
+    percent = int(round(summary['confidence'] * 100))
+    return (f"Среднее: {summary['mean']:.3f} {unit} "
+            f"(СКО {summary['std']:.3f})\n"
+            f"Интервал {percent}%: [{summary['ci_low']:.3f}; "
+            f"{summary['ci_high']:.3f}] {unit}")
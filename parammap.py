@@ -0,0 +1,256 @@
+"""Карты величин по двум параметрам модели, считаемые плитками.
+
+Область параметров делится на плитки квадродерева: на уровне level по
+каждой оси 2**level плиток, в каждой TILE x TILE отсчетов. Плитка
+считается целиком в одном процессе пула и сохраняется на диск по ключу из
+карты, хэша исходного кода модели, фиксированных параметров и положения
+плитки, так что при панорамировании и масштабировании готовые плитки
+только перерисовываются, а после правки модели считаются заново.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from ensemble import MovingBodyEnsemble, SpringEnsemble
+from models import SimpleSpring
+
+# Модули, от которых зависят значения плиток
+MODEL_MODULES = ('models', 'ensemble', 'integrators', 'convergence')
+
+TILE = 32        # Отсчетов плитки по каждой оси
+MAX_LEVEL = 10   # Самый мелкий уровень квадродерева
+MAPS_DIR = 'maps_cache'
+
+
+def settling_tile(k, damping, load=100.0, rest_length=100.0):
+    """Время установления (с) по точному решению SimpleSpring"""
+    times = np.empty(k.shape)
+    for index in np.ndindex(k.shape):
+        spring = SimpleSpring(k[index], rest_length, load / 1000,
+                              damping[index])
+        times[index] = spring.settling_time()
+    times[~np.isfinite(times)] = np.nan
+    return times
+
+
+def k_error_tile(k, damping, load=100.0, rest_length=100.0, dt=0.02,
+                 max_time=120.0):
+    """Погрешность k (%) при измерении в момент, когда окно сочло
+    систему стабилизировавшейся (размах 0.1 мм за 20 отсчетов)"""
+    mass = load / 1000
+    ensemble = SpringEnsemble(k.ravel(), rest_length, mass, damping.ravel(),
+                              window=20, tolerance=0.1, criterion='range')
+    extension = np.full(ensemble.size, np.nan)
+    for _ in range(int(round(max_time / dt))):
+        ensemble.step(dt)
+        newly = ensemble.settled & np.isnan(extension)
+        extension[newly] = ensemble.extension[newly]
+        if ensemble.settled.all():
+            break
+    with np.errstate(divide='ignore', invalid='ignore'):
+        measured = mass * ensemble.gravity / (extension / 1000)
+        error = np.abs(measured - k.ravel()) / k.ravel() * 100
+    return error.reshape(k.shape)
+
+
+def stopper_tile(angle, friction, length=2.7):
+    """Время до ограничителя (с); NaN - тело не сдвигается"""
+    ensemble = MovingBodyEnsemble(np.ones(angle.size), angle.ravel(),
+                                  friction.ravel(), stopper=length)
+    ensemble.step(1e3)  # Точное решение: один шаг до события
+    return ensemble.arrival_time.reshape(angle.shape)
+
+
+def source_hash(function, modules=MODEL_MODULES):
+    """Хэш исходного кода функции и модулей (по именам)"""
+    digest = hashlib.sha1(inspect.getsource(function).encode())
+    for name in modules:
+        module = importlib.import_module(name)
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()
+
+
+class ParamMap:
+    """Описание карты: оси, фиксированные параметры и функция плитки
+
+    function(x, y, **fixed) получает двумерные массивы параметров и
+    возвращает массив значений той же формы. В ключ плитки входит хэш
+    исходного кода function и модулей MODEL_MODULES, так что после правки
+    модели старые плитки из кэша не используются. version нужно
+    увеличивать только при изменениях, которых хэш не видит (например,
+    в других модулях, от которых зависит function).
+    """
+    def __init__(self, key, title, function, x_axis, y_axis, fixed, unit,
+                 vmin, vmax, version=1):
+        self.key = key
+        self.title = title
+        self.function = function
+        self.x_axis = x_axis    # (подпись, от, до)
+        self.y_axis = y_axis
+        self.fixed = fixed      # {имя: (подпись, значение по умолчанию)}
+        self.unit = unit
+        self.vmin = vmin        # Границы цветовой шкалы
+        self.vmax = vmax
+        self.version = version
+        self.source = source_hash(function)
+
+    @property
+    def extent(self):
+        return (self.x_axis[1], self.x_axis[2], self.y_axis[1], self.y_axis[2])
+
+    def tile_bounds(self, level, i, j):
+        """Границы плитки (x0, x1, y0, y1); i - по x, j - по y"""
+        x0, x1, y0, y1 = self.extent
+        width = (x1 - x0) / 2 ** level
+        height = (y1 - y0) / 2 ** level
+        return (x0 + i * width, x0 + (i + 1) * width,
+                y0 + j * height, y0 + (j + 1) * height)
+
+    def tile_grid(self, level, i, j):
+        """Параметры в центрах отсчетов плитки: массивы (TILE, TILE)"""
+        x0, x1, y0, y1 = self.tile_bounds(level, i, j)
+        centers = (np.arange(TILE) + 0.5) / TILE
+        return np.meshgrid(x0 + centers * (x1 - x0), y0 + centers * (y1 - y0))
+
+    def tiles_for_view(self, view, level):
+        """Индексы плиток уровня level, покрывающих вид (x0, x1, y0, y1)"""
+        x0, x1, y0, y1 = self.extent
+        count = 2 ** level
+        width, height = (x1 - x0) / count, (y1 - y0) / count
+        first_i = max(int(math.floor((view[0] - x0) / width)), 0)
+        last_i = min(int(math.ceil((view[1] - x0) / width)), count)
+        first_j = max(int(math.floor((view[2] - y0) / height)), 0)
+        last_j = min(int(math.ceil((view[3] - y0) / height)), count)
+        return [(i, j) for j in range(first_j, last_j)
+                for i in range(first_i, last_i)]
+
+    def level_for_view(self, view, pixels):
+        """Уровень, на котором отсчет плитки занимает около 2 пикселей"""
+        x0, x1 = self.extent[:2]
+        zoom = (x1 - x0) / (view[1] - view[0])
+        level = math.ceil(math.log2(max(zoom * pixels / (2 * TILE), 1)))
+        return min(level, MAX_LEVEL)
+
+    def tile_key(self, level, i, j, fixed):
+        """Ключ кэша плитки"""
+        text = json.dumps([self.key, self.version, self.source, TILE,
+                           level, i, j, sorted(fixed.items())])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+
+def compute_tile(key, level, i, j, fixed):
+    """Значения плитки; функция верхнего уровня для пула процессов"""
+    param_map = MAPS[key]
+    x, y = param_map.tile_grid(level, i, j)
+    with np.errstate(all='ignore'):
+        return param_map.function(x, y, **fixed)
+
+
+MAPS = {param_map.key: param_map for param_map in [
+    ParamMap('settling', "Время установления пружины", settling_tile,
+             ("k, Н/м", 10.0, 1000.0), ("Затухание", 0.01, 2.0),
+             {'load': ("Груз, г", 100.0)}, "с", 0.0, 60.0),
+    ParamMap('k_error', "Погрешность измерения жесткости", k_error_tile,
+             ("k, Н/м", 10.0, 1000.0), ("Затухание", 0.01, 2.0),
+             {'load': ("Груз, г", 100.0)}, "%", 0.0, 50.0),
+    ParamMap('stopper', "Время до ограничителя", stopper_tile,
+             ("Угол, °", 0.0, 60.0), ("Трение", 0.0, 1.0),
+             {'length': ("Длина, м", 2.7)}, "с", 0.0, 5.0),
+]}
+
+
+class TileCache:
+    """Плитки в памяти (последние limit штук) и на диске"""
+    def __init__(self, root=MAPS_DIR, limit=4096):
+        self.root = root
+        self.limit = limit
+        self.memory = OrderedDict()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def get(self, key):
+        values = self.memory.get(key)
+        if values is not None:
+            self.memory.move_to_end(key)
+            return values
+        try:
+            values = np.load(self.path(key))
+        except (OSError, ValueError):
+            return None
+        self.remember(key, values)
+        return values
+
+    def put(self, key, values):
+        self.remember(key, values)
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Запись через временный файл: недописанная плитка не попадет в кэш
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            np.save(f, values)
+        os.replace(temporary, path)
+
+    def remember(self, key, values):
+        self.memory[key] = values
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.limit:
+            self.memory.popitem(last=False)
+
+
+def compose(param_map, cache, fixed, view, width, height, level):
+    """Значения в пикселях вида из готовых плиток уровней 0..level
+
+    Мелкие уровни рисуются поверх крупных, так что пока мелкие плитки
+    считаются, на их месте видны растянутые крупные. Возвращает массив
+    (height, width); где плиток еще нет - NaN.
+    """
+    values = np.full((height, width), np.nan)
+    xs = view[0] + (np.arange(width) + 0.5) * (view[1] - view[0]) / width
+    ys = view[3] - (np.arange(height) + 0.5) * (view[3] - view[2]) / height
+    for tile_level in range(level + 1):
+        for i, j in param_map.tiles_for_view(view, tile_level):
+            tile = cache.get(param_map.tile_key(tile_level, i, j, fixed))
+            if tile is None:
+                continue
+            x0, x1, y0, y1 = param_map.tile_bounds(tile_level, i, j)
+            columns = np.nonzero((xs >= x0) & (xs < x1))[0]
+            rows = np.nonzero((ys >= y0) & (ys < y1))[0]
+            if not len(columns) or not len(rows):
+                continue
+            tile_columns = ((xs[columns] - x0) / (x1 - x0) * TILE).astype(int)
+            tile_rows = ((ys[rows] - y0) / (y1 - y0) * TILE).astype(int)
+            tile_rows = np.minimum(tile_rows, TILE - 1)
+            tile_columns = np.minimum(tile_columns, TILE - 1)
+            values[np.ix_(rows, columns)] = tile[np.ix_(tile_rows, tile_columns)]
+    return values
+
+
+# Опорные цвета палитры viridis, растянутые в таблицу из 256 цветов
+PALETTE = np.array([(68, 1, 84), (59, 82, 139), (33, 145, 140),
+                    (94, 201, 98), (253, 231, 37)], dtype=float)
+COLORMAP = np.stack([np.interp(np.linspace(0, 1, 256),
+                               np.linspace(0, 1, len(PALETTE)), channel)
+                     for channel in PALETTE.T], axis=1).astype(np.uint8)
+MISSING = (60, 60, 60)
+
+
+def colorize(values, vmin, vmax):
+    """RGB (uint8) для массива значений; NaN - серый"""
+    with np.errstate(invalid='ignore'):
+        position = np.clip((values - vmin) / (vmax - vmin), 0, 1)
+    rgb = COLORMAP[(np.nan_to_num(position) * 255).astype(np.uint8)]
+    rgb[np.isnan(values)] = MISSING
+    return rgb
+
+
+def to_ppm(rgb):
+    """Изображение в формате PPM (P6) для tkinter.PhotoImage(data=...)"""
+    height, width = rgb.shape[:2]
+    return f"P6 {width} {height} 255 ".encode() + rgb.tobytes()
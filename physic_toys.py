@@ -0,0 +1,403 @@
+"""Запуск экспериментов без графического интерфейса.
+
+Примеры:
+    python -m physic_toys run accel --mass 1 --angle 30 --until stopper
+    python -m physic_toys run spring --type Медная --load 100 200 500 --summary
+    python -m physic_toys run accel --angle 10 20 30 45 --workers 4 --csv out.csv
+
+Модуль не импортирует tkinter/customtkinter, поэтому работает на серверах
+без дисплея. Физика считается так быстро, как позволяет процессор.
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from campaign import DEFAULT_LOADS, run_campaign, format_campaign
+from convergence import ConvergenceDetector, DEFAULT_TOLERANCE
+from integrators import INTEGRATORS
+from montecarlo import NoiseModel, run_montecarlo, format_summary
+from recorder import TrajectoryRecorder
+from models import MovingBody, SimpleSpring, SPRING_TYPES
+
+ACCEL_FIELDS = ['run', 'mass', 'angle', 'friction',
+                'time', 'position', 'velocity', 'acceleration']
+SPRING_FIELDS = ['run', 'k', 'load', 'damping',
+                 'time', 'extension', 'velocity', 'force']
+
+
+def parse_until(value):
+    """Условие остановки: 'stopper', 'equilibrium' или время в секундах"""
+    if value in ('stopper', 'equilibrium'):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"ожидается 'stopper', 'equilibrium' или число секунд: {value}")
+
+
+def positive_int(value):
+    """Целое число не меньше 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"ожидается целое число не меньше 1: {value}")
+    return number
+
+
+def simulate_accel(run, mass, angle, friction, dt, until, length, max_time,
+                   integrator=None, restitution=0.0):
+    """Генерирует строки траектории тела на наклонной плоскости
+
+    Удар об ограничитель находится точно внутри шага, поэтому при
+    until='stopper' последняя строка относится к моменту остановки тела.
+    """
+    body = MovingBody(mass=mass, angle=angle, friction=friction,
+                      integrator=integrator, stopper=length,
+                      restitution=restitution)
+    limit = until if isinstance(until, float) else max_time
+
+    while body.time < limit - dt / 2:
+        body.update(dt)
+        if until == 'stopper' and body.stopped:
+            yield [run, mass, angle, friction, body.stop_time,
+                   body.position, body.velocity, body.acceleration]
+            break
+        yield [run, mass, angle, friction, body.time,
+               body.position, body.velocity, body.acceleration]
+
+
+def simulate_spring(run, k, load, damping, rest_length, dt, until, max_time,
+                    integrator=None, criterion='range', tolerance=None,
+                    window=20):
+    """Генерирует строки растяжения пружины под нагрузкой"""
+    spring = SimpleSpring(k=k, rest_length=rest_length,
+                          mass=load / 1000, damping=damping,
+                          integrator=integrator)
+    limit = until if isinstance(until, float) else max_time
+    detector = ConvergenceDetector(window, tolerance, criterion)
+    time = 0.0
+
+    while time < limit - dt / 2:
+        extension = spring.step(dt)
+        time += dt
+        yield [run, k, load, damping, time,
+               extension, spring.velocity, spring.force]
+
+        if until != 'equilibrium':
+            continue
+        energy = spring.energy() if criterion == 'energy' else 0.0
+        if detector.update(extension, spring.velocity, energy):
+            break
+
+
+def analytic_accel(run, mass, angle, friction, dt, until, length, max_time,
+                   integrator=None, restitution=0.0):
+    """Итоговая строка прогона по точному решению, без шагов"""
+    body = MovingBody(mass=mass, angle=angle, friction=friction,
+                      stopper=length, restitution=restitution)
+    limit = until if isinstance(until, float) else max_time
+
+    # Один точный шаг до конца прогона со всеми ударами внутри
+    body.update(limit)
+    time = body.time
+    if until == 'stopper' and body.stopped:
+        time = body.stop_time
+    yield [run, mass, angle, friction, time,
+           body.position, body.velocity, body.acceleration]
+
+
+def settling_deviation(spring, criterion, tolerance):
+    """Допуск критерия стабилизации, пересчитанный в отклонение (мм)
+
+    Точное решение дает момент, когда огибающая отклонения становится
+    меньше порога. Для колебаний с амплитудой A размах за период - 2A,
+    наибольшая скорость - omega0*A, энергия - k*A^2/2.
+    """
+    _, omega2 = spring.oscillator()
+    if criterion == 'range':
+        return tolerance / 2
+    if criterion == 'velocity':
+        return tolerance / math.sqrt(omega2)
+    return math.sqrt(2 * tolerance / spring.k)
+
+
+def analytic_spring(run, k, load, damping, rest_length, dt, until, max_time,
+                    integrator=None, criterion='range', tolerance=None):
+    """Итоговая строка прогона по точному решению, без шагов"""
+    spring = SimpleSpring(k=k, rest_length=rest_length,
+                          mass=load / 1000, damping=damping)
+    if until == 'equilibrium':
+        tolerance = DEFAULT_TOLERANCE[criterion] if tolerance is None else tolerance
+        limit = min(spring.settling_time(settling_deviation(
+            spring, criterion, tolerance)), max_time)
+    else:
+        limit = until if isinstance(until, float) else max_time
+
+    extension = spring.seek(limit)
+    yield [run, k, load, damping, spring.time,
+           extension, spring.velocity, spring.force]
+
+
+def build_jobs(args):
+    """Раскладывает списки параметров в декартово произведение прогонов"""
+    if args.experiment == 'accel':
+        grid = itertools.product(args.mass, args.angle, args.friction)
+        return [('accel', (run, mass, angle, friction, args.dt, args.until,
+                           args.length, args.max_time, args.integrator,
+                           args.restitution))
+                for run, (mass, angle, friction) in enumerate(grid)]
+
+    ks = args.k if args.k else [float(SPRING_TYPES[args.type])]
+    grid = itertools.product(ks, args.load, args.damping)
+    return [('spring', (run, k, load, damping, args.rest_length, args.dt,
+                        args.until, args.max_time, args.integrator,
+                        args.criterion, args.tolerance))
+            for run, (k, load, damping) in enumerate(grid)]
+
+
+def iterate_job(job):
+    kind, params = job
+    if kind == 'accel':
+        return simulate_accel(*params)
+    if kind == 'accel-analytic':
+        return analytic_accel(*params)
+    if kind == 'spring-analytic':
+        return analytic_spring(*params)
+    return simulate_spring(*params)
+
+
+def record_rows(rows, job, path):
+    """Пропускает строки прогона, попутно записывая траекторию"""
+    kind, params = job
+    if kind.startswith('accel'):
+        names = ('run', 'mass', 'angle', 'friction')
+    else:
+        names = ('run', 'k', 'load', 'damping')
+    header = dict(zip(names, params))
+    with TrajectoryRecorder(os.path.join(path, f"run_{params[0]:05d}"),
+                            params=header, experiment=kind) as recorder:
+        for row in rows:
+            if kind.startswith('accel'):
+                # Сила: m*a
+                time, position, velocity, acceleration = row[4:8]
+                force = row[1] * acceleration
+            else:
+                # Ускорение: F/m (масса в кг)
+                time, position, velocity, force = row[4:8]
+                acceleration = force / (row[2] / 1000)
+            recorder.append(time, position, velocity, acceleration, force)
+            yield row
+
+
+def select_rows(rows, every, summary):
+    """Прореживает строки: каждая every-я и обязательно последняя"""
+    last = None
+    for i, row in enumerate(rows):
+        last = row
+        if not summary and i % every == 0:
+            yield row
+            last = None
+    if last is not None:
+        yield last
+
+
+def job_rows(job, every=1, summary=False, record=None):
+    """Строки прогона с учетом записи и прореживания"""
+    rows = iterate_job(job)
+    if record:
+        rows = record_rows(rows, job, record)
+    return select_rows(rows, every, summary)
+
+
+def collect_job(job, every=1, summary=False, record=None):
+    """Выполняет прогон целиком (для пула процессов)"""
+    return list(job_rows(job, every, summary, record))
+
+
+def _collect_job(args):
+    return collect_job(*args)
+
+
+def run_command(args):
+    if args.experiment == 'accel' and args.until == 'equilibrium':
+        sys.exit("accel: условие 'equilibrium' применимо только к spring")
+    if args.experiment == 'spring' and args.until == 'stopper':
+        sys.exit("spring: условие 'stopper' применимо только к accel")
+    if args.until is None:
+        args.until = 'stopper' if args.experiment == 'accel' else 'equilibrium'
+
+    jobs = build_jobs(args)
+    if args.analytic:
+        jobs = [(kind + '-analytic', params) for kind, params in jobs]
+    fields = ACCEL_FIELDS if args.experiment == 'accel' else SPRING_FIELDS
+
+    out = open(args.csv, 'w', newline='') if args.csv else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(fields)
+
+        if args.workers > 1 and len(jobs) > 1:
+            # Прогоны распределяются по процессам, вывод сохраняет порядок
+            tasks = [(job, args.every, args.summary, args.record)
+                     for job in jobs]
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                for rows in pool.map(_collect_job, tasks):
+                    writer.writerows(rows)
+        else:
+            # Один процесс: строки выводятся по мере расчета
+            for job in jobs:
+                rows = job_rows(job, args.every, args.summary, args.record)
+                for row in rows:
+                    writer.writerow(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def campaign_command(args):
+    k = args.k if args.k is not None else float(SPRING_TYPES[args.type])
+    result = run_campaign(k, args.loads, args.rest_length, args.damping,
+                          args.dt, args.max_time, args.criterion,
+                          args.tolerance, args.workers, method=args.method)
+    print(format_campaign(result))
+
+
+def montecarlo_command(args):
+    noise = NoiseModel(ruler_resolution=args.ruler_resolution,
+                       reaction_time=args.reaction_time,
+                       mass_tolerance=args.mass_tolerance,
+                       angle_error=args.angle_error)
+    if args.experiment in ('accel', 'accel-fit'):
+        kind = 'acceleration' if args.experiment == 'accel' else 'acceleration_fit'
+        unit = "м/с²"
+        params = {'angle': args.angle, 'friction': args.friction,
+                  'distance': args.length}
+    else:
+        kind, unit = 'stiffness', "Н/м"
+        k = args.k if args.k is not None else float(SPRING_TYPES[args.type])
+        params = {'k': k, 'load': args.load}
+    summary = run_montecarlo(kind, params, noise, args.trials, args.chunk,
+                             args.seed, args.workers)
+    print(f"Опытов: {summary['trials']} (некорректных: {summary['invalid']})")
+    print(format_summary(summary, unit))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='physic_toys',
+        description="Физические лабораторные работы без интерфейса")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="выполнить эксперимент")
+    run.add_argument('experiment', choices=['accel', 'spring'])
+    run.add_argument('--until', type=parse_until, default=None,
+                     help="stopper | equilibrium | время (с)")
+    run.add_argument('--dt', type=float, default=0.02, help="шаг времени (с)")
+    run.add_argument('--integrator', choices=list(INTEGRATORS), default=None,
+                     help="метод интегрирования; по умолчанию пружина - "
+                          "полунеявный Эйлер, тело - точное решение между "
+                          "ударами (rk4, verlet, dopri5 для тела с ним совпадают)")
+    run.add_argument('--analytic', action='store_true',
+                     help="сразу перейти к концу прогона по точному решению")
+    run.add_argument('--max-time', type=float, default=60.0,
+                     help="предельное время прогона (с)")
+    run.add_argument('--every', type=positive_int, default=1,
+                     help="выводить каждую N-ю строку")
+    run.add_argument('--summary', action='store_true',
+                     help="выводить только последнюю строку прогона")
+    run.add_argument('--csv', help="файл для записи вместо stdout")
+    run.add_argument('--workers', type=int, default=1,
+                     help="число процессов для списка параметров")
+    run.add_argument('--record', metavar='DIR',
+                     help="записать траектории прогонов в каталог DIR")
+
+    # Наклонная плоскость
+    run.add_argument('--mass', type=float, nargs='+', default=[1.0],
+                     help="масса тела (кг)")
+    run.add_argument('--angle', type=float, nargs='+', default=[30.0],
+                     help="угол наклона (°)")
+    run.add_argument('--friction', type=float, nargs='+', default=[0.1],
+                     help="коэффициент трения")
+    run.add_argument('--length', type=float, default=2.7,
+                     help="расстояние до ограничителя (м)")
+    run.add_argument('--restitution', type=float, default=0.0,
+                     help="коэффициент восстановления при ударе (0 - остановка)")
+
+    # Пружина
+    run.add_argument('--type', choices=list(SPRING_TYPES), default="Стальная",
+                     help="тип пружины (если --k не задан)")
+    run.add_argument('--k', type=float, nargs='+', help="жесткость (Н/м)")
+    run.add_argument('--load', type=float, nargs='+', default=[100.0],
+                     help="нагрузка (г)")
+    run.add_argument('--damping', type=float, nargs='+', default=[0.2],
+                     help="демпфирование")
+    run.add_argument('--criterion', choices=list(DEFAULT_TOLERANCE),
+                     default='range', help="критерий стабилизации")
+    run.add_argument('--tolerance', type=float, default=None,
+                     help="допуск критерия стабилизации")
+    run.add_argument('--rest-length', type=float, default=100.0,
+                     help="длина пружины в покое (мм)")
+    run.set_defaults(handler=run_command)
+
+    campaign = commands.add_parser(
+        'campaign', help="серия нагрузок и подбор k по F = k*x")
+    campaign.add_argument('--type', choices=list(SPRING_TYPES),
+                          default="Стальная", help="тип пружины")
+    campaign.add_argument('--k', type=float, help="жесткость (Н/м)")
+    campaign.add_argument('--loads', type=float, nargs='+',
+                          default=list(DEFAULT_LOADS), help="нагрузки (г)")
+    campaign.add_argument('--damping', type=float, default=0.2)
+    campaign.add_argument('--rest-length', type=float, default=100.0)
+    campaign.add_argument('--dt', type=float, default=0.02)
+    campaign.add_argument('--max-time', type=float, default=120.0)
+    campaign.add_argument('--criterion', choices=list(DEFAULT_TOLERANCE),
+                          default='energy')
+    campaign.add_argument('--tolerance', type=float, default=None)
+    campaign.add_argument('--workers', type=int, default=1)
+    campaign.add_argument('--method', choices=['settle', 'oscillation'],
+                          default='settle',
+                          help="ждать покоя или измерять по колебаниям")
+    campaign.set_defaults(handler=campaign_command)
+
+    montecarlo = commands.add_parser(
+        'montecarlo', help="разброс измерений из-за погрешностей приборов")
+    montecarlo.add_argument('experiment', choices=['accel', 'accel-fit', 'spring'])
+    montecarlo.add_argument('--trials', type=int, default=100000)
+    montecarlo.add_argument('--chunk', type=int, default=65536,
+                            help="опытов в одной партии")
+    montecarlo.add_argument('--seed', type=int, default=None)
+    montecarlo.add_argument('--workers', type=int, default=1)
+    montecarlo.add_argument('--angle', type=float, default=30.0)
+    montecarlo.add_argument('--friction', type=float, default=0.1)
+    montecarlo.add_argument('--length', type=float, default=2.7)
+    montecarlo.add_argument('--type', choices=list(SPRING_TYPES),
+                            default="Стальная")
+    montecarlo.add_argument('--k', type=float)
+    montecarlo.add_argument('--load', type=float, default=100.0)
+    montecarlo.add_argument('--ruler-resolution', type=float, default=1.0,
+                            help="цена деления линейки (мм)")
+    montecarlo.add_argument('--reaction-time', type=float, default=0.1,
+                            help="СКО реакции на секундомер (с)")
+    montecarlo.add_argument('--mass-tolerance', type=float, default=0.01,
+                            help="допуск массы груза (доля)")
+    montecarlo.add_argument('--angle-error', type=float, default=1.0,
+                            help="СКО установки угла (°)")
+    montecarlo.set_defaults(handler=montecarlo_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
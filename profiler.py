@@ -0,0 +1,158 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _Section:
+    """Замер одного участка кадра (используется через with)"""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+
+
+class FrameProfiler:
+    """Покадровые замеры времени: физика, отрисовка, обновление виджетов
+
+    Хранятся только последние capacity кадров, так что профилировщик можно
+    держать включенным сколько угодно. Трассу можно сохранить в формате
+    Chrome trace events (chrome://tracing, Perfetto).
+    """
+    sections = ('physics', 'render', 'widgets')
+
+    def __init__(self, capacity=3000):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.frames = deque(maxlen=capacity)
+        self.frame = None
+        self.last_start = None
+        self._sections = {name: _Section(self, name) for name in self.sections}
+
+    def reset(self):
+        self.frames.clear()
+        self.frame = None
+        self.last_start = None
+
+    def pause(self):
+        """Следующий кадр не считает интервал от кадра до паузы"""
+        self.last_start = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.frame = {
+            'start': now,
+            'interval': now - self.last_start if self.last_start else None,
+            'sections': [],
+        }
+        self.last_start = now
+
+    def section(self, name):
+        """with profiler.section('physics'): ..."""
+        return self._sections[name]
+
+    def add(self, name, start, end):
+        if self.frame is not None:
+            self.frame['sections'].append((name, start, end))
+
+    def end_frame(self):
+        if self.frame is None:
+            return
+        self.frame['end'] = time.perf_counter()
+        self.frames.append(self.frame)
+        self.frame = None
+
+    def stats(self, last=None):
+        """FPS, перцентили интервала между кадрами и время по участкам (мс)
+
+        last - учитывать только последние last кадров.
+        """
+        frames = list(self.frames)[-last:] if last else list(self.frames)
+        intervals = [f['interval'] for f in frames if f['interval']]
+        result = {'frames': len(frames), 'fps': 0.0,
+                  'p50': 0.0, 'p99': 0.0}
+        if intervals:
+            p50, p99 = np.percentile(intervals, [50, 99])
+            result.update(fps=1 / np.mean(intervals),
+                          p50=p50 * 1000, p99=p99 * 1000)
+        for name in self.sections:
+            total = sum(end - start for f in frames
+                        for section, start, end in f['sections']
+                        if section == name)
+            result[name] = total / len(frames) * 1000 if frames else 0.0
+        return result
+
+    def trace_events(self):
+        """События в формате Chrome trace events (время в мкс)"""
+        events = []
+        for frame in self.frames:
+            events.append(self._event('frame', frame['start'], frame['end']))
+            for name, start, end in frame['sections']:
+                events.append(self._event(name, start, end))
+        return events
+
+    def _event(self, name, start, end):
+        return {'name': name, 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6}
+
+    def export(self, path):
+        """Сохраняет трассу в JSON для chrome://tracing или Perfetto"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(),
+                       'displayTimeUnit': 'ms'}, f)
+
+
+class ProfilerHUD:
+    """Надпись со статистикой профилировщика поверх сцены на canvas
+
+    Текст создается один раз и меняется не чаще period секунд, чтобы сама
+    надпись не влияла на замеры.
+    """
+    def __init__(self, canvas, profiler, period=0.25, window=100):
+        self.canvas = canvas
+        self.profiler = profiler
+        self.period = period
+        self.window = window  # Кадров в статистике
+        self.item = None
+        self.text = None
+        self.last_update = 0.0
+
+    def update(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last_update < self.period:
+            return
+        self.last_update = now
+
+        # Сцена могла пересоздать все элементы canvas
+        if self.item is None or not self.canvas.type(self.item):
+            self.item = self.canvas.create_text(
+                10, 10, anchor="nw", fill="#80ff80", font=("Courier", 10),
+                text="")
+            self.text = None
+
+        stats = self.profiler.stats(self.window)
+        text = (f"FPS {stats['fps']:.1f}  кадр p50 {stats['p50']:.1f} / "
+                f"p99 {stats['p99']:.1f} мс\n"
+                f"физика {stats['physics']:.2f}  отрисовка {stats['render']:.2f}"
+                f"  виджеты {stats['widgets']:.2f} мс\n"
+                f"элементов Tk: {len(self.canvas.find_all()) - 1}")
+        if text != self.text:
+            self.text = text
+            self.canvas.itemconfig(self.item, text=text)
+        self.canvas.tag_raise(self.item)
+
+    def hide(self):
+        if self.item is not None:
+            self.canvas.delete(self.item)
+            self.item = None
+            self.text = None
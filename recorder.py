@@ -0,0 +1,176 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# Столбцы траектории по умолчанию
+COLUMNS = ('time', 'position', 'velocity', 'acceleration', 'force')
+
+HEADER_FILE = 'header.json'
+FORMAT_VERSION = 1
+
+# Каталог для записей прогонов из окон
+RUNS_DIR = 'runs'
+
+
+def new_run_path(experiment, root=RUNS_DIR):
+    """Путь для новой записи: runs/<эксперимент>_<дата>_<время>"""
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(root, f"{experiment}_{stamp}")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(root, f"{experiment}_{stamp}_{suffix}")
+        suffix += 1
+    return path
+
+
+class TrajectoryRecorder:
+    """Запись траектории в столбцовый формат на диске
+
+    Прогон хранится в каталоге: header.json с параметрами и списком частей
+    и файлы chunk_NNNNN.npy формы (число столбцов, chunk_size). Каждый
+    столбец части лежит в файле непрерывно, поэтому его можно читать через
+    np.memmap, не загружая остальные. Отсчеты пишутся прямо в отображенную
+    в память часть, и в памяти одновременно держится только одна часть,
+    сколько бы ни длился прогон.
+    """
+    def __init__(self, path, params=None, experiment=None, columns=COLUMNS,
+                 chunk_size=65536, dtype='float64'):
+        self.path = path
+        self.columns = tuple(columns)
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+        self.header = {
+            'format': FORMAT_VERSION,
+            'experiment': experiment,
+            'params': params or {},
+            'columns': list(self.columns),
+            'dtype': self.dtype.str,
+            'chunk_size': chunk_size,
+            'rows': 0,
+            'chunks': [],
+        }
+        os.makedirs(path, exist_ok=True)
+
+        self.rows = 0
+        self.chunk = None       # Текущая отображенная часть
+        self.chunk_rows = 0     # Заполнено строк в текущей части
+        self.closed = False
+        self.write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open_chunk(self):
+        """Создает следующую часть и отображает ее в память"""
+        index = len(self.header['chunks'])
+        name = f"chunk_{index:05d}.npy"
+        self.chunk = np.lib.format.open_memmap(
+            os.path.join(self.path, name), mode='w+', dtype=self.dtype,
+            shape=(len(self.columns), self.chunk_size))
+        self.chunk_rows = 0
+        self.header['chunks'].append(
+            {'file': name, 'rows': 0, 't_start': None, 't_end': None})
+
+    def close_chunk(self):
+        """Фиксирует текущую часть в заголовке и освобождает отображение"""
+        if self.chunk is None:
+            return
+        self.flush()
+        self.chunk = None
+
+    def append(self, *values):
+        """Добавляет одну строку (значения в порядке столбцов)"""
+        if self.chunk is None or self.chunk_rows == self.chunk_size:
+            self.close_chunk()
+            self.open_chunk()
+        self.chunk[:, self.chunk_rows] = values
+        self.chunk_rows += 1
+        self.rows += 1
+
+    def append_block(self, block):
+        """Добавляет сразу много строк: массив формы (столбцы, n)"""
+        block = np.asarray(block, dtype=self.dtype)
+        start = 0
+        total = block.shape[1]
+        while start < total:
+            if self.chunk is None or self.chunk_rows == self.chunk_size:
+                self.close_chunk()
+                self.open_chunk()
+            n = min(self.chunk_size - self.chunk_rows, total - start)
+            self.chunk[:, self.chunk_rows:self.chunk_rows + n] = \
+                block[:, start:start + n]
+            self.chunk_rows += n
+            self.rows += n
+            start += n
+
+    def flush(self):
+        """Сбрасывает данные на диск, чтобы прогон можно было читать"""
+        if self.chunk is not None:
+            self.chunk.flush()
+            entry = self.header['chunks'][-1]
+            entry['rows'] = self.chunk_rows
+            if self.chunk_rows:
+                entry['t_start'] = float(self.chunk[0, 0])
+                entry['t_end'] = float(self.chunk[0, self.chunk_rows - 1])
+        self.header['rows'] = self.rows
+        self.write_header()
+
+    def close(self):
+        if self.closed:
+            return
+        self.close_chunk()
+        self.closed = True
+
+    def write_header(self):
+        # Заголовок заменяется атомарно, чтобы читатель не увидел половину
+        target = os.path.join(self.path, HEADER_FILE)
+        temporary = target + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.header, f, ensure_ascii=False, indent=1)
+        os.replace(temporary, target)
+
+
+class TrajectoryReader:
+    """Чтение записанной траектории без загрузки всего файла"""
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE), encoding='utf-8') as f:
+            self.header = json.load(f)
+        self.columns = tuple(self.header['columns'])
+        self.params = self.header['params']
+        self.experiment = self.header['experiment']
+        self.chunks = [entry for entry in self.header['chunks'] if entry['rows']]
+        self.rows = sum(entry['rows'] for entry in self.chunks)
+
+    def chunk(self, index):
+        """Часть index как np.memmap формы (столбцы, строки)"""
+        entry = self.chunks[index]
+        data = np.load(os.path.join(self.path, entry['file']), mmap_mode='r')
+        return data[:, :entry['rows']]
+
+    def column(self, name, start=0, stop=None):
+        """Строки [start, stop) столбца name; читаются только нужные части"""
+        col = self.columns.index(name)
+        stop = self.rows if stop is None else min(stop, self.rows)
+        parts = []
+        offset = 0
+        for index, entry in enumerate(self.chunks):
+            end = offset + entry['rows']
+            if end > start and offset < stop:
+                data = self.chunk(index)[col]
+                parts.append(np.array(data[max(start - offset, 0):
+                                           min(stop, end) - offset]))
+            offset = end
+            if offset >= stop:
+                break
+        if not parts:
+            return np.empty(0, dtype=self.header['dtype'])
+        return np.concatenate(parts)
+
+    def __len__(self):
+        return self.rows
@@ -0,0 +1,116 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from recorder import TrajectoryReader
+
+
+class ReplayEngine:
+    """Воспроизведение записанного прогона без повторного расчета
+
+    Индекс ключевых кадров - время начала каждой части записи (из
+    заголовка), так что перемотка к любому моменту открывает только одну
+    часть. Внутри части нужная строка ищется двоичным поиском по столбцу
+    времени.
+    """
+    speeds = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 10.0)
+
+    def __init__(self, path):
+        self.reader = TrajectoryReader(path)
+        if not self.reader.rows:
+            raise ValueError(f"Запись пуста: {path}")
+        self.params = self.reader.params
+        self.experiment = self.reader.experiment
+        self.columns = self.reader.columns
+        self.time_column = self.columns.index('time')
+
+        # Индекс ключевых кадров: время и номер первой строки каждой части
+        self.keyframes = [entry['t_start'] for entry in self.reader.chunks]
+        self.offsets = np.cumsum([0] + [entry['rows']
+                                        for entry in self.reader.chunks])
+        self.start = self.keyframes[0]
+        self.end = self.reader.chunks[-1]['t_end']
+
+        self.chunk_index = None
+        self.chunk = None
+        self.times = None
+        self.next_row = None
+        self.row = 0            # Строка внутри текущей части
+        self.time = self.start
+        self.playing = False
+        self.speed = 1.0
+        self.seek(self.start)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def frame(self):
+        """Номер текущей строки во всей записи"""
+        return int(self.offsets[self.chunk_index]) + self.row
+
+    def load_chunk(self, index):
+        """Открывает часть записи (если она еще не открыта)"""
+        if index != self.chunk_index:
+            self.chunk = self.reader.chunk(index)
+            self.times = np.asarray(self.chunk[self.time_column])
+            self.chunk_index = index
+            # Первая строка следующей части нужна для интерполяции на стыке
+            if index + 1 < len(self.reader.chunks):
+                self.next_row = np.array(self.reader.chunk(index + 1)[:, 0])
+            else:
+                self.next_row = None
+
+    def seek(self, t):
+        """Переходит к моменту t; читается только одна часть записи"""
+        t = min(max(t, self.start), self.end)
+        index = max(bisect_right(self.keyframes, t) - 1, 0)
+        self.load_chunk(index)
+        self.row = max(int(np.searchsorted(self.times, t, side='right')) - 1, 0)
+        self.time = t
+        return self.sample()
+
+    def step(self, frames=1):
+        """Сдвигается на frames записанных кадров вперед или назад"""
+        self.playing = False
+        target = min(max(self.frame + frames, 0), self.reader.rows - 1)
+        index = int(np.searchsorted(self.offsets, target, side='right')) - 1
+        self.load_chunk(index)
+        self.row = target - int(self.offsets[index])
+        self.time = float(self.times[self.row])
+        return self.sample()
+
+    def play(self):
+        if self.time >= self.end:
+            self.seek(self.start)
+        self.playing = True
+
+    def pause(self):
+        self.playing = False
+
+    def advance(self, elapsed):
+        """Продвигает воспроизведение на elapsed секунд реального времени"""
+        if not self.playing:
+            return self.sample()
+        t = self.time + elapsed * self.speed
+        if t >= self.end:
+            t = self.end
+            self.playing = False
+        return self.seek(t)
+
+    def sample(self):
+        """Значения всех столбцов в текущий момент (с интерполяцией)"""
+        values = self.chunk[:, self.row]
+        if self.row + 1 < len(self.times):
+            following = self.chunk[:, self.row + 1]
+        else:
+            following = self.next_row
+        if following is not None:
+            t0, t1 = self.times[self.row], following[self.time_column]
+            if t1 > t0 and self.time > t0:
+                alpha = min((self.time - t0) / (t1 - t0), 1.0)
+                values = values + (following - values) * alpha
+        result = dict(zip(self.columns, (float(v) for v in values)))
+        result['time'] = self.time
+        return result
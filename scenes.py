@@ -0,0 +1,279 @@
+import math
+
+
+class Scene:
+    """Сцена на canvas в сохраняемом режиме
+
+    Элементы создаются один раз в build() и запоминаются по id. При
+    отрисовке кадра меняются только координаты и свойства тех элементов,
+    которые действительно изменились. Статические слои пересоздаются только
+    при изменении размера canvas.
+    """
+    def __init__(self, canvas, colors):
+        self.canvas = canvas
+        self.colors = colors
+        self.width = 0
+        self.height = 0
+        self.built = False
+        self._coords = {}   # Последние координаты элементов
+        self._options = {}  # Последние свойства элементов
+
+    def ensure_size(self, width, height):
+        """Пересоздает сцену, если размер canvas изменился"""
+        if not self.built or (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self.canvas.delete("all")
+            self._coords.clear()
+            self._options.clear()
+            self.build(width, height)
+            self.built = True
+            return True
+        return False
+
+    def build(self, width, height):
+        """Создает элементы сцены (переопределяется в наследниках)"""
+        raise NotImplementedError
+
+    def move(self, item, *coords):
+        """Меняет координаты элемента, только если они изменились"""
+        if self._coords.get(item) != coords:
+            self._coords[item] = coords
+            self.canvas.coords(item, *coords)
+
+    def configure(self, item, **options):
+        """Меняет свойства элемента, только если они изменились"""
+        last = self._options.setdefault(item, {})
+        changed = {key: value for key, value in options.items()
+                   if last.get(key) != value}
+        if changed:
+            last.update(changed)
+            self.canvas.itemconfig(item, **changed)
+
+    def show(self, item, visible):
+        self.configure(item, state="normal" if visible else "hidden")
+
+
+class InclineScene(Scene):
+    """Наклонная плоскость с ограничителем и телом"""
+    def __init__(self, canvas, colors):
+        super().__init__(canvas, colors)
+        self.plane_length = 0
+        self.center = (0, 0)
+        self.angle = 0.0
+
+    def build(self, width, height):
+        # Центр canvas
+        self.center = (width//2, height//2)
+
+        # Длина плоскости
+        self.plane_length = min(width, height) * 0.6
+
+        self.plane = self.canvas.create_line(0, 0, 0, 0,
+                                             fill=self.colors['plane'], width=5)
+        self.stopper = self.canvas.create_rectangle(
+            0, 0, 0, 0, fill=self.colors['stopper'], outline="")
+        self.body = self.canvas.create_oval(0, 0, 0, 0,
+                                            fill=self.colors['body'],
+                                            outline="", state="hidden")
+
+    def draw_plane(self, angle):
+        """Располагает плоскость и ограничитель под углом angle (°)"""
+        self.angle = math.radians(angle)
+        center_x, center_y = self.center
+
+        # Рассчитываем конечные точки (наклон ВНИЗ)
+        end_x = center_x + self.plane_length * math.cos(self.angle)
+        end_y = center_y + self.plane_length * math.sin(self.angle)
+
+        self.move(self.plane, center_x, center_y, end_x, end_y)
+        self.move(self.stopper, end_x-10, end_y-10, end_x+10, end_y+10)
+
+    def draw_body(self, position):
+        """Располагает тело; position в метрах или None, чтобы скрыть"""
+        if position is None:
+            self.show(self.body, False)
+            return
+
+        center_x, center_y = self.center
+        # 100 пикселей = 1 метр
+        pos_x = center_x + (position * 100) * math.cos(self.angle)
+        pos_y = center_y + (position * 100) * math.sin(self.angle)
+
+        self.move(self.body, pos_x-15, pos_y-15, pos_x+15, pos_y+15)
+        self.show(self.body, True)
+
+
+class SpringScene(Scene):
+    """Лабораторный стенд с пружиной, грузом и линейкой"""
+    zigzag_width = 15
+    segments = 12
+    tick_step = 10
+    ruler_width = 5
+
+    def build(self, width, height):
+        self.draw_laboratory_stand(width, height)
+
+        # Подвижные элементы: пружина одной ломаной, груз, линейка
+        self.spring = self.canvas.create_line(
+            0, 0, 0, 0, fill=self.colors['spring'], width=3)
+        self.weight = self.canvas.create_oval(0, 0, 0, 0,
+                                              fill=self.colors['weight'],
+                                              outline="")
+        self.weight_label = self.canvas.create_text(
+            0, 0, text="", fill=self.colors['text'],
+            font=("Arial", 10, "bold"))
+        self.ruler = self.canvas.create_rectangle(
+            0, 0, 0, 0, fill=self.colors['ruler'], outline="")
+
+        # Деления линейки создаются по мере необходимости и скрываются,
+        # когда линейка становится короче
+        self.ticks = []
+        self.visible_ticks = 0
+        self.ruler_origin = None
+
+    def draw_laboratory_stand(self, width, height):
+        """Создает статический лабораторный стенд"""
+        stand_width = 40
+        stand_height = height - 100
+        stand_x = width/2 - stand_width/2
+
+        # Основание стойки
+        self.canvas.create_rectangle(stand_x - 20, 100,
+                                     stand_x + stand_width + 20, 130,
+                                     fill=self.colors['stand'], outline="")
+
+        # Вертикальная стойка
+        self.canvas.create_rectangle(stand_x, 100,
+                                     stand_x + stand_width, stand_height,
+                                     fill=self.colors['stand'], outline="")
+
+        # Кронштейн для крепления
+        bracket_width = 80
+        self.canvas.create_rectangle(stand_x + stand_width, 180,
+                                     stand_x + stand_width + bracket_width, 200,
+                                     fill=self.colors['stand'], outline="")
+
+        # Точка крепления
+        self.anchor = self.canvas.create_oval(0, 0, 0, 0,
+                                              fill=self.colors['anchor'],
+                                              outline="", state="hidden")
+
+    def draw(self, anchor_pos, weight_pos, label):
+        """Обновляет подвижные элементы сцены"""
+        x, y = anchor_pos
+        self.move(self.anchor, x-5, y-5, x+5, y+5)
+        self.show(self.anchor, True)
+
+        self.draw_zigzag_spring(anchor_pos, weight_pos)
+        self.draw_weight(weight_pos, label)
+        self.draw_ruler(weight_pos[0] + 50, anchor_pos[1], weight_pos[1])
+
+    def draw_chain(self, anchor_pos, coil_ys, label):
+        """Обновляет сцену для пружины с распределенной массой
+
+        coil_ys - координаты y точек вдоль пружины (первая - крепление,
+        последняя - груз); витки рисуются через эти точки.
+        """
+        x, y = anchor_pos
+        self.move(self.anchor, x-5, y-5, x+5, y+5)
+        self.show(self.anchor, True)
+
+        points = []
+        last = len(coil_ys) - 1
+        for i, coil_y in enumerate(coil_ys):
+            if i in (0, last):
+                offset = 0
+            else:
+                offset = self.zigzag_width if i % 2 else -self.zigzag_width
+            points.append(x + offset)
+            points.append(float(coil_y))
+        self.move(self.spring, *points)
+        self.configure(self.spring, fill=self.colors['spring'])
+
+        weight_y = float(coil_ys[-1])
+        self.draw_weight((x, weight_y), label)
+        self.draw_ruler(x + 50, y, weight_y)
+
+    def draw_zigzag_spring(self, p1, p2):
+        """Располагает пружину-зигзаг между двумя точками"""
+        dx = p2[0] - p1[0]
+        dy = p2[1] - p1[1]
+
+        # Точки зигзага одной ломаной вместо отдельных отрезков
+        points = [p1[0], p1[1]]
+        for i in range(1, self.segments):
+            t = i / self.segments
+            zigzag_factor = self.zigzag_width if i % 2 else -self.zigzag_width
+            points.append(p1[0] + dx * t + zigzag_factor)
+            points.append(p1[1] + dy * t)
+        points.append(p2[0])
+        points.append(p2[1])
+
+        self.move(self.spring, *points)
+        self.configure(self.spring, fill=self.colors['spring'])
+
+    def draw_weight(self, pos, label):
+        """Располагает груз и надпись с массой"""
+        x, y = pos
+        self.move(self.weight, x-20, y-20, x+20, y+20)
+        self.move(self.weight_label, x, y)
+        self.configure(self.weight_label, text=label)
+
+    def draw_ruler(self, x, y_start, y_end):
+        """Располагает линейку для измерения растяжения"""
+        # Проверяем корректность аргументов
+        if not all(isinstance(val, (int, float)) for val in (x, y_start, y_end)):
+            return
+
+        # Убеждаемся, что конечная точка не меньше начальной
+        if y_end < y_start:
+            y_start, y_end = y_end, y_start
+
+        self.move(self.ruler, x, y_start, x + self.ruler_width, y_end)
+
+        # Деления стоят на месте, пока не сдвинулось начало линейки
+        origin = (x, y_start)
+        if origin != self.ruler_origin:
+            self.ruler_origin = origin
+            for i, (tick, text) in enumerate(self.ticks):
+                self.place_tick(i, tick, text)
+
+        range_length = max(0, int(y_end - y_start))
+        needed = range_length // self.tick_step + 1
+        while len(self.ticks) < needed:
+            self.create_tick(len(self.ticks))
+
+        # Показываем/скрываем только деления на границе длины линейки
+        if needed != self.visible_ticks:
+            low, high = sorted((needed, self.visible_ticks))
+            for tick, text in self.ticks[low:high]:
+                visible = needed > self.visible_ticks
+                self.show(tick, visible)
+                if text is not None:
+                    self.show(text, visible)
+            self.visible_ticks = needed
+
+    def create_tick(self, index):
+        """Создает деление линейки (с подписью на каждом 50 мм)"""
+        i = index * self.tick_step
+        tick = self.canvas.create_line(0, 0, 0, 0, fill="black", width=1,
+                                       state="hidden")
+        text = None
+        if i % 50 == 0:
+            text = self.canvas.create_text(0, 0, text=str(i), anchor="w",
+                                           fill=self.colors['text'],
+                                           state="hidden")
+        self._options[tick] = {'state': "hidden"}
+        if text is not None:
+            self._options[text] = {'state': "hidden"}
+        self.ticks.append((tick, text))
+        self.place_tick(index, tick, text)
+
+    def place_tick(self, index, tick, text):
+        x, y_start = self.ruler_origin
+        i = index * self.tick_step
+        y = y_start + i
+        tick_len = 10 if i % 50 == 0 else 10 / 2
+        self.move(tick, x, y, x + tick_len, y)
+        if text is not None:
+            self.move(text, x + tick_len + 10, y)
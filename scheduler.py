@@ -0,0 +1,149 @@
+import time
+import traceback
+
+
+class FrameScheduler:
+    """Общий таймер кадров для всех открытых окон работ
+
+    Окна (и их виджеты, например панель повтора) регистрируют tick (шаг
+    физики) и render (отрисовка и виджеты).
+    Раз в кадр сначала выполняются все tick, затем все render, так что на
+    кадр приходится один вызов after() вместо отдельной цепочки в каждом
+    окне. Свернутые и скрытые окна пропускаются; при возвращении окна
+    вызывается его resume(), чтобы накопившееся время не ушло в физику.
+
+    Период кадра подстраивается под измеренную стоимость кадра: если кадр
+    занимает больше budget периода, частота снижается (до min_rate), если
+    заметно меньше - возвращается к rate.
+
+    when_done() передает в поток Tk результаты фоновых расчетов (Future):
+    callback вызывается в первом кадре после завершения.
+    """
+    def __init__(self, root, rate=50, min_rate=15, budget=0.8):
+        self.root = root
+        self.base_interval = 1 / rate
+        self.max_interval = 1 / min_rate
+        self.budget = budget
+        self.interval = self.base_interval
+        self.frame_cost = 0.0   # Сглаженная стоимость кадра (с)
+        self.clients = {}
+        self.futures = []       # (окно, future, callback) до завершения
+        self.job = None
+        self.in_frame = False   # Идет кадр: следующий запланирует он сам
+
+    def register(self, window, tick, render=None, resume=None):
+        """Подключает окно; повторная регистрация заменяет callbacks"""
+        self.clients[window] = {'tick': tick, 'render': render,
+                                'resume': resume, 'skipped': False}
+        self.schedule()
+
+    def unregister(self, window):
+        self.clients.pop(window, None)
+        if not self.busy and self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def when_done(self, window, future, callback):
+        """Вызывает callback(future) в кадре после завершения future
+
+        Если окно к тому времени закрыто, callback не вызывается.
+        """
+        self.futures.append((window, future, callback))
+        self.schedule()
+
+    @property
+    def busy(self):
+        return bool(self.clients or self.futures)
+
+    def schedule(self):
+        if self.job is None and not self.in_frame:
+            self.job = self.root.after(0, self.frame)
+
+    def is_registered(self, window):
+        return window in self.clients
+
+    @property
+    def rate(self):
+        return 1 / self.interval
+
+    def visible(self, window):
+        """Виджет показан и его окно не свернуто"""
+        try:
+            return (bool(window.winfo_viewable())
+                    and window.winfo_toplevel().state() != "iconic")
+        except Exception:  # Окно уже уничтожено
+            return False
+
+    def call(self, window, name):
+        client = self.clients.get(window)
+        callback = client and client[name]
+        if not callback:
+            return
+        try:
+            callback()
+        except Exception:
+            # Ошибка одного окна не останавливает остальные
+            traceback.print_exc()
+            self.unregister(window)
+
+    def frame(self):
+        self.job = None
+        self.in_frame = True
+        try:
+            cost = self.run_frame()
+        finally:
+            self.in_frame = False
+        if self.busy:
+            delay = max(self.interval - cost, 0.001)
+            self.job = self.root.after(int(delay * 1000), self.frame)
+
+    def run_frame(self):
+        """Вызывает окна; возвращает стоимость кадра (с)
+
+        register() из callbacks кадра не заводит новый after(): следующий
+        кадр планирует frame() после их завершения.
+        """
+        start = time.perf_counter()
+        self.finish_futures()
+
+        active = []
+        for window, client in list(self.clients.items()):
+            if not window.winfo_exists():
+                self.clients.pop(window)
+            elif not self.visible(window):
+                client['skipped'] = True
+            else:
+                if client['skipped']:
+                    client['skipped'] = False
+                    self.call(window, 'resume')
+                active.append(window)
+
+        for window in active:
+            self.call(window, 'tick')
+        for window in active:
+            self.call(window, 'render')
+
+        cost = time.perf_counter() - start
+        self.adapt(cost)
+        return cost
+
+    def finish_futures(self):
+        """Вызывает callbacks завершившихся фоновых расчетов"""
+        done = [entry for entry in self.futures if entry[1].done()]
+        if not done:
+            return
+        self.futures = [entry for entry in self.futures if not entry[1].done()]
+        for window, future, callback in done:
+            try:
+                if window.winfo_exists():
+                    callback(future)
+            except Exception:
+                traceback.print_exc()
+
+    def adapt(self, cost):
+        """Подстраивает период кадра под его стоимость"""
+        self.frame_cost += 0.2 * (cost - self.frame_cost)
+        if self.frame_cost > self.budget * self.interval:
+            self.interval = min(self.interval * 1.25, self.max_interval)
+        elif self.frame_cost < 0.5 * self.budget * self.interval:
+            self.interval = max(self.interval / 1.25, self.base_interval)
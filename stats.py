@@ -0,0 +1,120 @@
+import math
+from statistics import NormalDist
+
+
+def _beta_continued_fraction(a, b, x):
+    """Цепная дробь для неполной бета-функции (метод Лентца)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1, a - 1
+    c, d = 1.0, 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return h
+
+
+def incomplete_beta(a, b, x):
+    """Регуляризованная неполная бета-функция I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1 - front * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def student_t_cdf(t, df):
+    """Функция распределения Стьюдента с df степенями свободы"""
+    tail = 0.5 * incomplete_beta(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t >= 0 else tail
+
+
+def student_t_quantile(p, df):
+    """Квантиль распределения Стьюдента (обратная функция к cdf)"""
+    if df == math.inf:
+        return NormalDist().inv_cdf(p)
+    if p == 0.5:
+        return 0.0
+    # Бисекция: cdf монотонна, границу ищем удвоением
+    low, high = 0.0, 1.0
+    target = max(p, 1 - p)
+    while student_t_cdf(high, df) < target:
+        low, high = high, high * 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if student_t_cdf(middle, df) < target:
+            low = middle
+        else:
+            high = middle
+    t = (low + high) / 2
+    return t if p > 0.5 else -t
+
+
+def critical_value(confidence, df):
+    """Двусторонний множитель доверительного интервала t_{(1+P)/2}"""
+    if df <= 0:
+        return math.inf
+    return student_t_quantile((1 + confidence) / 2, df)
+
+
+def linear_fit(x, y, confidence=0.95):
+    """Линейная регрессия y = slope*x + intercept методом наименьших квадратов
+
+    Возвращает словарь: slope, intercept, r2, их стандартные ошибки и
+    полуширины доверительных интервалов (slope_ci, intercept_ci).
+    """
+    n = len(x)
+    if n < 2:
+        raise ValueError("Для регрессии нужно хотя бы две точки")
+    mean_x = sum(x) / n
+    mean_y = sum(y) / n
+    sxx = sum((xi - mean_x) ** 2 for xi in x)
+    sxy = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
+    syy = sum((yi - mean_y) ** 2 for yi in y)
+    if sxx == 0:
+        raise ValueError("Все значения x совпадают")
+
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    residual = max(syy - slope * sxy, 0.0)
+    r2 = 1 - residual / syy if syy > 0 else 1.0
+
+    df = n - 2
+    if df > 0:
+        sigma2 = residual / df
+        slope_se = math.sqrt(sigma2 / sxx)
+        intercept_se = math.sqrt(sigma2 * (1 / n + mean_x ** 2 / sxx))
+    else:
+        slope_se = intercept_se = math.nan
+    t = critical_value(confidence, df)
+
+    return {
+        'n': n,
+        'slope': slope,
+        'intercept': intercept,
+        'r2': r2,
+        'slope_se': slope_se,
+        'intercept_se': intercept_se,
+        'slope_ci': t * slope_se,
+        'intercept_ci': t * intercept_se,
+        'confidence': confidence,
+    }
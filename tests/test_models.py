@@ -0,0 +1,136 @@
+import numpy as np
+
+from ensemble import MovingBodyEnsemble
+from models import MovingBody
+
+
+def test_held_body_time_advances():
+    # tan(10°) < 0.5: трение покоя удерживает тело на месте
+    body = MovingBody(1.0, 10.0, friction=0.5, stopper=2.7)
+    for _ in range(50):
+        body.update(0.02)
+    assert np.isclose(body.time, 1.0)
+    assert body.position == 0.0 and body.velocity == 0.0
+    assert not body.stopped
+
+
+def test_body_held_after_apex():
+    body = MovingBody(1.0, 10.0, friction=0.5, stopper=2.7)
+    body.velocity = -1.0  # Толчок вверх по плоскости
+    up = body.gravity * (np.sin(body.angle) + 0.5 * np.cos(body.angle))
+    body.update(1.0)
+    assert np.isclose(body.time, 1.0)
+    assert body.velocity == 0.0
+    assert np.isclose(body.position, -1.0 / (2 * up))
+    body.update(1.0)
+    assert np.isclose(body.time, 2.0)
+    assert np.isclose(body.position, -1.0 / (2 * up))
+
+
+def test_scalar_and_ensemble_times_agree():
+    angles = np.array([0.0, 10.0, 30.0, 45.0])
+    frictions = np.array([0.1, 0.5, 0.1, 0.3])
+    ensemble = MovingBodyEnsemble(np.ones(4), angles, frictions,
+                                  stopper=2.7, restitution=0.5)
+    bodies = [MovingBody(1.0, angle, friction, stopper=2.7, restitution=0.5)
+              for angle, friction in zip(angles, frictions)]
+    for _ in range(100):
+        ensemble.step(0.05)
+        for body in bodies:
+            body.update(0.05)
+    assert np.allclose(ensemble.time, [body.time for body in bodies])
+    assert np.allclose(ensemble.position, [body.position for body in bodies])
+    assert np.allclose(ensemble.velocity, [body.velocity for body in bodies])
+
+
+def closed_form_arrival(angle, friction, length):
+    body = MovingBody(1.0, angle, friction)
+    return np.sqrt(2 * length / body.slope_acceleration())
+
+
+def test_stopper_delay_exact():
+    body = MovingBody(1.0, 30.0, friction=0.1, stopper=2.7)
+    a = body.slope_acceleration()
+    expected = closed_form_arrival(30.0, 0.1, 2.7)
+    assert np.isclose(body.stopper_delay(10.0, a), expected)
+    assert body.stopper_delay(expected / 2, a) is None
+
+
+def test_stopper_delay_follows_integrator_path():
+    body = MovingBody(1.0, 30.0, friction=0.1, stopper=2.7, integrator='euler')
+    a = body.slope_acceleration()
+    delay = body.stopper_delay(2.0, a)
+    assert np.isclose(body.integrate(delay, a)[0], 2.7)
+    assert body.stopper_delay(delay * 0.9, a) is None
+
+
+def test_arrival_time_matches_closed_form():
+    for dt in (0.5, 0.02):
+        body = MovingBody(1.0, 30.0, friction=0.1, stopper=2.7)
+        while not body.stopped:
+            body.update(dt)
+        expected = closed_form_arrival(30.0, 0.1, 2.7)
+        assert np.isclose(body.arrival_time, expected)
+        assert np.isclose(body.stop_time, expected)
+        assert np.isclose(body.arrival_velocity,
+                          body.slope_acceleration() * expected)
+        assert body.position == 2.7 and body.velocity == 0.0
+
+
+def test_restitution_bounce():
+    body = MovingBody(1.0, 30.0, friction=0.1, stopper=2.7, restitution=0.5)
+    hit = closed_form_arrival(30.0, 0.1, 2.7)
+    body.update(hit + 1e-3)
+    assert body.bounces == 1
+    assert not body.stopped
+    rebound = 0.5 * body.arrival_velocity
+    up = body.gravity * (np.sin(body.angle) + 0.1 * np.cos(body.angle))
+    assert np.isclose(body.velocity, -rebound + up * 1e-3)
+    assert body.position < 2.7
+
+    # Отскоки затухают, и тело в итоге останавливается у ограничителя
+    for _ in range(500):
+        body.update(0.02)
+    assert body.stopped
+    assert body.position == 2.7
+    assert body.bounces > 1
+
+
+def stepped(body, t, dt=0.01):
+    while body.time < t - 1e-12:
+        body.advance_exact(min(dt, t - body.time))
+    return body
+
+
+def test_seek_matches_stepping():
+    cases = [(30.0, 0.1, 0.0), (30.0, 0.1, 0.6), (10.0, 0.5, 0.0),
+             (0.0, 0.1, 0.0)]
+    for angle, friction, restitution in cases:
+        for t in (0.3, 1.0, 1.5, 3.0):
+            body = MovingBody(1.0, angle, friction, stopper=2.7,
+                              restitution=restitution)
+            reference = stepped(MovingBody(1.0, angle, friction, stopper=2.7,
+                                           restitution=restitution), t)
+            body.seek(t)
+            assert np.isclose(body.time, t)
+            assert np.isclose(body.position, reference.position)
+            assert np.isclose(body.velocity, reference.velocity)
+            assert body.stopped == reference.stopped
+            assert body.bounces == reference.bounces
+
+
+def test_evaluate_at_respects_friction_and_stopper():
+    held = MovingBody(1.0, 10.0, friction=0.5, stopper=2.7)
+    assert held.evaluate_at(5.0) == (0.0, 0.0, 0.0)
+    assert held.time == 0.0  # evaluate_at не меняет тело
+
+    body = MovingBody(1.0, 30.0, friction=0.1, stopper=2.7)
+    position, velocity, _ = body.evaluate_at(10.0)
+    assert position == 2.7 and velocity == 0.0
+
+    # Назад по времени: до старта тело покоилось
+    body.seek(0.5)
+    position, velocity, _ = body.evaluate_at(-1.0)
+    assert position == 0.0 and velocity == 0.0
+    assert np.isclose(body.evaluate_at(0.25)[0],
+                      body.slope_acceleration() * 0.25 ** 2 / 2)
@@ -0,0 +1,84 @@
+from concurrent.futures import Future
+
+from scheduler import FrameScheduler
+
+
+class FakeRoot:
+    """Вместо Tk: after() только запоминает отложенные вызовы"""
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+
+class FakeWindow:
+    def winfo_exists(self):
+        return True
+
+    def winfo_viewable(self):
+        return True
+
+    def winfo_toplevel(self):
+        return self
+
+    def state(self):
+        return "normal"
+
+
+def test_register_during_frame_keeps_one_chain():
+    root = FakeRoot()
+    scheduler = FrameScheduler(root)
+    window, other = FakeWindow(), FakeWindow()
+    ticks = []
+
+    def tick():
+        ticks.append(window)
+        # Повторная регистрация и новое окно прямо из кадра
+        scheduler.register(window, tick)
+        scheduler.register(other, lambda: None)
+
+    scheduler.register(window, tick)
+    for _ in range(5):
+        assert len(root.jobs) == 1
+        root.run_pending()
+    assert len(root.jobs) == 1
+    assert len(ticks) == 5
+
+
+def test_unregister_last_window_stops_frames():
+    root = FakeRoot()
+    scheduler = FrameScheduler(root)
+    window = FakeWindow()
+    scheduler.register(window, lambda: scheduler.unregister(window))
+    root.run_pending()
+    assert not root.jobs
+    # Новая регистрация снова запускает кадры
+    scheduler.register(window, lambda: None)
+    assert len(root.jobs) == 1
+
+
+def test_when_done_calls_back_in_frame():
+    root = FakeRoot()
+    scheduler = FrameScheduler(root)
+    window = FakeWindow()
+    future = Future()
+    results = []
+    scheduler.when_done(window, future, lambda done: results.append(done.result()))
+    root.run_pending()
+    assert not results and len(root.jobs) == 1  # Ждем завершения
+    future.set_result(42)
+    root.run_pending()
+    assert results == [42]
+    assert not root.jobs
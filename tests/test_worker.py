@@ -0,0 +1,77 @@
+import multiprocessing
+
+import numpy as np
+
+from worker import SnapshotBuffer
+
+
+class InterleavedCopy:
+    """Буфер, посреди копирования которого вмешивается писатель"""
+    def __init__(self, array, writer):
+        self.array = array
+        self.writer = writer
+
+    def copy(self):
+        half = len(self.array) // 2
+        first = self.array[:half].copy()
+        self.writer()
+        return np.concatenate((first, self.array[half:]))
+
+
+class InterleavedBuffer(SnapshotBuffer):
+    """Снимок, у которого следующее обращение к буферу прерывается записью"""
+    writer = None
+
+    def buffer(self, index):
+        view = super().buffer(index)
+        writer, self.writer = self.writer, None
+        return InterleavedCopy(view, writer) if writer else view
+
+
+def test_read_retries_when_writer_reuses_buffer():
+    size = 4
+    snapshot = InterleavedBuffer(size)
+
+    def writer():
+        # Публикуем снимок 3 и успеваем наполовину записать снимок 4
+        # в тот самый буфер, который сейчас копирует читатель
+        snapshot.write(np.full(size, 3.0))
+        snapshot.buffer(0)[:] = 4.0
+
+    try:
+        snapshot.write(np.full(size, 1.0))
+        snapshot.write(np.full(size, 2.0))
+        snapshot.writer = writer
+        sequence, values = snapshot.read()
+        assert sequence == 3
+        assert np.all(values == 3.0)
+    finally:
+        snapshot.close()
+
+
+def write_snapshots(name, size, count):
+    snapshot = SnapshotBuffer(size, name)
+    try:
+        for sequence in range(1, count + 1):
+            snapshot.write(np.full(size, float(sequence)))
+    finally:
+        snapshot.close()
+
+
+def test_read_is_consistent_with_concurrent_writer():
+    size = 4096
+    snapshot = SnapshotBuffer(size)
+    writer = multiprocessing.Process(target=write_snapshots,
+                                     args=(snapshot.name, size, 20000))
+    try:
+        writer.start()
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            sequence, values = snapshot.read()
+            # Каждый снимок заполнен своим номером
+            assert np.all(values == sequence), (sequence, np.unique(values))
+            reads += 1
+        writer.join()
+        assert writer.exitcode == 0
+    finally:
+        snapshot.close()
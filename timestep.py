@@ -0,0 +1,60 @@
+import time
+
+
+class FixedTimestep:
+    """Фиксированный шаг физики, не зависящий от частоты кадров
+
+    Реальное время между кадрами (умноженное на time_scale) копится в
+    аккумуляторе и расходуется шагами dt = 1/physics_rate. Остаток шага
+    возвращается как alpha (0..1) для интерполяции отрисовки между
+    предыдущим и текущим состоянием.
+
+    Число шагов за кадр ограничено max_substeps: если кадр сильно
+    опоздал, лишнее время отбрасывается, и симуляция просто замедляется,
+    а не уходит в "спираль смерти".
+    """
+    min_time_scale = 0.1
+    max_time_scale = 100.0
+
+    def __init__(self, physics_rate=500, time_scale=1.0, max_substeps=2000):
+        self.dt = 1.0 / physics_rate
+        self.time_scale = time_scale
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.last_time = None
+        self.dropped_time = 0.0  # Отброшенное время симуляции (с)
+
+    def set_time_scale(self, scale):
+        """Устанавливает масштаб времени (0.1x .. 100x)"""
+        self.time_scale = min(max(scale, self.min_time_scale),
+                              self.max_time_scale)
+
+    def start(self):
+        """Начинает отсчет заново (после паузы или сброса)"""
+        self.accumulator = 0.0
+        self.last_time = time.perf_counter()
+
+    def advance(self, now=None):
+        """Возвращает (число шагов физики, alpha) для текущего кадра"""
+        if now is None:
+            now = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = now
+        elapsed = now - self.last_time
+        self.last_time = now
+
+        self.accumulator += elapsed * self.time_scale
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+
+        if steps > self.max_substeps:
+            # Бюджет шагов исчерпан: отбрасываем невыполненное время
+            self.dropped_time += (steps - self.max_substeps) * self.dt
+            steps = self.max_substeps
+
+        return steps, self.accumulator / self.dt
+
+
+def interpolate(previous, current, alpha):
+    """Линейная интерполяция состояния для отрисовки"""
+    return previous + (current - previous) * alpha
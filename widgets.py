@@ -0,0 +1,103 @@
+import time
+
+import customtkinter as ctk
+
+
+class ReplayPanel(ctk.CTkFrame):
+    """Панель воспроизведения записи: пауза, перемотка, покадровый шаг
+
+    on_frame(sample) вызывается с новым состоянием при каждом изменении
+    позиции, on_close() - при закрытии панели. Во время воспроизведения
+    панель получает кадры от общего планировщика scheduler, так что
+    повтор замедляется и приостанавливается вместе с остальными окнами.
+    """
+    def __init__(self, master, engine, on_frame, on_close, scheduler):
+        super().__init__(master)
+        self.engine = engine
+        self.on_frame = on_frame
+        self.on_close = on_close
+        self.scheduler = scheduler
+        self.last_tick = None
+
+        self.time_label = ctk.CTkLabel(self, text="")
+        self.time_label.pack(pady=(5,0))
+
+        # Шкала времени (позиция в секундах записи)
+        self.scrubber = ctk.CTkSlider(self, from_=engine.start,
+                                      to=max(engine.end, engine.start + 1e-6),
+                                      command=self.on_scrub)
+        self.scrubber.pack(fill="x", padx=10, pady=5)
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.pack(pady=(0,5))
+
+        ctk.CTkButton(buttons, text="◀ кадр", width=70,
+                      command=lambda: self.step(-1)).pack(side="left", padx=3)
+        self.play_btn = ctk.CTkButton(buttons, text="▶", width=50,
+                                      command=self.toggle_play)
+        self.play_btn.pack(side="left", padx=3)
+        ctk.CTkButton(buttons, text="кадр ▶", width=70,
+                      command=lambda: self.step(1)).pack(side="left", padx=3)
+
+        self.speed_var = ctk.StringVar(value="1×")
+        ctk.CTkComboBox(buttons, width=80,
+                        values=[f"{speed:g}×" for speed in engine.speeds],
+                        variable=self.speed_var,
+                        command=self.change_speed).pack(side="left", padx=3)
+        ctk.CTkButton(buttons, text="Закрыть", width=70,
+                      command=self.close).pack(side="left", padx=3)
+
+    def show(self, sample):
+        """Показывает состояние записи в панели и в окне эксперимента"""
+        self.scrubber.set(sample['time'])
+        self.time_label.configure(
+            text=f"{sample['time']:.2f} / {self.engine.end:.2f} с  "
+                 f"(кадр {self.engine.frame + 1} из {self.engine.reader.rows})")
+        self.on_frame(sample)
+
+    def on_scrub(self, value):
+        self.show(self.engine.seek(float(value)))
+
+    def step(self, frames):
+        self.stop_playback()
+        self.show(self.engine.step(frames))
+
+    def change_speed(self, value):
+        self.engine.speed = float(value.rstrip("×"))
+
+    def toggle_play(self):
+        if self.engine.playing:
+            self.stop_playback()
+        else:
+            self.engine.play()
+            self.play_btn.configure(text="❚❚")
+            self.resume_playback()
+            self.scheduler.register(self, self.tick,
+                                    resume=self.resume_playback)
+
+    def resume_playback(self):
+        """Время, пока окно было свернуто, в повтор не идет"""
+        self.last_tick = time.perf_counter()
+
+    def stop_playback(self):
+        self.engine.pause()
+        self.play_btn.configure(text="▶")
+        self.scheduler.unregister(self)
+
+    def tick(self):
+        now = time.perf_counter()
+        sample = self.engine.advance(now - self.last_tick)
+        self.last_tick = now
+        self.show(sample)
+        if not self.engine.playing:
+            # Запись закончилась
+            self.stop_playback()
+
+    def close(self):
+        self.stop_playback()
+        self.destroy()
+        self.on_close()
+
+    def destroy(self):
+        self.scheduler.unregister(self)
+        super().destroy()
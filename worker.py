@@ -0,0 +1,211 @@
+import threading
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from timestep import FixedTimestep
+
+# Команды рабочему потоку/процессу
+RUN, PAUSE, STOP = 0.0, 1.0, 2.0
+
+# Служебные ячейки в начале общей памяти
+SEQUENCE, COMMAND, TIME_SCALE = 0, 1, 2
+HEADER = 3
+
+MODES = ('thread', 'process')
+
+# Режимы для выбора в окнах: None - физика в потоке Tk через after()
+MODE_TITLES = {"В окне": None, "Поток": 'thread', "Процесс": 'process'}
+
+
+def field_value(model, name):
+    """Значение поля как массив float (None - NaN)"""
+    value = getattr(model, name)
+    return np.ravel(np.asarray(np.nan if value is None else value, dtype=float))
+
+
+def read_fields(model, fields):
+    """Значения полей модели одним плоским массивом"""
+    return np.concatenate([field_value(model, name) for name in fields])
+
+
+def field_layout(model, fields):
+    """Смещения и размеры полей в снимке: {имя: (начало, конец)}"""
+    layout = {}
+    offset = 0
+    for name in fields:
+        size = field_value(model, name).size
+        layout[name] = (offset, offset + size)
+        offset += size
+    return layout, offset
+
+
+def attach(name):
+    """Подключается к общей памяти, которую освободит ее создатель"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # До Python 3.13 память учитывается общим для процессов
+        # resource_tracker, и повторная регистрация ничего не меняет
+        return shared_memory.SharedMemory(name=name)
+
+
+class SnapshotBuffer:
+    """Снимок состояния модели в общей памяти с двойной буферизацией
+
+    Писатель заполняет буфер, который сейчас не читают, и затем
+    увеличивает счетчик последовательности; номер буфера для чтения -
+    четность счетчика. Читатель копирует буфер и сверяет счетчик: если за
+    время копирования писатель опубликовал хотя бы один новый снимок,
+    чтение повторяется (seqlock). Следующую запись писатель ведет как раз
+    в читаемый буфер, поэтому даже одна смена счетчика означает, что копия
+    могла смешать два снимка. Писатель никогда не ждет читателя.
+    """
+    def __init__(self, size, name=None):
+        self.size = size
+        nbytes = (HEADER + 2 * size) * 8
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.memory = attach(name)
+            self.owner = False
+        self.data = np.ndarray(HEADER + 2 * size, dtype=np.float64,
+                               buffer=self.memory.buf)
+        if self.owner:
+            self.data[:] = 0.0
+            self.data[TIME_SCALE] = 1.0
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def buffer(self, index):
+        start = HEADER + index * self.size
+        return self.data[start:start + self.size]
+
+    def write(self, values):
+        sequence = int(self.data[SEQUENCE]) + 1
+        self.buffer(sequence % 2)[:] = values
+        self.data[SEQUENCE] = sequence
+
+    def read(self):
+        """Последний опубликованный снимок (копия) и его номер"""
+        while True:
+            sequence = int(self.data[SEQUENCE])
+            values = self.buffer(sequence % 2).copy()
+            if int(self.data[SEQUENCE]) == sequence:
+                return sequence, values
+
+    def close(self):
+        # Массив ссылается на память, его нужно отпустить до close()
+        self.data = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def run_worker(name, size, factory, fields, step, physics_rate):
+    """Цикл рабочего: шаги модели в реальном времени и публикация снимков
+
+    Функция верхнего уровня, чтобы ее можно было запустить в процессе.
+    """
+    snapshot = SnapshotBuffer(size, name)
+    model = factory()
+    advance = getattr(model, step)
+    clock = FixedTimestep(physics_rate)
+    snapshot.write(read_fields(model, fields))
+    clock.start()
+    paused = False
+    try:
+        while True:
+            command = snapshot.data[COMMAND]
+            if command == STOP:
+                break
+            if command == PAUSE:
+                paused = True
+                time.sleep(0.01)
+                continue
+            if paused:
+                # После паузы время отсчитывается заново
+                paused = False
+                clock.start()
+
+            clock.set_time_scale(snapshot.data[TIME_SCALE])
+            steps, _ = clock.advance()
+            for _ in range(steps):
+                advance(clock.dt)
+            if steps:
+                snapshot.write(read_fields(model, fields))
+            else:
+                time.sleep(clock.dt / 2)
+    finally:
+        snapshot.close()
+
+
+class PhysicsWorker:
+    """Модель, которая считается в отдельном потоке или процессе
+
+    factory() создает модель (для процесса она должна сериализоваться
+    pickle, например functools.partial(MovingBody, ...)); step - имя метода
+    шага ('update' или 'step'); fields - атрибуты модели, которые попадают в
+    снимок (числа, кортежи или массивы). Окно вызывает snapshot() раз в
+    кадр и получает последнее опубликованное состояние, не дожидаясь
+    физики.
+    """
+    def __init__(self, factory, fields, step='update', mode='thread',
+                 physics_rate=500, time_scale=1.0):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим: {mode}")
+        self.fields = tuple(fields)
+        self.layout, size = field_layout(factory(), self.fields)
+        self.snapshot_buffer = SnapshotBuffer(size)
+        self.snapshot_buffer.data[TIME_SCALE] = time_scale
+        args = (self.snapshot_buffer.name, size, factory, self.fields, step,
+                physics_rate)
+        if mode == 'process':
+            self.runner = multiprocessing.Process(target=run_worker, args=args,
+                                                  daemon=True)
+        else:
+            self.runner = threading.Thread(target=run_worker, args=args,
+                                           name="physics", daemon=True)
+        self.mode = mode
+        self.sequence = -1
+
+    def start(self):
+        self.runner.start()
+
+    def pause(self):
+        self.snapshot_buffer.data[COMMAND] = PAUSE
+
+    def resume(self):
+        self.snapshot_buffer.data[COMMAND] = RUN
+
+    def set_time_scale(self, scale):
+        self.snapshot_buffer.data[TIME_SCALE] = scale
+
+    @property
+    def alive(self):
+        return self.runner.is_alive()
+
+    def snapshot(self):
+        """Словарь {поле: значение} последнего снимка
+
+        Скалярные поля возвращаются числами, остальные - массивами.
+        """
+        self.sequence, values = self.snapshot_buffer.read()
+        result = {}
+        for name, (start, end) in self.layout.items():
+            result[name] = values[start] if end - start == 1 else values[start:end]
+        return result
+
+    def stop(self):
+        """Останавливает рабочего и освобождает общую память"""
+        if self.snapshot_buffer.data is None:
+            return
+        self.snapshot_buffer.data[COMMAND] = STOP
+        if self.runner.is_alive():
+            self.runner.join(timeout=2)
+        self.snapshot_buffer.close()